@@ -0,0 +1,71 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def make_bars(num_bars: int, seed: int = 42, freq: str = "min", start: str = "2020-01-01") -> pd.DataFrame:
+    """
+    Build a deterministic OHLCV frame from a geometric random walk.
+
+    :param num_bars: Number of rows
+    :param seed: Random seed so every run sees the same prices
+    :param freq: Bar frequency of the DatetimeIndex
+    :param start: First timestamp
+    :return: DataFrame with Open, High, Low, Close and Volume columns
+    """
+    rng = np.random.default_rng(seed)
+    log_returns = rng.normal(0.0002, 0.01, num_bars)
+    close = 100 * np.exp(np.cumsum(log_returns))
+    open_ = np.concatenate(([100.0], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.005, num_bars)) * close
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) + spread,
+        "Low": np.minimum(open_, close) - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000, 1_000_000, num_bars),
+    }, index=pd.date_range(start=start, periods=num_bars, freq=freq))
+
+
+def make_daily_history(ticker: str = "DUMMY", num_days: int = 252) -> pd.DataFrame:
+    """
+    One year of daily bars laid out like a yfinance ``history()`` result
+    (tz-aware index plus the Dividends and Stock Splits columns).
+
+    :param ticker: Ticker symbol; only used to vary the seed
+    :param num_days: Number of trading days
+    :return: DataFrame shaped like yfinance output
+    """
+    seed = sum(ord(c) for c in ticker)
+    df = make_bars(num_days, seed=seed, freq="B", start="2024-01-02")
+    df.index = df.index.tz_localize("America/New_York")
+    df.index.name = "Date"
+    df["Dividends"] = 0.0
+    df["Stock Splits"] = 0.0
+    return df
+
+
+class OfflineFetcher:
+    def __init__(self, latency_seconds: float = 0.0):
+        """
+        Upstream for ``FetchScheduler`` that serves ``make_daily_history`` bars ending today instead of
+        downloading, so caching, batching, rate limiting and the bar store's period slicing still run.
+
+        :param latency_seconds: Simulated time of each upstream call
+        """
+        self.latency_seconds = latency_seconds
+
+    def cost(self, tickers) -> int:
+        return 1
+
+    def fetch(self, tickers, period: str, interval: str, start: pd.Timestamp = None) -> dict:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        results = {}
+        for ticker in tickers:
+            df = make_daily_history(ticker)
+            today = pd.Timestamp.now(tz=df.index.tz).normalize()
+            df.index = pd.bdate_range(end=today, periods=len(df), name=df.index.name)
+            results[ticker] = df if start is None else df[df.index >= start]
+        return results
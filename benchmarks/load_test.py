@@ -0,0 +1,220 @@
+"""
+Load test for the dashboard's Dash callbacks. Runs fully offline.
+
+    python -m benchmarks.load_test                                  # 1, 2, 4, 8 and 16 users, 10 s each
+    python -m benchmarks.load_test --users 1,8,32 --stage-seconds 30
+    python -m benchmarks.load_test --url http://127.0.0.1:8050       # an app started elsewhere
+
+Unless ``--url`` is given, the app is started in a subprocess with bars served by ``OfflineFetcher`` through
+the real fetch scheduler (so caching, batching and rate limits apply), a temporary bar store and no news
+providers. Every virtual user has its own session and repeatedly searches a ticker, then opens the Monte Carlo
+and indicator views, by posting the recorded ``_dash-update-component`` payloads in ``payloads.json``.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(__file__)
+PAYLOADS_PATH = os.path.join(BENCH_DIR, "payloads.json")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results", "load_test.json")
+
+# Order in which a virtual user fires the callbacks, like a search followed by tweaking each tab.
+FLOW = ["update_content", "update_montecarlo_graph", "update_technical_indicators"]
+TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA", "JPM", "V", "XOM",
+           "JNJ", "PG", "KO", "PEP", "WMT", "DIS", "NFLX", "INTC", "AMD", "ORCL"]
+
+
+def load_payloads(path: str = PAYLOADS_PATH) -> dict:
+    """Recorded request bodies keyed by callback name, with '{ticker}' and '{session_id}' placeholders."""
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def render_payload(template: dict, ticker: str, session_id: str) -> bytes:
+    body = json.dumps(template).replace("{ticker}", ticker).replace("{session_id}", session_id)
+    return body.encode()
+
+
+def serve(port: int, upstream_latency: float, store_dir: str):
+    """Run the dashboard with offline bars and no news providers (the ``--serve`` subprocess)."""
+    from benchmarks.fixtures import OfflineFetcher
+    from scr.app_components import app, news_store
+    from scr.bar_store import bar_store
+    from scr.fetch_scheduler import fetch_scheduler
+
+    fetch_scheduler.fetcher = OfflineFetcher(upstream_latency)
+    # Keep the synthetic bars out of the real store.
+    bar_store.root = store_dir
+    news_store.fetchers = []
+    app.run(host="127.0.0.1", port=port, debug=False, threaded=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(upstream_latency: float, store_dir: str, timeout: float = 60):
+    """Start ``serve`` in a subprocess and wait until it answers; return (process, base_url)."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.load_test", "--serve", "--port", str(port),
+         "--upstream-latency", str(upstream_latency), "--store-dir", store_dir],
+        cwd=os.path.dirname(BENCH_DIR), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App server exited with status {process.returncode}.")
+        try:
+            with urlopen(f"{base_url}/_dash-layout", timeout=5):
+                return process, base_url
+        except (URLError, ConnectionError):
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"App server did not start within {timeout} s.")
+
+
+def post(url: str, body: bytes, timeout: float = 120) -> bool:
+    """
+    POST one callback request. True on a 2xx answer (Dash answers 204 when a callback prevents the update)
+    that does not carry one of the "Error: ..." messages the callbacks render instead of raising.
+    """
+    request = Request(url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            return 200 <= response.status < 300 and b'"Error: ' not in response.read()
+    except (HTTPError, URLError, ConnectionError, TimeoutError):
+        return False
+
+
+def virtual_user(base_url: str, payloads: dict, tickers, stop: threading.Event, samples: list, seed: int):
+    """Repeat the FLOW with random tickers until ``stop`` is set, appending (callback, seconds, ok) samples."""
+    url = f"{base_url}/_dash-update-component"
+    session_id = str(uuid.uuid4())
+    rng = random.Random(seed)
+    while not stop.is_set():
+        ticker = rng.choice(tickers)
+        for name in FLOW:
+            body = render_payload(payloads[name], ticker, session_id)
+            start = time.perf_counter()
+            ok = post(url, body)
+            # list.append is atomic, so the user threads can share one list.
+            samples.append((name, time.perf_counter() - start, ok))
+            if stop.is_set():
+                break
+
+
+def run_stage(base_url: str, payloads: dict, tickers, users: int, seconds: float) -> dict:
+    """Run ``users`` virtual users for ``seconds`` and summarize the requests they completed."""
+    samples = []
+    stop = threading.Event()
+    threads = [threading.Thread(target=virtual_user, args=(base_url, payloads, tickers, stop, samples, i),
+                                daemon=True)
+               for i in range(users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return summarize(samples, time.perf_counter() - start)
+
+
+def summarize(samples, elapsed: float) -> dict:
+    """
+    Per-callback throughput and latency percentiles.
+
+    :param samples: (callback, seconds, ok) tuples
+    :param elapsed: Wall time of the stage in seconds
+    :return: dict of callback -> requests, errors, throughput (req/s) and p50/p95/p99 in milliseconds
+    """
+    summary = {}
+    for name in sorted({name for name, _, _ in samples}):
+        latencies = np.array([seconds for n, seconds, ok in samples if n == name and ok]) * 1000
+        errors = sum(1 for n, _, ok in samples if n == name and not ok)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+        summary[name] = {
+            "requests": len(latencies) + errors,
+            "errors": errors,
+            "throughput": len(latencies) / elapsed,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+        }
+    return summary
+
+
+def print_stage(users: int, summary: dict):
+    for name, row in summary.items():
+        print(f"{users:>5} {name:<28} {row['requests']:>8} {row['errors']:>6} {row['throughput']:>8.2f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ramp concurrent users against the dashboard callbacks.")
+    parser.add_argument("--users", default="1,2,4,8,16", help="Comma-separated virtual users per stage.")
+    parser.add_argument("--stage-seconds", type=float, default=10, help="Duration of each stage.")
+    parser.add_argument("--tickers", default=",".join(TICKERS), help="Comma-separated tickers users pick from.")
+    parser.add_argument("--url", help="Test an app that is already running instead of starting one.")
+    parser.add_argument("--upstream-latency", type=float, default=0.0,
+                        help="Simulated seconds per offline upstream call.")
+    parser.add_argument("--payloads", default=PAYLOADS_PATH, help="Recorded callback payloads.")
+    parser.add_argument("--output", default=RESULTS_PATH, help="Where to write the results.")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=8050, help=argparse.SUPPRESS)
+    parser.add_argument("--store-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.port, args.upstream_latency, args.store_dir)
+        return 0
+
+    payloads = load_payloads(args.payloads)
+    tickers = [ticker.strip().upper() for ticker in args.tickers.split(",") if ticker.strip()]
+    stages = [int(users) for users in args.users.split(",")]
+
+    process = None
+    store_dir = tempfile.TemporaryDirectory(prefix="plutus-load-")
+    base_url = args.url.rstrip("/") if args.url else None
+    if base_url is None:
+        process, base_url = start_server(args.upstream_latency, store_dir.name)
+    try:
+        print(f"{'users':>5} {'callback':<28} {'requests':>8} {'errors':>6} {'req/s':>8} "
+              f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        results = []
+        for users in stages:
+            summary = run_stage(base_url, payloads, tickers, users, args.stage_seconds)
+            print_stage(users, summary)
+            results.append({"users": users, "callbacks": summary})
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        store_dir.cleanup()
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump({"python": platform.python_version(), "stage_seconds": args.stage_seconds,
+                   "tickers": len(tickers), "stages": results}, file, indent=2)
+    errors = sum(row["errors"] for stage in results for row in stage["callbacks"].values())
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
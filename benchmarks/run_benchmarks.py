@@ -0,0 +1,179 @@
+"""
+Benchmark suite for the dashboard hot paths. Runs fully offline: bars come from ``OfflineFetcher`` through the
+real fetch scheduler, a temporary bar store and ``DataHandler`` (normalization and caching included).
+
+    python -m benchmarks.run_benchmarks                    # run and compare with the baseline
+    python -m benchmarks.run_benchmarks --quick            # skip the 1M-bar cases
+    python -m benchmarks.run_benchmarks --update-baseline  # store this run as the new baseline
+
+Exits with status 1 when any benchmark is slower than the baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import OfflineFetcher, make_bars
+from scr.backtester import sweep_close
+from scr.bar_store import bar_store
+from scr.cache import analytics_cache, bar_cache
+from scr.fetch_scheduler import fetch_scheduler
+from scr.simulations import MonteCarloSimulation
+from scr.technical_ind import TechnicalIndicators
+
+BENCH_DIR = os.path.dirname(__file__)
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results", "latest.json")
+
+# Same choices as the Monte Carlo dropdowns in the dashboard.
+SIMULATION_PATHS = [500, 1000, 2000, 5000]
+SIMULATION_DAYS = [15, 30, 60, 90]
+INDICATOR_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+INDICATOR_METHODS = [
+    ("simple_moving_average", {"window": 14}),
+    ("exponential_moving_average", {"window": 14}),
+    ("relative_strength_index", {"window": 14}),
+    ("macd", {}),
+    ("bollinger_bands", {"window": 20}),
+]
+
+
+def time_call(func, repeat: int):
+    """Run func ``repeat`` times after one warm-up call; return per-call seconds."""
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def simulation_cases():
+    simulator = MonteCarloSimulation("DUMMY")
+    for paths in SIMULATION_PATHS:
+        for days in SIMULATION_DAYS:
+            def run(paths=paths, days=days):
+                np.random.seed(0)
+                simulator.run_simulation(num_simulations=paths, num_days=days)
+            yield f"run_simulation[paths={paths},days={days}]", run
+
+
+def indicator_cases(sizes):
+    for size in sizes:
+        bars = make_bars(size)
+        for method, kwargs in INDICATOR_METHODS:
+            def run(bars=bars, method=method, kwargs=kwargs):
+                getattr(TechnicalIndicators(bars), method)(**kwargs)
+            yield f"{method}[bars={size}]", run
+
+
+def backtest_cases():
+    # Ten years of daily bars through the full 1-100 window grid of every indicator.
+    close = make_bars(2520, freq="B")["Close"].to_numpy()
+    yield "sweep_close[bars=2520,windows=1-100]", lambda: sweep_close(close)
+
+
+def callback_cases():
+    # Imported lazily: the app module builds the Dash app and the news store on import.
+    from scr.app_components import render_montecarlo_simulation, update_technical_indicators
+
+    def cold(func):
+        # Drop cached bars and analytics so the full computation is timed.
+        def run():
+            bar_cache.invalidate()
+            analytics_cache.invalidate()
+            func()
+        return run
+
+    for paths, days in [(1000, 30), (5000, 90)]:
+        def render(paths=paths, days=days):
+            render_montecarlo_simulation("DUMMY", paths, days, "Auto", "Auto", "1d")
+        yield f"render_montecarlo_simulation[paths={paths},days={days}]", cold(render)
+        yield f"render_montecarlo_simulation[paths={paths},days={days},warm]", render
+
+    def update():
+        update_technical_indicators(14, 14, 14, 12, 26, 20, "DUMMY", "1d")
+    yield "update_technical_indicators[defaults]", cold(update)
+    yield "update_technical_indicators[defaults,warm]", update
+
+
+def run_suite(quick: bool, repeat: int):
+    sizes = INDICATOR_SIZES[:-1] if quick else INDICATOR_SIZES
+    cases = (list(simulation_cases()) + list(indicator_cases(sizes)) + list(backtest_cases())
+             + list(callback_cases()))
+    results = {}
+    for name, func in cases:
+        # Large inputs get fewer repeats so the full suite stays within a few minutes.
+        case_repeat = max(1, repeat // 5) if "1000000" in name else repeat
+        timings = time_call(func, case_repeat)
+        results[name] = {"median": statistics.median(timings), "min": min(timings), "repeat": case_repeat}
+        print(f"{name:<60} median {results[name]['median'] * 1000:10.3f} ms")
+    return results
+
+
+def compare(results, baseline, threshold: float):
+    """Return the names of benchmarks whose median regressed past the threshold."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["median"]
+        ratio = result["median"] / before if before else 1.0
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            print(f"REGRESSION {name}: {before * 1000:.3f} ms -> {result['median'] * 1000:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def write_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(payload, file, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark simulation, indicators and callback rendering.")
+    parser.add_argument("--quick", action="store_true", help="Skip the 1M-bar indicator cases.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown versus the baseline median (0.25 = 25%%).")
+    parser.add_argument("--output", default=RESULTS_PATH, help="Where to write this run's results.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline results to compare against.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline.")
+    args = parser.parse_args(argv)
+
+    # Never hit the network, and keep the synthetic bars out of the real store.
+    fetcher, store_root = fetch_scheduler.fetcher, bar_store.root
+    store_dir = tempfile.TemporaryDirectory(prefix="plutus-bench-")
+    fetch_scheduler.fetcher = OfflineFetcher()
+    bar_store.root = store_dir.name
+    try:
+        results = run_suite(args.quick, args.repeat)
+    finally:
+        fetch_scheduler.fetcher, bar_store.root = fetcher, store_root
+        store_dir.cleanup()
+    write_json(args.output, {"python": platform.python_version(), "results": results})
+
+    if args.update_baseline:
+        write_json(args.baseline, {"python": platform.python_version(), "results": results})
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    return 1 if compare(results, baseline, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
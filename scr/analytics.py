@@ -0,0 +1,120 @@
+import pandas as pd
+
+from scr.cache import analytics_cache
+from scr.data_handler import DataHandler
+from scr.metrics import span
+from scr.screener import SNAPSHOT_INTERVAL, snapshot_table
+from scr.simulations import MonteCarloSimulation
+from scr.technical_ind import TechnicalIndicators, DEFAULT_INDICATOR_PARAMS
+
+# Simulation settings the Monte Carlo tab opens with.
+DEFAULT_FORECAST_PARAMS = {
+    "num_simulations": 1000,
+    "num_days": 30,
+    "mu": None,
+    "sigma": None,
+}
+
+
+def indicator_snapshot(ticker: str, interval: str = "1d", period: str = "1y", refresh: bool = False,
+                       ttl: float = None, table=None, **params) -> pd.Series:
+    """
+    Latest indicator values and signals for a ticker, served from the analytics cache when warm.
+
+    :param ticker: Stock ticker symbol
+    :param interval: Data interval
+    :param period: Time period of the history used
+    :param refresh: Recompute even when a cached snapshot exists
+    :param ttl: Seconds to keep the result (analytics cache default when omitted)
+    :param table: SnapshotTable updated with fresh default daily snapshots (defaults to the shared table)
+    :param params: Indicator windows, see DEFAULT_INDICATOR_PARAMS
+    :return: Last row of the indicator frame
+    """
+    params = {**DEFAULT_INDICATOR_PARAMS, **params}
+    key = ("indicators", ticker, period, interval) + tuple(sorted(params.items()))
+    if not refresh:
+        cached = analytics_cache.get(key)
+        if cached is not None:
+            return cached
+
+    df = DataHandler().fetch_stock_data(ticker, period=period, interval=interval)
+    if isinstance(df, dict) and "error" in df:
+        raise ValueError(df["error"])
+
+    with span("technical_indicators", ticker=ticker, interval=interval):
+        ti = TechnicalIndicators(df)
+        ti.compute_all(**params)
+        snapshot = ti.snapshot()
+
+    analytics_cache.set(key, snapshot, ttl=ttl)
+    if interval == SNAPSHOT_INTERVAL and params == DEFAULT_INDICATOR_PARAMS:
+        # Keep the screener's cross-sectional table current with every fresh daily snapshot.
+        (table if table is not None else snapshot_table).update(ticker, snapshot)
+    return snapshot
+
+
+def montecarlo_forecast(ticker: str, interval: str = "1d", period: str = "1y", refresh: bool = False,
+                        ttl: float = None, **params) -> dict:
+    """
+    Monte Carlo forecast band for a ticker, served from the analytics cache when warm.
+
+    :param ticker: Stock ticker symbol
+    :param interval: Data interval
+    :param period: Time period of the history used
+    :param refresh: Recompute even when a cached forecast exists
+    :param ttl: Seconds to keep the result (analytics cache default when omitted)
+    :param params: num_simulations, num_days, mu and sigma, see DEFAULT_FORECAST_PARAMS
+    :return: dict with 'historical' close prices, 'future_dates', 'simulated_min' and 'simulated_max'
+    """
+    params = {**DEFAULT_FORECAST_PARAMS, **params}
+    key = ("forecast", ticker, period, interval) + tuple(sorted(params.items()))
+    if not refresh:
+        cached = analytics_cache.get(key)
+        if cached is not None:
+            return cached
+
+    simulator = MonteCarloSimulation(ticker, period=period, interval=interval)
+    simulated_prices = simulator.run_simulation(**params)
+
+    historical_price = simulator.data["Close"]
+    last_date = historical_price.index[-1]
+    forecast = {
+        "historical": historical_price,
+        "future_dates": pd.date_range(start=last_date + pd.Timedelta(days=1), periods=params["num_days"]),
+        "simulated_min": simulated_prices.min(axis=1).to_numpy(),
+        "simulated_max": simulated_prices.max(axis=1).to_numpy(),
+    }
+
+    analytics_cache.set(key, forecast, ttl=ttl)
+    return forecast
+
+
+def montecarlo_sweep(ticker: str, mus, sigmas, interval: str = "1d", period: str = "1y", refresh: bool = False,
+                     ttl: float = None, num_simulations: int = DEFAULT_FORECAST_PARAMS["num_simulations"],
+                     num_days: int = DEFAULT_FORECAST_PARAMS["num_days"]) -> dict:
+    """
+    Terminal price statistics over a (mu, sigma) grid, served from the analytics cache when warm.
+
+    :param ticker: Stock ticker symbol
+    :param mus: Expected daily returns of the grid rows (None for the historical mean)
+    :param sigmas: Volatilities of the grid columns (None for the historical standard deviation)
+    :param interval: Data interval
+    :param period: Time period of the history used
+    :param refresh: Recompute even when a cached sweep exists
+    :param ttl: Seconds to keep the result (analytics cache default when omitted)
+    :return: dict with the 'last_price' and the per-cell 'stats' DataFrame of MonteCarloSimulation.run_sweep
+    """
+    key = ("sweep", ticker, period, interval, tuple(mus), tuple(sigmas), num_simulations, num_days)
+    if not refresh:
+        cached = analytics_cache.get(key)
+        if cached is not None:
+            return cached
+
+    simulator = MonteCarloSimulation(ticker, period=period, interval=interval)
+    sweep = {
+        "last_price": float(simulator.data["Close"].iloc[-1]),
+        "stats": simulator.run_sweep(mus, sigmas, num_simulations=num_simulations, num_days=num_days),
+    }
+
+    analytics_cache.set(key, sweep, ttl=ttl)
+    return sweep
@@ -1,16 +1,50 @@
+import uuid
+
 import dash
-from dash import dcc, html, Input, Output, State
-import pandas as pd
+from dash import dcc, html, Input, Output, State, ctx
+import numpy as np
 import plotly.graph_objects as go
 
 from scr.data_handler import DataHandler
-from scr.technical_ind import TechnicalIndicators
-from scr.simulations import MonteCarloSimulation
-from scr.news_line import get_news_from_newsdata, get_news_from_newsapi
+from scr.analytics import DEFAULT_FORECAST_PARAMS, indicator_snapshot, montecarlo_forecast, montecarlo_sweep
+from scr.config import get_setting
+from scr.live_feed import LIVE_COLUMNS, LIVE_DEFAULTS, live_feed
+from scr.news_store import NewsStore
+from scr.prefetch import PREFETCH_DEFAULTS, Prefetcher
+from scr.profiling import profile_callback, profiler, register_profiles_route
+from scr.screener import (BOLLINGER_LOWER_COLUMN, BOLLINGER_UPPER_COLUMN, MACD_COLUMN, NUMERIC_COLUMNS,
+                          SIGNAL_COLUMNS, parse_filters, snapshot_table)
+from scr.symbols import symbol_index
+from scr.technical_ind import DEFAULT_INDICATOR_PARAMS
+from scr.metrics import instrument_callback, register_metrics_route, span
+
+NEWS_PAGE_SIZE = 10
+# Choices of the Mu and Sigma dropdowns besides 'Auto'; the sensitivity heatmap sweeps all of them at once.
+MU_OPTIONS = [0.01, 0.02, 0.03]
+SIGMA_OPTIONS = [0.1, 0.2, 0.3]
+SWEEP_MUS = [None] + MU_OPTIONS
+SWEEP_SIGMAS = [None] + SIGMA_OPTIONS
+news_store = NewsStore()
+
+# A search starts every tab's default computation at once; tab callbacks then wait on these.
+prefetcher = Prefetcher({
+    "indicators": lambda ticker, interval: indicator_snapshot(ticker, interval=interval),
+    "forecast": lambda ticker, interval: montecarlo_forecast(ticker, interval=interval),
+    "sweep": lambda ticker, interval: montecarlo_sweep(ticker, SWEEP_MUS, SWEEP_SIGMAS, interval=interval),
+    "news": lambda ticker, interval: news_store.refresh(ticker),
+}, **get_setting("prefetch", PREFETCH_DEFAULTS))
+
+
+def use_prefetch() -> bool:
+    """Whether this request goes through the prefetcher; profiled requests work inline, where cProfile sees them."""
+    return not profiler.requested()
+
 
 # Initialize the app with suppress_callback_exceptions=True.
 app = dash.Dash(__name__, suppress_callback_exceptions=True)
 app.title = "Market Analysis Dashboard"
+register_metrics_route(app.server)
+register_profiles_route(app.server)
 
 
 def create_layout():
@@ -24,6 +58,11 @@ def create_layout():
         children=[
             html.H1("Market Analysis Dashboard", style={'textAlign': 'center', 'fontSize': '36px'}),
 
+            # Identifies the browser tab's session for the prefetcher; kept across reloads of the same tab.
+            dcc.Store(id="session-id", storage_type="session", data=str(uuid.uuid4())),
+            # The ticker of the last search; tab callbacks read it instead of whatever is typed in the box.
+            dcc.Store(id="submitted-ticker"),
+
             # Flex container for ticker input, interval dropdown, and search button.
             html.Div(
                 style={
@@ -34,10 +73,12 @@ def create_layout():
                     'marginBottom': '20px'
                 },
                 children=[
-                    # Ticker input box.
+                    # Ticker input box; searches run on Enter or the Search button, not on every keystroke.
                     dcc.Input(
                         id="ticker-input",
                         type="text",
+                        list="ticker-suggestions",
+                        n_submit=0,
                         placeholder="Enter Ticker (e.g., AAPL, BTC-USD)",
                         style={
                             'width': '30%',
@@ -49,10 +90,15 @@ def create_layout():
                             'fontSize': '16px'
                         }
                     ),
+                    html.Datalist(id="ticker-suggestions"),
                     # Interval dropdown styled similarly to technical indicators inputs.
                     dcc.Dropdown(
                         id="interval-input",
                         options=[
+                            {'label': '1m', 'value': '1m'},
+                            {'label': '5m', 'value': '5m'},
+                            {'label': '15m', 'value': '15m'},
+                            {'label': '1h', 'value': '1h'},
                             {'label': '1d', 'value': '1d'},
                             {'label': '5d', 'value': '5d'},
                             {'label': '1wk', 'value': '1wk'},
@@ -99,6 +145,8 @@ def create_layout():
                     dcc.Tab(label="🔄 Monte Carlo Simulation", value="montecarlo"),
                     dcc.Tab(label="📈 Technical Indicators", value="technical"),
                     dcc.Tab(label="📰 News Feed", value="news"),
+                    dcc.Tab(label="🔎 Screener", value="screener"),
+                    dcc.Tab(label="⚡ Live", value="live"),
                 ],
                 style={'borderBottom': '2px solid #444'}
             ),
@@ -116,7 +164,8 @@ def create_layout():
     )
 
 
-app.layout = create_layout()
+# Served as a function so every page load gets its own session id.
+app.layout = create_layout
 
 
 # ----------------------------------------------------------------------
@@ -246,12 +295,15 @@ def render_technical_indicators(df):
     Input("macd-short-input", "value"),
     Input("macd-long-input", "value"),
     Input("bollinger-input", "value"),
-    State("ticker-input", "value"),
-    State("interval-input", "value")
+    State("submitted-ticker", "data"),
+    State("interval-input", "value"),
+    State("session-id", "data")
 )
+@instrument_callback
+@profile_callback
 def update_technical_indicators(sma_period, ema_period, rsi_period,
                                 macd_short, macd_long, bollinger_period,
-                                ticker, interval):
+                                ticker, interval, session_id=None):
     # For debugging, you can uncomment the next line:
     # print("update_technical_indicators triggered with:", sma_period, ema_period, ticker, interval)
     if not ticker:
@@ -262,32 +314,34 @@ def update_technical_indicators(sma_period, ema_period, rsi_period,
             ])
         ]
 
-    data_handler = DataHandler()
-    df = data_handler.fetch_stock_data(ticker, period="1y", interval=interval)
-    if isinstance(df, dict) and "error" in df:
+    params = dict(sma_window=sma_period, ema_window=ema_period, rsi_window=rsi_period,
+                  macd_short=macd_short, macd_long=macd_long, bollinger_window=bollinger_period)
+    if params == DEFAULT_INDICATOR_PARAMS and use_prefetch():
+        # The search already started this computation; wait for it instead of repeating it.
+        prefetcher.wait(session_id, "indicators", ticker, interval)
+
+    # Served from the analytics cache when the watchlist refresher (or an earlier request) computed it.
+    try:
+        snapshot = indicator_snapshot(ticker, interval=interval,
+                                      sma_window=sma_period, ema_window=ema_period, rsi_window=rsi_period,
+                                      macd_short=macd_short, macd_long=macd_long,
+                                      bollinger_window=bollinger_period)
+    except ValueError as e:
         return [
             html.Tr([
-                html.Td(f"Error: {df['error']}", colSpan=3,
+                html.Td(f"Error: {e}", colSpan=3,
                         style={'color': 'red', 'textAlign': 'center'})
             ])
         ]
 
-    # Compute technical indicators.
-    ti = TechnicalIndicators(df)
-    df = ti.simple_moving_average(sma_period)
-    df = ti.exponential_moving_average(ema_period)
-    df = ti.relative_strength_index(rsi_period)
-    df = ti.macd(macd_short, macd_long)
-    df = ti.bollinger_bands(bollinger_period)
-
     # Build a dictionary of indicator names to (value, signal)
     indicators = {
-        "SMA": (df[f"SMA_{sma_period}"].iloc[-1], df[f"Signal_SMA_{sma_period}"].iloc[-1]),
-        "EMA": (df[f"EMA_{ema_period}"].iloc[-1], df[f"Signal_EMA_{ema_period}"].iloc[-1]),
-        "RSI": (df["RSI"].iloc[-1], df["Signal_RSI"].iloc[-1]),
-        "MACD": (df[f"MACD_{macd_short}_{macd_long}"].iloc[-1], df[f"Signal_MACD_{macd_short}_{macd_long}"].iloc[-1]),
+        "SMA": (snapshot[f"SMA_{sma_period}"], snapshot[f"Signal_SMA_{sma_period}"]),
+        "EMA": (snapshot[f"EMA_{ema_period}"], snapshot[f"Signal_EMA_{ema_period}"]),
+        "RSI": (snapshot["RSI"], snapshot["Signal_RSI"]),
+        "MACD": (snapshot[f"MACD_{macd_short}_{macd_long}"], snapshot[f"Signal_MACD_{macd_short}_{macd_long}"]),
         "Bollinger Bands": (
-        df[f"Bollinger_Mid_{bollinger_period}"].iloc[-1], df[f"Signal_Bollinger_{bollinger_period}_2"].iloc[-1])
+        snapshot[f"Bollinger_Mid_{bollinger_period}"], snapshot[f"Signal_Bollinger_{bollinger_period}_2"])
     }
 
     # Build the table rows.
@@ -364,12 +418,8 @@ def render_montecarlo_tab(ticker, interval):
                 html.Label("Mu", style={'marginRight': '5px', 'color': '#E0E0E0'}),
                 dcc.Dropdown(
                     id="mu-input",
-                    options=[
-                        {'label': 'Auto', 'value': 'Auto'},
-                        {'label': '0.01', 'value': 0.01},
-                        {'label': '0.02', 'value': 0.02},
-                        {'label': '0.03', 'value': 0.03}
-                    ],
+                    options=[{'label': 'Auto', 'value': 'Auto'}]
+                            + [{'label': str(x), 'value': x} for x in MU_OPTIONS],
                     value='Auto',
                     clearable=False,
                     searchable=False,
@@ -389,12 +439,8 @@ def render_montecarlo_tab(ticker, interval):
                 html.Label("Sigma", style={'marginRight': '5px', 'color': '#E0E0E0'}),
                 dcc.Dropdown(
                     id="sigma-input",
-                    options=[
-                        {'label': 'Auto', 'value': 'Auto'},
-                        {'label': '0.1', 'value': 0.1},
-                        {'label': '0.2', 'value': 0.2},
-                        {'label': '0.3', 'value': 0.3}
-                    ],
+                    options=[{'label': 'Auto', 'value': 'Auto'}]
+                            + [{'label': str(x), 'value': x} for x in SIGMA_OPTIONS],
                     value='Auto',
                     clearable=False,
                     searchable=False,
@@ -419,41 +465,7 @@ def render_montecarlo_tab(ticker, interval):
     )
 
 
-def render_montecarlo_simulation(ticker, num_simulations, num_days, mu, sigma, interval):
-    # Convert 'Auto' values to None.
-    if mu == 'Auto':
-        mu = None
-    if sigma == 'Auto':
-        sigma = None
-
-    data_handler = DataHandler()
-    df_hist = data_handler.fetch_stock_data(ticker, period="1y", interval=interval)
-    historical_dates = df_hist.index
-    historical_price = df_hist["Close"]
-
-    simulator = MonteCarloSimulation(ticker, period="1y", interval=interval)
-    simulated_prices = simulator.run_simulation(
-        num_simulations=num_simulations,
-        num_days=num_days,
-        mu=mu,
-        sigma=sigma
-    )
-
-    # Create future dates based on the last historical date
-    last_date = historical_dates[-1]
-    future_dates = pd.date_range(start=last_date + pd.Timedelta(days=1), periods=num_days)
-
-    # If simulated_prices is not already a DataFrame, convert it.
-    # (Assuming simulated_prices is a NumPy array with shape (num_days, num_simulations))
-    if not isinstance(simulated_prices, pd.DataFrame):
-        simulated_prices = pd.DataFrame(simulated_prices, index=future_dates)
-    else:
-        simulated_prices.index = future_dates
-
-    # Calculate the min and max across simulation runs (columns) for each day
-    simulated_min = simulated_prices.min(axis=1)
-    simulated_max = simulated_prices.max(axis=1)
-
+def build_montecarlo_figure(historical_dates, historical_price, future_dates, simulated_min, simulated_max):
     # Build the Plotly figure
     fig = go.Figure()
     fig.add_trace(go.Scatter(
@@ -499,8 +511,95 @@ def render_montecarlo_simulation(ticker, num_simulations, num_days, mu, sigma, i
         margin=dict(l=50, r=50, t=70, b=50)
     )
 
+    return fig
+
+
+def build_sensitivity_heatmap(sweep, mus, sigmas, num_days):
+    # Rows are mu, columns sigma, in the order of the dropdowns; cells show the median terminal return.
+    stats = sweep["stats"]
+    shape = (len(mus), len(sigmas))
+    median_return = (stats["p50"].to_numpy().reshape(shape) / sweep["last_price"] - 1) * 100
+    p5 = stats["p5"].to_numpy().reshape(shape)
+    p95 = stats["p95"].to_numpy().reshape(shape)
+    prob_gain = stats["prob_gain"].to_numpy().reshape(shape) * 100
+    # Auto rows and columns are labelled with the historical value they resolved to.
+    mu_labels = [f"Auto ({m:.4f})" if mu is None else str(mu)
+                 for mu, m in zip(mus, stats.index.get_level_values("mu")[::len(sigmas)])]
+    sigma_labels = [f"Auto ({s:.4f})" if sigma is None else str(sigma)
+                    for sigma, s in zip(sigmas, stats.index.get_level_values("sigma")[:len(sigmas)])]
+
+    fig = go.Figure(go.Heatmap(
+        z=median_return,
+        x=sigma_labels,
+        y=mu_labels,
+        customdata=np.dstack([p5, p95, prob_gain]),
+        colorscale="RdYlGn",
+        zmid=0,
+        texttemplate="%{z:.1f}%",
+        colorbar=dict(title="Median %"),
+        hovertemplate=("Mu %{y}, Sigma %{x}<br>Median return %{z:.1f}%<br>"
+                       "5-95%: %{customdata[0]:.2f} - %{customdata[1]:.2f}<br>"
+                       "P(gain) %{customdata[2]:.0f}%<extra></extra>")
+    ))
+    fig.update_layout(
+        title={
+            'text': f"Sensitivity: median return after {num_days} days",
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': dict(size=20)
+        },
+        xaxis_title="Sigma",
+        yaxis_title="Mu",
+        template="plotly_dark",
+        height=450,
+        width=1200,
+        paper_bgcolor="#121212",
+        plot_bgcolor="#121212",
+        font=dict(color="#E0E0E0", family='"Poppins", sans-serif'),
+        margin=dict(l=50, r=50, t=70, b=50)
+    )
+    return fig
+
+
+def render_montecarlo_simulation(ticker, num_simulations, num_days, mu, sigma, interval, session_id=None):
+    # Convert 'Auto' values to None.
+    if mu == 'Auto':
+        mu = None
+    if sigma == 'Auto':
+        sigma = None
+
+    params = dict(num_simulations=num_simulations, num_days=num_days, mu=mu, sigma=sigma)
+    if params == DEFAULT_FORECAST_PARAMS and use_prefetch():
+        prefetcher.wait(session_id, "forecast", ticker, interval)
+    # The grid depends only on the number of paths and days, so changing Mu or Sigma is served from the cache.
+    default_grid = (num_simulations == DEFAULT_FORECAST_PARAMS["num_simulations"]
+                    and num_days == DEFAULT_FORECAST_PARAMS["num_days"])
+    if default_grid and use_prefetch():
+        prefetcher.wait(session_id, "sweep", ticker, interval)
+
+    mus = SWEEP_MUS
+    sigmas = SWEEP_SIGMAS
+    try:
+        forecast = montecarlo_forecast(ticker, interval=interval, num_simulations=num_simulations,
+                                       num_days=num_days, mu=mu, sigma=sigma)
+        sweep = montecarlo_sweep(ticker, mus, sigmas, interval=interval,
+                                 num_simulations=num_simulations, num_days=num_days)
+    except ValueError as e:
+        return html.Div(f"Error: {e}", style={'color': 'red', 'textAlign': 'center'})
+    historical_dates = forecast["historical"].index
+    historical_price = forecast["historical"]
+    future_dates = forecast["future_dates"]
+    simulated_min = forecast["simulated_min"]
+    simulated_max = forecast["simulated_max"]
+
+    with span("plotly_figure", ticker=ticker):
+        fig = build_montecarlo_figure(historical_dates, historical_price, future_dates,
+                                      simulated_min, simulated_max)
+        heatmap = build_sensitivity_heatmap(sweep, mus, sigmas, num_days)
+
     return html.Div(
-        [dcc.Graph(figure=fig, style={'width': '100%', 'height': '700px'})],
+        [dcc.Graph(figure=fig, style={'width': '100%', 'height': '700px'}),
+         dcc.Graph(figure=heatmap, style={'width': '100%', 'height': '450px'})],
         style={'width': '100%', 'maxWidth': '1200px', 'margin': '0 auto'}
     )
 
@@ -509,17 +608,34 @@ def render_montecarlo_simulation(ticker, num_simulations, num_days, mu, sigma, i
 # ----------------------------------------------------------------------
 @app.callback(
     Output("tab-content", "children"),
+    Output("submitted-ticker", "data"),
     Input("search-button", "n_clicks"),
+    Input("ticker-input", "n_submit"),
     Input("tabs", "value"),
-    Input("ticker-input", "value"),
     Input("interval-input", "value"),
+    State("ticker-input", "value"),
+    State("session-id", "data"),
     prevent_initial_call=True
 )
-def update_content(n_clicks, tab, ticker, interval):
+@instrument_callback
+@profile_callback
+def update_content(n_clicks, n_submit, tab, interval, ticker, session_id=None):
+    # The screener works across all tickers, so it does not need one entered.
+    if tab == "screener":
+        return render_screener_tab(), dash.no_update
     if not ticker:
         return html.Div("Enter a ticker (e.g., AAPL, BTC-USD) to start.",
-                        style={'textAlign': 'center', 'marginTop': '20px'})
+                        style={'textAlign': 'center', 'marginTop': '20px'}), dash.no_update
+    # Remember the ticker this content was rendered for; the tabs' own callbacks read it from the store.
+    content = render_tab_content(tab, ticker, interval, session_id, new_search=ctx.triggered_id != "tabs")
+    return content, ticker
+
+
+def render_tab_content(tab, ticker, interval, session_id=None, new_search=True):
     try:
+        # Start (or reuse) every tab's computation for this search before rendering the one that is open.
+        if use_prefetch():
+            prefetcher.start(session_id, ticker, interval, new_search=new_search)
         data_handler = DataHandler()
         df = data_handler.fetch_stock_data(ticker, period="1y", interval=interval)
         if isinstance(df, dict) and "error" in df:
@@ -530,12 +646,30 @@ def update_content(n_clicks, tab, ticker, interval):
         elif tab == "technical":
             return render_technical_indicators(df)
         elif tab == "news":
-            return render_news_feed(ticker)
+            return render_news_feed(ticker, interval, session_id)
+        elif tab == "live":
+            return render_live_tab(ticker)
     except Exception as e:
         return html.Div(f"An error occurred: {str(e)}",
                         style={'color': 'red', 'textAlign': 'center'})
 
 
+# ----------------------------------------------------------------------
+# Ticker autocomplete from the local symbol index (no network requests).
+# ----------------------------------------------------------------------
+@app.callback(
+    Output("ticker-suggestions", "children"),
+    Input("ticker-input", "value"),
+    prevent_initial_call=True
+)
+@instrument_callback
+@profile_callback
+def update_ticker_suggestions(text):
+    if not symbol_index.enabled:
+        return dash.no_update
+    return [html.Option(value=symbol, label=name) for symbol, name in symbol_index.suggest(text)]
+
+
 # ----------------------------------------------------------------------
 # Callback to update the Monte Carlo simulation graph.
 # ----------------------------------------------------------------------
@@ -545,38 +679,289 @@ def update_content(n_clicks, tab, ticker, interval):
     Input("num-days", "value"),
     Input("mu-input", "value"),
     Input("sigma-input", "value"),
-    State("ticker-input", "value"),
-    State("interval-input", "value")
+    State("submitted-ticker", "data"),
+    State("interval-input", "value"),
+    State("session-id", "data")
 )
-def update_montecarlo_graph(num_simulations, num_days, mu, sigma, ticker, interval):
+@instrument_callback
+@profile_callback
+def update_montecarlo_graph(num_simulations, num_days, mu, sigma, ticker, interval, session_id=None):
     if not ticker:
         return html.Div("Enter a ticker first.", style={'textAlign': 'center'})
-    return render_montecarlo_simulation(ticker, num_simulations, num_days, mu, sigma, interval)
+    return render_montecarlo_simulation(ticker, num_simulations, num_days, mu, sigma, interval, session_id)
 
 
 # ----------------------------------------------------------------------
 # Render News Feed
 # ----------------------------------------------------------------------
-def render_news_feed(ticker):
-    try:
-        news_df1 = get_news_from_newsdata(ticker)
-        news_df2 = get_news_from_newsapi(ticker)
-        df_combined = pd.concat([news_df1, news_df2]).drop_duplicates().sort_index(ascending=False)
-        return html.Div([
-            html.H3(f"Latest News for {ticker}"),
-            html.Ul([
-                html.Li(
-                    html.A(row["Title"], href=row["URL"], target="_blank")
-                )
-                for _, row in df_combined.iterrows()
-            ])
-        ])
-    except ValueError:
+def render_news_items(df):
+    return [
+        html.Li(
+            html.A(row["Title"], href=row["URL"], target="_blank")
+        )
+        for _, row in df.iterrows()
+    ]
+
+
+def render_news_feed(ticker, interval=None, session_id=None):
+    # Pull only what is newer than the stored history (unless the search already did), then serve the
+    # first page from the store.
+    if not (use_prefetch() and prefetcher.wait(session_id, "news", ticker, interval)):
+        news_store.refresh(ticker)
+    df_page = news_store.get_page(ticker, page=0, page_size=NEWS_PAGE_SIZE)
+    if df_page.empty:
         return html.Div(
             f"No news found for {ticker}.",
             style={'color': 'red', 'textAlign': 'center'}
         )
+    button_style = {
+        'padding': '6px 14px',
+        'borderRadius': '8px',
+        'border': 'none',
+        'backgroundColor': '#1DB954',
+        'color': '#FFF',
+        'fontSize': '14px',
+        'cursor': 'pointer'
+    }
+    return html.Div([
+        html.H3(f"Latest News for {ticker}"),
+        dcc.Store(id="news-page", data=0),
+        html.Ul(id="news-list", children=render_news_items(df_page)),
+        html.Div(
+            style={'display': 'flex', 'justifyContent': 'center', 'gap': '10px'},
+            children=[
+                html.Button("Newer", id="news-newer", n_clicks=0, style=button_style),
+                html.Button("Older", id="news-older", n_clicks=0, style=button_style)
+            ]
+        )
+    ])
+
+
+@app.callback(
+    Output("news-list", "children"),
+    Output("news-page", "data"),
+    Input("news-newer", "n_clicks"),
+    Input("news-older", "n_clicks"),
+    State("news-page", "data"),
+    State("submitted-ticker", "data"),
+    prevent_initial_call=True
+)
+@instrument_callback
+@profile_callback
+def update_news_page(newer_clicks, older_clicks, page, ticker):
+    # Paging reads the local store only; the news APIs are not contacted here.
+    page = page or 0
+    if ctx.triggered_id == "news-older":
+        page += 1
+    elif ctx.triggered_id == "news-newer":
+        page = max(page - 1, 0)
+    df_page = news_store.get_page(ticker, page=page, page_size=NEWS_PAGE_SIZE)
+    if df_page.empty and page > 0:
+        # Ran past the oldest stored article; stay on the last page.
+        page -= 1
+        df_page = news_store.get_page(ticker, page=page, page_size=NEWS_PAGE_SIZE)
+    return render_news_items(df_page), page
+
+
+# ----------------------------------------------------------------------
+# Live Tab
+# ----------------------------------------------------------------------
+_live_settings = get_setting("live", LIVE_DEFAULTS)
+LIVE_POLL_MS = int(_live_settings["poll_seconds"] * 1000)
+LIVE_MAX_POINTS = _live_settings["max_points"]
+
+
+def render_live_tab(ticker):
+    live_feed.subscribe(ticker)
+    live_feed.start()
+    points, last = live_feed.points(ticker)
+    times = [p["time"] for p in points]
+
+    fig = go.Figure()
+    for col in LIVE_COLUMNS:
+        fig.add_trace(go.Scatter(
+            x=times,
+            y=[p[col] for p in points],
+            mode='lines',
+            name=col,
+            yaxis='y2' if col == "RSI" else 'y',
+            line=dict(width=1 if col == "RSI" else 2, dash='dot' if col == "RSI" else None)
+        ))
+    fig.update_layout(
+        title=f"{ticker} Live",
+        template="plotly_dark",
+        plot_bgcolor="#121212",
+        paper_bgcolor="#121212",
+        font=dict(color="#E0E0E0"),
+        xaxis=dict(title="Time"),
+        yaxis=dict(title="Price"),
+        yaxis2=dict(title="RSI", overlaying='y', side='right', range=[0, 100], showgrid=False),
+        legend=dict(orientation='h', x=0.5, xanchor='center', y=1.05),
+        uirevision=ticker
+    )
+    return html.Div([
+        dcc.Graph(id="live-graph", figure=fig, style={'height': '600px'}),
+        # The browser asks for the points after the last one it has; the figure is never rebuilt.
+        dcc.Interval(id="live-interval", interval=LIVE_POLL_MS),
+        dcc.Store(id="live-cursor", data={"ticker": ticker, "seq": last})
+    ], style={'width': '100%', 'maxWidth': '1200px', 'margin': '0 auto'})
+
+
+@app.callback(
+    Output("live-graph", "extendData"),
+    Output("live-cursor", "data"),
+    Input("live-interval", "n_intervals"),
+    State("live-cursor", "data"),
+    prevent_initial_call=True
+)
+@instrument_callback
+@profile_callback
+def update_live_graph(n_intervals, cursor):
+    # Keeps the subscription alive, and restores it if the feed dropped the ticker.
+    live_feed.subscribe(cursor["ticker"])
+    points, last = live_feed.points(cursor["ticker"], after=cursor["seq"])
+    if not points:
+        return dash.no_update, dash.no_update
+    times = [p["time"] for p in points]
+    update = {
+        "x": [times] * len(LIVE_COLUMNS),
+        "y": [[p[col] for p in points] for col in LIVE_COLUMNS]
+    }
+    return (update, list(range(len(LIVE_COLUMNS))), LIVE_MAX_POINTS), {"ticker": cursor["ticker"], "seq": last}
+
+
+# ----------------------------------------------------------------------
+# Screener Tab
+# ----------------------------------------------------------------------
+SCREENER_DISPLAY_COLUMNS = ["Close", "RSI", MACD_COLUMN, BOLLINGER_LOWER_COLUMN, BOLLINGER_UPPER_COLUMN]
+
+
+def render_screener_tab():
+    dropdown_style = {
+        'width': '180px',
+        'padding': '2px',
+        'border': '1px solid #444',
+        'borderRadius': '4px',
+        'backgroundColor': '#f0f0f0',
+        'color': '#000',
+        'fontSize': '12px',
+        'textAlign': 'left'
+    }
+    inputs_row = html.Div(
+        style={
+            'display': 'flex',
+            'justifyContent': 'center',
+            'alignItems': 'center',
+            'gap': '20px',
+            'marginBottom': '20px'
+        },
+        children=[
+            dcc.Input(
+                id="screener-filter",
+                type="text",
+                debounce=True,
+                placeholder=f"e.g. Close < {BOLLINGER_LOWER_COLUMN} and Signal_RSI == Buy",
+                style={
+                    'width': '420px',
+                    'padding': '8px',
+                    'borderRadius': '8px',
+                    'border': '1px solid #444',
+                    'backgroundColor': '#1E1E1E',
+                    'color': '#E0E0E0',
+                    'fontSize': '14px'
+                }
+            ),
+            html.Div([
+                html.Label("Sort by", style={'marginRight': '5px', 'color': '#E0E0E0'}),
+                dcc.Dropdown(
+                    id="screener-sort",
+                    options=[{'label': col, 'value': col} for col in NUMERIC_COLUMNS],
+                    value="RSI",
+                    clearable=False,
+                    style=dropdown_style
+                )
+            ], style={'display': 'flex', 'alignItems': 'center'}),
+            html.Div([
+                html.Label("Order", style={'marginRight': '5px', 'color': '#E0E0E0'}),
+                dcc.Dropdown(
+                    id="screener-order",
+                    options=[{'label': 'Desc', 'value': 'desc'}, {'label': 'Asc', 'value': 'asc'}],
+                    value="desc",
+                    clearable=False,
+                    searchable=False,
+                    style={**dropdown_style, 'width': '80px'}
+                )
+            ], style={'display': 'flex', 'alignItems': 'center'}),
+            html.Div([
+                html.Label("Top", style={'marginRight': '5px', 'color': '#E0E0E0'}),
+                dcc.Dropdown(
+                    id="screener-limit",
+                    options=[{'label': str(x), 'value': x} for x in [10, 20, 50, 100]],
+                    value=20,
+                    clearable=False,
+                    searchable=False,
+                    style={**dropdown_style, 'width': '80px'}
+                )
+            ], style={'display': 'flex', 'alignItems': 'center'})
+        ]
+    )
+    header_cells = [html.Th("Ticker", style={'color': '#E0E0E0', 'textAlign': 'left'})] + [
+        html.Th(col, style={'color': '#E0E0E0', 'textAlign': 'center'})
+        for col in SCREENER_DISPLAY_COLUMNS + SIGNAL_COLUMNS
+    ]
+    results_table = html.Table(
+        style={'width': '100%', 'borderCollapse': 'collapse', 'fontSize': '13px'},
+        children=[
+            html.Thead([html.Tr(header_cells)]),
+            html.Tbody(id="screener-table-body")
+        ]
+    )
+    return html.Div(
+        style={'display': 'flex', 'flexDirection': 'column', 'alignItems': 'center'},
+        children=[inputs_row, results_table]
+    )
+
+
+@app.callback(
+    Output("screener-table-body", "children"),
+    Input("screener-filter", "value"),
+    Input("screener-sort", "value"),
+    Input("screener-order", "value"),
+    Input("screener-limit", "value")
+)
+@instrument_callback
+@profile_callback
+def update_screener(filter_text, sort_by, order, limit):
+    width = 1 + len(SCREENER_DISPLAY_COLUMNS) + len(SIGNAL_COLUMNS)
+    if len(snapshot_table) == 0:
+        return [html.Tr([html.Td("No snapshots yet. Add tickers to the watchlist or search them first.",
+                                 colSpan=width, style={'color': 'grey', 'textAlign': 'center'})])]
+    try:
+        results = snapshot_table.query(parse_filters(filter_text), sort_by=sort_by,
+                                       ascending=order == "asc", limit=limit)
+    except ValueError as e:
+        return [html.Tr([html.Td(f"Error: {e}", colSpan=width, style={'color': 'red', 'textAlign': 'center'})])]
+    if results.empty:
+        return [html.Tr([html.Td("No tickers match.", colSpan=width,
+                                 style={'color': 'grey', 'textAlign': 'center'})])]
+    return [
+        html.Tr(
+            [html.Td(ticker, style={'padding': '6px', 'fontWeight': 'bold'})]
+            + [html.Td(f"{row[col]:.2f}", style={'textAlign': 'center'}) for col in SCREENER_DISPLAY_COLUMNS]
+            + [
+                html.Td(row[col] or "-", style={
+                    'textAlign': 'center',
+                    'color': 'green' if row[col] and "Buy" in row[col] else 'red'
+                })
+                for col in SIGNAL_COLUMNS
+            ]
+        )
+        for ticker, row in results.iterrows()
+    ]
 
 
 if __name__ == "__main__":
+    import atexit
+
+    atexit.register(snapshot_table.flush)
     app.run_server(debug=True, use_reloader=False)
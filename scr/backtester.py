@@ -0,0 +1,259 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+# Position taken for each signal label; None keeps the previous position ("Hold").
+SIGNAL_POSITIONS = {
+    "Strong Buy": 1.0,
+    "Buy": 1.0,
+    "Hold": None,
+    "Sell": 0.0,
+    "Strong Sell": 0.0,
+}
+
+INDICATORS = ("sma", "ema", "rsi", "macd", "bollinger")
+DEFAULT_WINDOWS = range(1, 101)
+
+# Upper bound on the number of floats in one block of positions, to keep memory flat for long histories.
+BLOCK_ELEMENTS = 4_000_000
+
+
+def _carry_forward(positions: np.ndarray) -> np.ndarray:
+    """Replace NaN ("Hold") with the last defined position along each row; flat before the first signal."""
+    mask = np.isnan(positions)
+    idx = np.where(~mask, np.arange(positions.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    carried = np.take_along_axis(positions, idx, axis=1)
+    return np.nan_to_num(carried, nan=0.0)
+
+
+def _short_positions(positions: np.ndarray, allow_short: bool) -> np.ndarray:
+    # With shorting allowed, every flat bar (0) becomes a short (-1).
+    return positions * 2 - 1 if allow_short else positions
+
+
+def performance(close: np.ndarray, positions: np.ndarray) -> dict:
+    """
+    Evaluate many position series against one price series at once.
+
+    The position held at bar t earns the return from t to t + 1.
+
+    :param close: 1-D array of closing prices, length n
+    :param positions: 2-D array (strategies x n) of positions (1 long, 0 flat, -1 short)
+    :return: dict of 1-D arrays: total_return, max_drawdown, hit_rate and exposure per strategy
+    """
+    positions = np.atleast_2d(positions)
+    returns = np.diff(close) / close[:-1]
+    held = positions[:, :-1]
+    strategy = held * returns
+
+    equity = np.cumprod(1 + strategy, axis=1)
+    peak = np.maximum.accumulate(equity, axis=1)
+    in_market = held != 0
+    bars_in_market = in_market.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hit_rate = np.where(bars_in_market > 0, (strategy > 0).sum(axis=1) / bars_in_market, np.nan)
+
+    return {
+        "total_return": equity[:, -1] - 1 if equity.shape[1] else np.zeros(len(positions)),
+        "max_drawdown": (equity / peak - 1).min(axis=1) if equity.shape[1] else np.zeros(len(positions)),
+        "hit_rate": hit_rate,
+        "exposure": bars_in_market / max(held.shape[1], 1),
+    }
+
+
+def signal_positions(signals: pd.Series, allow_short: bool = False) -> np.ndarray:
+    """
+    Turn a TechnicalIndicators signal column into positions.
+
+    :param signals: Series of 'Strong Buy'/'Buy'/'Hold'/'Sell'/'Strong Sell' labels
+    :param allow_short: Go short on sell signals instead of flat
+    :return: 1-D array of positions
+    """
+    raw = signals.map(SIGNAL_POSITIONS).astype(float).to_numpy()[np.newaxis, :]
+    return _short_positions(_carry_forward(raw), allow_short)[0]
+
+
+def backtest_signals(data: pd.DataFrame, signal_col: str, allow_short: bool = False) -> dict:
+    """
+    Backtest one signal column of a TechnicalIndicators frame.
+
+    :param data: DataFrame with 'Close' and the signal column
+    :param signal_col: Name of the signal column (e.g. 'Signal_SMA_14')
+    :param allow_short: Go short on sell signals instead of flat
+    :return: dict with total_return, max_drawdown, hit_rate and exposure
+    """
+    positions = signal_positions(data[signal_col], allow_short)
+    result = performance(data["Close"].to_numpy(dtype=np.float64), positions)
+    return {name: float(values[0]) for name, values in result.items()}
+
+
+# ----------------------------------------------------------------------
+# Indicator grids. Each yields (parameter rows, position block) so long
+# histories are processed a block of windows at a time.
+# ----------------------------------------------------------------------
+def _blocks(items, n):
+    size = max(1, BLOCK_ELEMENTS // max(n, 1))
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _rolling_sums(values: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """Rolling sums for many windows at once (windows x n), NaN until each window is full."""
+    n = len(values)
+    cs = np.concatenate(([0.0], np.cumsum(values)))
+    t = np.arange(n)
+    start = t[np.newaxis, :] + 1 - windows[:, np.newaxis]
+    sums = cs[t + 1][np.newaxis, :] - cs[np.clip(start, 0, None)]
+    sums[start < 0] = np.nan
+    return sums
+
+
+def _ema(values: np.ndarray, span: int) -> np.ndarray:
+    """Same as pandas ``ewm(span=span, adjust=False).mean()`` along the last axis."""
+    alpha = 2 / (span + 1)
+    values = np.atleast_2d(values)
+    zi = (1 - alpha) * values[:, :1]
+    return lfilter([alpha], [1, alpha - 1], values, axis=1, zi=zi)[0]
+
+
+def _sma_grid(close, windows):
+    for block in _blocks(windows, len(close)):
+        sma = _rolling_sums(close, np.asarray(block)) / np.asarray(block)[:, np.newaxis]
+        yield [(w, None) for w in block], (close > sma).astype(float)
+
+
+def _ema_grid(close, windows):
+    for block in _blocks(windows, len(close)):
+        ema = np.vstack([_ema(close, w) for w in block])
+        yield [(w, None) for w in block], (close > ema).astype(float)
+
+
+def _rsi_grid(close, windows):
+    delta = np.concatenate(([0.0], np.diff(close)))
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    for block in _blocks(windows, len(close)):
+        w = np.asarray(block)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rs = _rolling_sums(gains, w) / _rolling_sums(losses, w)
+            rsi = 100 - 100 / (1 + rs)
+        positions = np.full(rsi.shape, np.nan)
+        # Same thresholds as TechnicalIndicators.relative_strength_index.
+        positions[rsi < 40] = 1.0
+        positions[rsi > 60] = 0.0
+        yield [(v, None) for v in block], _carry_forward(positions)
+
+
+def _bollinger_grid(close, windows, num_std_dev=2):
+    # Centre the prices before summing squares to limit cancellation in the variance.
+    centred = close - close.mean()
+    for block in _blocks(windows, len(close)):
+        w = np.asarray(block)[:, np.newaxis]
+        s1 = _rolling_sums(centred, w[:, 0])
+        s2 = _rolling_sums(centred ** 2, w[:, 0])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = s1 / w
+            # Sample standard deviation (ddof=1), undefined for a single-bar window as in pandas.
+            std = np.where(w > 1, np.sqrt(np.clip((s2 - s1 * mean) / (w - 1), 0, None)), np.nan)
+        positions = np.full(s1.shape, np.nan)
+        positions[centred < mean - num_std_dev * std] = 1.0
+        positions[centred > mean + num_std_dev * std] = 0.0
+        yield [(v, None) for v in block], _carry_forward(positions)
+
+
+def _macd_grid(close, windows, signal_window=9):
+    emas = {w: _ema(close, w) for w in windows}
+    pairs = [(s, l) for s in windows for l in windows if s < l]
+    for block in _blocks(pairs, len(close)):
+        macd = np.vstack([emas[s] - emas[l] for s, l in block])
+        signal = _ema(macd, signal_window)
+        yield block, (macd > signal).astype(float)
+
+
+_GRIDS = {
+    "sma": _sma_grid,
+    "ema": _ema_grid,
+    "rsi": _rsi_grid,
+    "macd": _macd_grid,
+    "bollinger": _bollinger_grid,
+}
+
+
+def sweep_close(close: np.ndarray, indicators=INDICATORS, windows=DEFAULT_WINDOWS,
+                allow_short: bool = False) -> pd.DataFrame:
+    """
+    Backtest every window of every indicator on one price series.
+
+    :param close: 1-D array of closing prices
+    :param indicators: Subset of INDICATORS to sweep
+    :param windows: Windows to try (MACD uses every short < long pair of them)
+    :param allow_short: Go short on sell signals instead of flat
+    :return: DataFrame with indicator, window, long_window and the metric columns
+    """
+    close = np.asarray(close, dtype=np.float64)
+    windows = list(windows)
+    frames = []
+    for indicator in indicators:
+        if indicator not in _GRIDS:
+            raise ValueError(f"Unknown indicator '{indicator}'. Choose from {', '.join(INDICATORS)}.")
+        for params, positions in _GRIDS[indicator](close, windows):
+            result = performance(close, _short_positions(positions, allow_short))
+            frame = pd.DataFrame(result)
+            frame.insert(0, "indicator", indicator)
+            frame.insert(1, "window", [p[0] for p in params])
+            frame.insert(2, "long_window", pd.array([p[1] for p in params], dtype="Int64"))
+            frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _sweep_task(args):
+    ticker, close, indicators, windows, allow_short = args
+    frame = sweep_close(close, indicators, windows, allow_short)
+    frame.insert(0, "ticker", ticker)
+    return frame
+
+
+def sweep(data: dict, indicators=INDICATORS, windows=DEFAULT_WINDOWS, allow_short: bool = False,
+          max_workers: int = None) -> pd.DataFrame:
+    """
+    Run the full parameter grid for many tickers, one ticker per worker process.
+
+    :param data: dict of ticker -> DataFrame with a 'Close' column (or a Series/array of closes)
+    :param indicators: Subset of INDICATORS to sweep
+    :param windows: Windows to try for each indicator
+    :param allow_short: Go short on sell signals instead of flat
+    :param max_workers: Worker processes (defaults to the CPU count); 1 runs in-process
+    :return: DataFrame with one row per ticker, indicator and parameter set
+    """
+    tasks = []
+    for ticker, frame in data.items():
+        close = frame["Close"] if isinstance(frame, pd.DataFrame) else frame
+        # Only the price array crosses the process boundary.
+        tasks.append((ticker, np.asarray(close, dtype=np.float64), tuple(indicators), list(windows), allow_short))
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(tasks) <= 1:
+        frames = [_sweep_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+            frames = list(pool.map(_sweep_task, tasks))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+# Quick test
+if __name__ == "__main__":
+    from scr.data_handler import DataHandler
+
+    dh = DataHandler()
+    histories = {}
+    for symbol in ["AAPL", "MSFT"]:
+        df = dh.fetch_stock_data(symbol, period="2y")
+        if isinstance(df, pd.DataFrame):
+            histories[symbol] = df
+
+    results = sweep(histories)
+    print(results.sort_values("total_return", ascending=False).head(10))
@@ -0,0 +1,335 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+BAR_STORE_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "bars")
+
+COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+# Intervals kept on disk; everything coarser is derived from one of them. Each is downloaded on its own
+# because Yahoo serves finer bars for shorter periods (7 days of 1m, 60 of 5m, 730 of 1h).
+BASE_INTERVALS = ("1m", "5m", "1h", "1d")
+
+# Derived interval -> (base interval, bucket kind, bucket size).
+DERIVED_INTERVALS = {
+    "15m": ("5m", "fixed", pd.Timedelta(minutes=15)),
+    "30m": ("5m", "fixed", pd.Timedelta(minutes=30)),
+    "1wk": ("1d", "week", 1),
+    "1mo": ("1d", "month", 1),
+    "3mo": ("1d", "month", 3),
+}
+
+
+def base_interval(interval: str):
+    """Return the stored interval an interval is read from, or None if it is not served by the store."""
+    if interval in BASE_INTERVALS:
+        return interval
+    if interval in DERIVED_INTERVALS:
+        return DERIVED_INTERVALS[interval][0]
+    return None
+
+
+def _utc(value) -> pd.Timestamp:
+    """Convert a timestamp to UTC; naive values are taken to be UTC already."""
+    value = pd.Timestamp(value)
+    return value.tz_localize("UTC") if value.tz is None else value.tz_convert("UTC")
+
+
+def _bucket_keys(timestamps: np.ndarray, tz: str, kind: str, size):
+    """Map int64 UTC nanosecond timestamps to monotonically increasing bucket numbers."""
+    if kind == "fixed":
+        return timestamps // size.value
+    # Calendar buckets follow the exchange's wall clock, like Yahoo's own weekly/monthly bars.
+    local = pd.DatetimeIndex(timestamps.view("datetime64[ns]")).tz_localize("UTC").tz_convert(tz)
+    days = local.tz_localize(None).to_numpy().astype("datetime64[D]").astype(np.int64)
+    if kind == "week":
+        # 1970-01-01 was a Thursday; shift so that weeks start on Monday.
+        return (days + 3) // 7
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return months // size
+
+
+def _bucket_labels(first_timestamps: np.ndarray, tz: str, kind: str, size):
+    """Label each bucket with its start, as a timezone-aware index."""
+    if kind == "fixed":
+        first_timestamps = first_timestamps // size.value * size.value
+    index = pd.DatetimeIndex(first_timestamps.view("datetime64[ns]")).tz_localize("UTC").tz_convert(tz)
+    if kind == "fixed":
+        return index
+    naive = index.tz_localize(None).normalize()
+    if kind == "week":
+        naive = naive - pd.to_timedelta(naive.dayofweek, unit="D")
+    else:
+        month0 = (naive.month - 1) // size * size + 1
+        naive = pd.to_datetime({"year": naive.year, "month": month0, "day": 1})
+    return pd.DatetimeIndex(naive).tz_localize(tz)
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive lock on a lock file, held across processes (batch workers, multi-worker servers)."""
+    with open(path, "a+b") as file:
+        if os.name == "nt":
+            import msvcrt
+
+            file.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after about 10 seconds; keep waiting like flock does.
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class BarStore:
+    def __init__(self, root: str = BAR_STORE_PATH):
+        """
+        Columnar on-disk store of OHLCV bars, one ``.npy`` file per column per ticker and interval.
+        Reads are memory-mapped, so slicing years of minute bars does not load them into RAM.
+
+        Every append writes a new generation of files and then points ``meta.json`` at it, so files that
+        readers have mapped are never overwritten (which Windows refuses). Older generations are deleted
+        once nothing maps them. Appends and reads take a per-series lock file as well as a thread lock,
+        so several processes can share the store.
+
+        :param root: Directory holding the store
+        """
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _dir(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, ticker.upper(), interval)
+
+    @contextmanager
+    def _lock(self, ticker: str, interval: str):
+        with self._locks_guard:
+            lock = self._locks.setdefault((ticker.upper(), interval), threading.Lock())
+        directory = self._dir(ticker, interval)
+        os.makedirs(directory, exist_ok=True)
+        with lock, file_lock(os.path.join(directory, ".lock")):
+            yield
+
+    @staticmethod
+    def _array_path(directory: str, name: str, generation) -> str:
+        # Series written before generations were introduced have a single unnumbered set of files.
+        return os.path.join(directory, f"{name}.npy" if generation is None else f"{name}.{generation}.npy")
+
+    def _read_meta(self, directory: str) -> dict:
+        path = os.path.join(directory, "meta.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as file:
+            return json.load(file)
+
+    @staticmethod
+    def _tmp_path(directory: str, name: str) -> str:
+        return os.path.join(directory, f".{name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+
+    def _write_array(self, directory: str, name: str, generation: int, values: np.ndarray):
+        tmp_path = self._tmp_path(directory, name) + ".npy"
+        np.save(tmp_path, values)
+        os.replace(tmp_path, self._array_path(directory, name, generation))
+
+    def _write_meta(self, directory: str, meta: dict):
+        tmp_path = self._tmp_path(directory, "meta")
+        with open(tmp_path, "w") as file:
+            json.dump(meta, file)
+        os.replace(tmp_path, os.path.join(directory, "meta.json"))
+
+    @staticmethod
+    def _remove_old_generations(directory: str, generation: int):
+        current = f".{generation}.npy"
+        for name in os.listdir(directory):
+            if name.endswith(".npy") and not name.startswith(".") and not name.endswith(current):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    # Still mapped by a reader (Windows); removed by a later append.
+                    pass
+
+    def meta(self, ticker: str, interval: str) -> dict:
+        """Return the stored metadata (timezone, row count, last fetch time) for a series."""
+        return self._read_meta(self._dir(ticker, interval))
+
+    def append(self, ticker: str, interval: str, df: pd.DataFrame, covered_from: pd.Timestamp = None,
+               full_history: bool = False) -> int:
+        """
+        Merge bars into the store. Rows with timestamps already stored are replaced by the new values.
+
+        :param ticker: Stock ticker symbol
+        :param interval: One of BASE_INTERVALS
+        :param df: DataFrame with OHLCV columns and a DatetimeIndex
+        :param covered_from: Start of the period the bars were requested for
+        :param full_history: The bars were requested for period 'max', so nothing older exists upstream
+        :return: Number of rows stored after the merge
+        """
+        if interval not in BASE_INTERVALS:
+            raise ValueError(f"Only {', '.join(BASE_INTERVALS)} bars are stored; '{interval}' is derived.")
+        missing = [col for col in COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Data is missing columns: {', '.join(missing)}")
+
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else "UTC"
+        new_ts = (index.tz_convert("UTC") if index.tz is not None else index).as_unit("ns").asi8
+        directory = self._dir(ticker, interval)
+
+        with self._lock(ticker, interval):
+            meta = self._read_meta(directory)
+            old_generation = meta.get("generation")
+            generation = (old_generation or 0) + 1
+            if meta.get("rows"):
+                old_ts = np.load(self._array_path(directory, "ts", old_generation))
+                keep = ~np.isin(old_ts, new_ts)
+                merged_ts = np.concatenate([old_ts[keep], new_ts])
+            else:
+                keep = None
+                merged_ts = new_ts
+            order = np.argsort(merged_ts, kind="stable")
+
+            for col in COLUMNS:
+                new_values = df[col].to_numpy(dtype=np.float64)
+                if keep is not None:
+                    old_values = np.load(self._array_path(directory, col, old_generation))
+                    new_values = np.concatenate([old_values[keep], new_values])
+                self._write_array(directory, col, generation, new_values[order])
+            self._write_array(directory, "ts", generation, merged_ts[order])
+
+            previous_from = meta.get("covered_from")
+            covered = _utc(covered_from if covered_from is not None else merged_ts[order][0])
+            if previous_from is not None:
+                covered = min(covered, pd.Timestamp(previous_from))
+            meta = {
+                "tz": meta.get("tz", tz),
+                "rows": int(len(merged_ts)),
+                "fetched_at": time.time(),
+                "covered_from": covered.isoformat(),
+                "full_history": full_history or meta.get("full_history", False),
+                "last": _utc(int(merged_ts[order][-1])).isoformat(),
+                "generation": generation,
+            }
+            # Switching meta.json over is what publishes the new generation to readers.
+            self._write_meta(directory, meta)
+            self._remove_old_generations(directory, generation)
+        return meta["rows"]
+
+    def touch(self, ticker: str, interval: str):
+        """Mark a stored series as checked now without new bars (e.g. an empty top-up over a weekend)."""
+        directory = self._dir(ticker, interval)
+        if not os.path.exists(os.path.join(directory, "meta.json")):
+            return
+        with self._lock(ticker, interval):
+            meta = self._read_meta(directory)
+            if meta:
+                meta["fetched_at"] = time.time()
+                self._write_meta(directory, meta)
+
+    def _columns(self, ticker: str, interval: str, start=None, end=None):
+        """Memory-mapped column slices between start (inclusive) and end (exclusive)."""
+        directory = self._dir(ticker, interval)
+        if not os.path.exists(os.path.join(directory, "meta.json")):
+            raise ValueError(f"No stored '{interval}' bars for ticker '{ticker}'.")
+        # Map every column under the writer's lock so they all come from the same append.
+        with self._lock(ticker, interval):
+            meta = self._read_meta(directory)
+            if not meta.get("rows"):
+                raise ValueError(f"No stored '{interval}' bars for ticker '{ticker}'.")
+            generation = meta.get("generation")
+            ts = np.load(self._array_path(directory, "ts", generation), mmap_mode="r")
+            columns = {col: np.load(self._array_path(directory, col, generation), mmap_mode="r")
+                       for col in COLUMNS}
+        # Binary search on the sorted timestamps; the slices below are views, not copies.
+        lo = 0 if start is None else int(np.searchsorted(ts, _utc(start).value))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, _utc(end).value))
+        return ts[lo:hi], {col: values[lo:hi] for col, values in columns.items()}, meta["tz"]
+
+    def load(self, ticker: str, interval: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Read stored bars as a DataFrame whose columns are views of the memory-mapped files.
+
+        :param ticker: Stock ticker symbol
+        :param interval: One of BASE_INTERVALS
+        :param start: First timestamp to include (naive values are taken as UTC)
+        :param end: Timestamp to stop before
+        :return: Read-only OHLCV DataFrame indexed by time in the exchange timezone
+        """
+        ts, columns, tz = self._columns(ticker, interval, start, end)
+        index = pd.DatetimeIndex(np.asarray(ts).view("datetime64[ns]")).tz_localize("UTC").tz_convert(tz)
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def resample(self, ticker: str, interval: str, start=None, end=None) -> pd.DataFrame:
+        """
+        Build coarser bars from the stored base bars.
+
+        :param ticker: Stock ticker symbol
+        :param interval: A key of DERIVED_INTERVALS (or a base interval, which is returned as stored)
+        :param start: First timestamp to include
+        :param end: Timestamp to stop before
+        :return: OHLCV DataFrame
+        """
+        if interval in BASE_INTERVALS:
+            return self.load(ticker, interval, start, end)
+        if interval not in DERIVED_INTERVALS:
+            raise ValueError(f"Interval '{interval}' cannot be derived from stored bars.")
+
+        base, kind, size = DERIVED_INTERVALS[interval]
+        ts, columns, tz = self._columns(ticker, base, start, end)
+        if len(ts) == 0:
+            return pd.DataFrame(columns=list(COLUMNS), dtype=np.float64)
+
+        keys = _bucket_keys(np.asarray(ts), tz, kind, size)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+        ends = np.concatenate((starts[1:], [len(ts)])) - 1
+
+        resampled = {
+            "Open": columns["Open"][starts],
+            "High": np.maximum.reduceat(columns["High"], starts),
+            "Low": np.minimum.reduceat(columns["Low"], starts),
+            "Close": columns["Close"][ends],
+            "Volume": np.add.reduceat(columns["Volume"], starts),
+        }
+        index = _bucket_labels(np.asarray(ts)[starts], tz, kind, size)
+        return pd.DataFrame(resampled, index=index)
+
+
+def period_start(period: str, end: pd.Timestamp):
+    """
+    Translate a Yahoo-style period ('7d', '3mo', '1y', 'ytd', 'max') into its start time.
+
+    :param period: Period string
+    :param end: End of the period (timezone-aware)
+    :return: pd.Timestamp, or None for 'max'
+    """
+    if period == "max":
+        return None
+    if period == "ytd":
+        return end.normalize().replace(month=1, day=1)
+    for suffix, unit in (("mo", "months"), ("wk", "weeks"), ("d", "days"), ("y", "years")):
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return end - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period '{period}'.")
+
+
+# Shared store used by DataHandler.
+bar_store = BarStore()
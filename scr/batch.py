@@ -0,0 +1,270 @@
+"""
+Headless batch runner: indicator snapshot and Monte Carlo forecast for a list of tickers, without Dash.
+
+    python -m scr.batch AAPL MSFT GOOGL --output reports/nightly.csv
+    python -m scr.batch --tickers-file universe.txt --output reports/nightly.parquet --workers 8
+
+Rows are written as tickers finish, so an interrupted run picks up where it stopped: tickers already in
+the output are skipped (``--retry-errors`` also reruns the ones that failed and replaces their rows).
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from scr.analytics import DEFAULT_FORECAST_PARAMS, indicator_snapshot, montecarlo_forecast
+from scr.cache import analytics_cache, bar_cache
+from scr.config import get_setting
+from scr.fetch_scheduler import FETCH_DEFAULTS, TokenBucket, fetch_scheduler
+from scr.screener import NUMERIC_COLUMNS, SIGNAL_COLUMNS
+
+FIELDS = (["ticker", "status", "error", "as_of"] + NUMERIC_COLUMNS + SIGNAL_COLUMNS
+          + ["forecast_days", "forecast_min", "forecast_max"])
+
+
+def read_tickers(tickers=(), tickers_file: str = None):
+    """Yield tickers from the command line, then from a file (one per line, '#' starts a comment)."""
+    seen = set()
+    for ticker in tickers:
+        if ticker.upper() not in seen:
+            seen.add(ticker.upper())
+            yield ticker.upper()
+    if tickers_file:
+        with open(tickers_file, "r") as file:
+            for line in file:
+                ticker = line.split("#", 1)[0].strip().upper()
+                if ticker and ticker not in seen:
+                    seen.add(ticker)
+                    yield ticker
+
+
+def analyze_ticker(ticker: str, period: str = "1y", interval: str = "1d",
+                   num_simulations: int = 1000, num_days: int = 30) -> dict:
+    """
+    Compute the report row of one ticker. Failures are reported in the row instead of raised.
+
+    :return: dict keyed by FIELDS
+    """
+    row = dict.fromkeys(FIELDS)
+    row.update(ticker=ticker, forecast_days=num_days)
+    try:
+        snapshot = indicator_snapshot(ticker, interval=interval, period=period)
+        forecast = montecarlo_forecast(ticker, interval=interval, period=period,
+                                       num_simulations=num_simulations, num_days=num_days)
+        row.update({col: snapshot.get(col) for col in NUMERIC_COLUMNS + SIGNAL_COLUMNS})
+        row.update(status="ok", as_of=str(snapshot.name),
+                   forecast_min=float(forecast["simulated_min"][-1]),
+                   forecast_max=float(forecast["simulated_max"][-1]))
+    except Exception as e:
+        row.update(status="error", error=str(e))
+    finally:
+        # Nothing is reused across tickers, so keep each worker's memory flat.
+        bar_cache.invalidate()
+        analytics_cache.invalidate()
+    return row
+
+
+def _analyze_task(args):
+    return analyze_ticker(*args)
+
+
+def _init_worker(rate_per_second: float, burst: float):
+    # Each worker has its own scheduler; split the configured rate so the pool as a whole respects it.
+    fetch_scheduler.bucket = TokenBucket(rate_per_second, burst)
+
+
+class CSVReport:
+    def __init__(self, path: str):
+        """Append-only CSV report, flushed after every row."""
+        self.path = path
+
+    def done(self, retry_errors: bool = False) -> set:
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return set()
+        df = pd.read_csv(self.path, usecols=["ticker", "status"])
+        if retry_errors:
+            df = df[df["status"] == "ok"]
+        return set(df["ticker"])
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, "a", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS)
+        if new_file:
+            self._writer.writeheader()
+        return self
+
+    def write(self, row: dict):
+        self._writer.writerow(row)
+        self._file.flush()
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+    def compact(self):
+        """Keep only the last row of every ticker (e.g. the retry of a failed one)."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        # Read everything as text so the rows that are kept are written back unchanged.
+        df = pd.read_csv(self.path, dtype=str, keep_default_na=False)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp.csv")
+        os.close(fd)
+        df.drop_duplicates("ticker", keep="last").to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+
+class ParquetReport:
+    def __init__(self, path: str, chunk_rows: int = 500):
+        """
+        Parquet report written as a directory of part files, one per ``chunk_rows`` rows, so it can be
+        appended to across runs and read back with ``pd.read_parquet(path)``. Needs pyarrow.
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet output needs pyarrow (pip install pyarrow); use a .csv output instead.")
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self._rows = []
+
+    def done(self, retry_errors: bool = False) -> set:
+        if not os.path.isdir(self.path) or not os.listdir(self.path):
+            return set()
+        df = pd.read_parquet(self.path, columns=["ticker", "status"])
+        if retry_errors:
+            df = df[df["status"] == "ok"]
+        return set(df["ticker"])
+
+    def __enter__(self):
+        os.makedirs(self.path, exist_ok=True)
+        return self
+
+    def _flush(self):
+        if not self._rows:
+            return
+        part = os.path.join(self.path, f"part-{time.time_ns()}.parquet")
+        pd.DataFrame(self._rows, columns=FIELDS).to_parquet(part, index=False)
+        self._rows = []
+
+    def write(self, row: dict):
+        self._rows.append(row)
+        if len(self._rows) >= self.chunk_rows:
+            self._flush()
+
+    def __exit__(self, *exc):
+        self._flush()
+
+    def compact(self):
+        """Keep only the last row of every ticker, rewritten as a single part file."""
+        if not os.path.isdir(self.path) or not os.listdir(self.path):
+            return
+        parts = [os.path.join(self.path, name) for name in os.listdir(self.path)]
+        df = pd.read_parquet(self.path)
+        self._rows = df.drop_duplicates("ticker", keep="last").to_dict("records")
+        self._flush()
+        for part in parts:
+            os.remove(part)
+
+
+def open_report(path: str):
+    """Pick the report writer from the output extension."""
+    return ParquetReport(path) if path.endswith(".parquet") else CSVReport(path)
+
+
+def run(tickers, report, period: str = "1y", interval: str = "1d", num_simulations: int = 1000,
+        num_days: int = 30, workers: int = None, max_in_flight: int = None, retry_errors: bool = False,
+        log=sys.stderr) -> dict:
+    """
+    Analyze tickers across a process pool and write each row as soon as it is ready.
+
+    :param tickers: Iterable of tickers; consumed lazily, so it can be a large file
+    :param report: CSVReport or ParquetReport
+    :param workers: Worker processes (defaults to the CPU count); 1 runs in-process
+    :param max_in_flight: Tickers submitted but not yet written (defaults to 2 x workers)
+    :param retry_errors: Rerun tickers whose previous row failed; their new row replaces the failed one
+    :return: dict with the number of rows written, failures and skipped tickers
+    """
+    done = report.done(retry_errors)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    stats = {"written": 0, "errors": 0, "skipped": 0}
+
+    def pending():
+        for ticker in tickers:
+            if ticker in done:
+                stats["skipped"] += 1
+            else:
+                yield ticker
+
+    def record(row):
+        report.write(row)
+        stats["written"] += 1
+        stats["errors"] += row["status"] != "ok"
+        print(f"[{stats['written']}] {row['ticker']} {row['status']} {row['error'] or ''}".rstrip(), file=log)
+
+    with report:
+        if workers == 1:
+            for ticker in pending():
+                record(analyze_ticker(ticker, period, interval, num_simulations, num_days))
+        else:
+            fetch_settings = get_setting("fetch", FETCH_DEFAULTS)
+            # Spawned workers start with fresh scheduler threads and caches instead of forked copies.
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(fetch_settings["rate_per_second"] / workers,
+                                               max(1.0, fetch_settings["burst"] / workers))) as pool:
+                in_flight = set()
+                for ticker in pending():
+                    in_flight.add(pool.submit(_analyze_task, (ticker, period, interval, num_simulations, num_days)))
+                    if len(in_flight) >= max_in_flight:
+                        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            record(future.result())
+                for future in wait(in_flight).done:
+                    record(future.result())
+    if retry_errors:
+        # The rerun tickers now have a newer row; drop the failed one before it.
+        report.compact()
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Indicator snapshots and Monte Carlo forecasts for many tickers.")
+    parser.add_argument("tickers", nargs="*", help="Ticker symbols.")
+    parser.add_argument("--tickers-file", help="File with one ticker per line.")
+    parser.add_argument("--output", required=True, help="Report path (.csv, or .parquet for a Parquet directory).")
+    parser.add_argument("--period", default="1y", help="History period (default 1y).")
+    parser.add_argument("--interval", default="1d", help="Data interval (default 1d).")
+    parser.add_argument("--num-simulations", type=int, default=DEFAULT_FORECAST_PARAMS["num_simulations"])
+    parser.add_argument("--num-days", type=int, default=DEFAULT_FORECAST_PARAMS["num_days"])
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Tickers queued in the pool at once (default: 2 x workers).")
+    parser.add_argument("--retry-errors", action="store_true", help="Rerun tickers that failed in a previous run.")
+    args = parser.parse_args(argv)
+
+    if not args.tickers and not args.tickers_file:
+        parser.error("give tickers or --tickers-file")
+    try:
+        report = open_report(args.output)
+    except ValueError as e:
+        parser.error(str(e))
+
+    stats = run(read_tickers(args.tickers, args.tickers_file), report, period=args.period, interval=args.interval,
+                num_simulations=args.num_simulations, num_days=args.num_days, workers=args.workers,
+                max_in_flight=args.max_in_flight, retry_errors=args.retry_errors)
+    print(f"Wrote {stats['written']} rows ({stats['errors']} failed), skipped {stats['skipped']} already done.",
+          file=sys.stderr)
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+from scr.config import get_setting
+from scr.metrics import record_cache
+
+CACHE_DEFAULTS = {
+    "bar_ttl_seconds": 60,
+    "analytics_ttl_seconds": 300,
+    "unknown_symbol_ttl_seconds": 900,
+    "max_entries": 1024,
+}
+
+
+class TTLCache:
+    def __init__(self, name: str, ttl: float = 60, max_entries: int = 1024):
+        """
+        Thread-safe in-memory cache with per-entry expiry and LRU eviction.
+
+        :param name: Cache name used in the hit/miss metrics
+        :param ttl: Default time-to-live of an entry in seconds
+        :param max_entries: Maximum number of entries kept before the least recently used is dropped
+        """
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        """Return a live entry, or default when it is missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        record_cache(self.name, hit=entry is not None)
+        return default if entry is None else entry[2]
+
+    def set(self, key, value, ttl: float = None):
+        """Store a value for ttl seconds (the cache default when omitted)."""
+        now = time.monotonic()
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (now + ttl, now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def age(self, key):
+        """Seconds since the entry was stored, or None if it is missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] <= now:
+            return None
+        return now - entry[1]
+
+    def values(self):
+        """Snapshot of the live (unexpired) values."""
+        now = time.monotonic()
+        with self._lock:
+            return [entry[2] for entry in self._entries.values() if entry[0] > now]
+
+    def invalidate(self, key=None):
+        """Drop one entry, or everything when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_settings = get_setting("cache", CACHE_DEFAULTS)
+
+# Raw OHLCV frames keyed by (ticker, period, interval).
+bar_cache = TTLCache("bars", ttl=_settings["bar_ttl_seconds"], max_entries=_settings["max_entries"])
+# Indicator snapshots and Monte Carlo forecasts.
+analytics_cache = TTLCache("analytics", ttl=_settings["analytics_ttl_seconds"], max_entries=_settings["max_entries"])
+# Error messages of lookups that returned no data, keyed like bar_cache, so bad symbols are not re-queried.
+unknown_symbol_cache = TTLCache("unknown_symbols", ttl=_settings["unknown_symbol_ttl_seconds"],
+                                max_entries=_settings["max_entries"])
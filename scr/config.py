@@ -0,0 +1,29 @@
+import json
+import os
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.json")
+
+
+def load_config(config_path=CONFIG_PATH) -> dict:
+    """Load the whole JSON config file as a dict."""
+    try:
+        with open(config_path, "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Config file '{config_path}' not found.")
+    except json.JSONDecodeError:
+        raise ValueError(f"Error decoding '{config_path}'. Ensure it's valid JSON.")
+
+
+def get_setting(section: str, defaults: dict, config_path=CONFIG_PATH) -> dict:
+    """
+    Read one section of the config file, filling in defaults for missing keys.
+    :param section: str Top-level key in config.json
+    :param defaults: dict Default values for the section
+    :return: dict Merged settings
+    """
+    try:
+        values = load_config(config_path).get(section) or {}
+    except FileNotFoundError:
+        values = {}
+    return {**defaults, **values}
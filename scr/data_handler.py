@@ -1,34 +1,204 @@
-import yfinance as yf
+import logging
+import time
+
+import numpy as np
 import pandas as pd
 
+from scr.bar_store import bar_store as shared_bar_store, base_interval, period_start
+from scr.cache import bar_cache, unknown_symbol_cache
+from scr.config import get_setting
+from scr.fetch_scheduler import INTERACTIVE, NoDataError, fetch_scheduler
+from scr.metrics import registry, span, BAR_CACHE_BYTES
+from scr.symbols import symbol_index
+
+logger = logging.getLogger(__name__)
+
+# Columns the analytics use; anything else yfinance returns (Dividends, Stock Splits, ...) is dropped.
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+DATA_DEFAULTS = {
+    "float32": False,
+    # Seconds before stored bars are topped up from Yahoo Finance again.
+    "store_max_age_seconds": 300,
+}
+
+# Longest period Yahoo serves per request for a stored base interval; older bars accumulate in the store.
+UPSTREAM_MAX_PERIOD = {"1m": "7d", "5m": "60d", "1h": "730d"}
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Memory footprint of a frame's columns and index in bytes."""
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+def normalize_bars(df: pd.DataFrame, float32: bool = False) -> pd.DataFrame:
+    """
+    Bring bars to the layout the analytics expect: only the OHLCV columns, all float64 (or float32),
+    on a sorted, duplicate-free datetime64[ns] index.
+
+    :param df: DataFrame from yfinance, the fetch scheduler or the bar store
+    :param float32: Downcast the columns to float32, halving their size (about 7 significant digits)
+    :return: Normalized DataFrame (the input itself when it already matches)
+    """
+    dtype = np.float32 if float32 else np.float64
+    columns = [col for col in BAR_COLUMNS if col in df.columns]
+    index = df.index
+    if (list(df.columns) == columns and all(df[col].dtype == dtype for col in columns)
+            and isinstance(index, pd.DatetimeIndex) and index.unit == "ns"
+            and index.is_monotonic_increasing and index.is_unique):
+        return df
+
+    index = pd.DatetimeIndex(index).as_unit("ns")
+    df = pd.DataFrame({col: df[col].to_numpy(dtype=dtype, copy=False) for col in columns}, index=index, copy=False)
+    if not index.is_monotonic_increasing:
+        df = df.sort_index(kind="stable")
+    if not df.index.is_unique:
+        df = df[~df.index.duplicated(keep="last")]
+    return df
+
+
+def topup_period(last: pd.Timestamp, now: pd.Timestamp, upstream_period: str) -> str:
+    """
+    Shortest Yahoo period reaching back to the last stored bar (plus a day, since intraday requests
+    start at midnight), or upstream_period when that is shorter.
+    """
+    days = int(np.ceil((now - last) / pd.Timedelta(days=1))) + 1
+    upstream_start = period_start(upstream_period, now)
+    if upstream_start is None or now - pd.Timedelta(days=days) > upstream_start:
+        return f"{days}d"
+    return upstream_period
+
+
+def _collect_bar_cache_bytes(metrics):
+    frames = [value for value in bar_cache.values() if isinstance(value, pd.DataFrame)]
+    metrics.set_gauge(BAR_CACHE_BYTES, sum(frame_nbytes(frame) for frame in frames))
+
+
+registry.add_collector(_collect_bar_cache_bytes)
+
 
 class DataHandler:
-    def __init__(self):
-        """Initialize DataHandler"""
-        pass
+    def __init__(self, bar_store=None, scheduler=None, priority: int = INTERACTIVE, symbols=None,
+                 float32: bool = None, store_max_age: float = None):
+        """
+        Initialize DataHandler
 
-    def fetch_stock_data(self, ticker: str, period: str = "1y", interval: str = "1d"):
+        :param bar_store: BarStore used for stored/derived intervals (defaults to the shared store)
+        :param scheduler: FetchScheduler downloads go through (defaults to the shared scheduler)
+        :param priority: Scheduler lane for this handler's downloads (INTERACTIVE or BACKGROUND)
+        :param symbols: SymbolIndex used to reject unknown tickers (defaults to the shared index)
+        :param float32: Return float32 bars (defaults to 'data.float32' in config.json)
+        :param store_max_age: Seconds before stored bars are topped up (defaults to
+            'data.store_max_age_seconds' in config.json)
+        """
+        self.bar_store = bar_store if bar_store is not None else shared_bar_store
+        self.scheduler = scheduler if scheduler is not None else fetch_scheduler
+        self.priority = priority
+        self.symbols = symbols if symbols is not None else symbol_index
+        settings = get_setting("data", DATA_DEFAULTS)
+        self.float32 = float32 if float32 is not None else settings["float32"]
+        self.store_max_age = store_max_age if store_max_age is not None else settings["store_max_age_seconds"]
+
+    def fetch_stock_data(self, ticker: str, period: str = "1y", interval: str = "1d", refresh: bool = False,
+                         ttl: float = None):
         """
         Fetch historical stock data using Yahoo Finance.
+        Results are kept in the shared bar cache, so repeated calls within its TTL are served locally.
+        Tickers missing from the symbol index, and lookups that recently returned no data, fail without
+        a network request.
+        Intervals the bar store can derive (e.g. '15m', '30m', '1wk', '1mo') are resampled from stored
+        '5m'/'1d' bars instead of being downloaded separately.
+        Frames are normalized to OHLCV columns on a datetime64[ns] index (see normalize_bars).
 
         :param ticker: Stock ticker symbol (e.g., 'AAPL')
         :param period: Time period (e.g., '1y', '6mo', '3mo')
         :param interval: Data interval (e.g., '1d', '1h', '5m')
-        :return: DataFrame with stock data or an error message
+        :param refresh: Skip the cache and always fetch from Yahoo Finance
+        :param ttl: Seconds to keep the bars in the cache (bar cache default when omitted)
+        :return: DataFrame with Open, High, Low, Close and Volume, or an error message
         """
+        key = (ticker, period, interval)
+        if not refresh:
+            cached = bar_cache.get(key)
+            if cached is not None:
+                return cached
+            unknown = unknown_symbol_cache.get(key)
+            if unknown is not None:
+                return {"error": unknown}
+
+        if not self.symbols.is_known(ticker):
+            return {"error": f"Unknown ticker '{ticker}'. Please check the symbol."}
+
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period=period, interval=interval)
+            base = base_interval(interval)
+            if base is None:
+                data = self._download(ticker, period, interval)
+            else:
+                data = self._fetch_from_store(ticker, period, interval, base, refresh)
 
-            # Check if data is empty (invalid ticker)
+            # Stored bars may not reach into the requested period.
             if data.empty:
                 raise ValueError(f"No data found for ticker '{ticker}'. Please check the symbol.")
 
+            data = normalize_bars(data, self.float32)
+            logger.debug("bars ticker=%s period=%s interval=%s rows=%d bytes=%d",
+                         ticker, period, interval, len(data), frame_nbytes(data))
+            bar_cache.set(key, data, ttl=ttl)
+            unknown_symbol_cache.invalidate(key)
             return data
 
+        except NoDataError as e:
+            # Upstream had nothing for this ticker: the same lookup would fail again, so remember it. A forced
+            # refresh (e.g. the watchlist) reports the failure without blocking interactive lookups.
+            if not refresh:
+                unknown_symbol_cache.set(key, str(e))
+            return {"error": str(e)}
         except Exception as e:
             return {"error": str(e)}
 
+    def _download(self, ticker: str, period: str, interval: str) -> pd.DataFrame:
+        """Download bars through the rate-limited fetch scheduler (queued, batched and retried there)."""
+        with span("yfinance_fetch", ticker=ticker, period=period, interval=interval):
+            data = self.scheduler.fetch(ticker, period, interval, priority=self.priority)
+        if data.empty:
+            raise NoDataError(f"No data found for ticker '{ticker}'. Please check the symbol.")
+        return data
+
+    def _fetch_from_store(self, ticker: str, period: str, interval: str, base: str, refresh: bool) -> pd.DataFrame:
+        """
+        Top up the stored base bars if needed, then slice/resample them locally.
+        The whole upstream period is downloaded only while the store does not cover it yet; after that,
+        stale (or refreshed) series only fetch the days since their last stored bar. A failed or empty top-up
+        (e.g. over a weekend) is logged and the stored bars are served.
+        """
+        now = pd.Timestamp.now(tz="UTC")
+        start = period_start(period, now)
+        upstream_period = UPSTREAM_MAX_PERIOD.get(base, period)
+        upstream_start = period_start(upstream_period, now)
+        # Yahoo cannot go further back than upstream_start, so that is all we can ask the store to cover.
+        needed_from = upstream_start if start is None or upstream_start is None else max(start, upstream_start)
+
+        meta = self.bar_store.meta(ticker, base)
+        covered = (
+            bool(meta)
+            and "last" in meta
+            and (meta.get("full_history", False) if needed_from is None
+                 else pd.Timestamp(meta["covered_from"]) <= needed_from)
+        )
+        if not covered:
+            bars = self._download(ticker, upstream_period, base)
+            self.bar_store.append(ticker, base, bars, covered_from=upstream_start,
+                                  full_history=upstream_start is None)
+        elif refresh or time.time() - meta["fetched_at"] >= self.store_max_age:
+            try:
+                bars = self._download(ticker, topup_period(pd.Timestamp(meta["last"]), now, upstream_period), base)
+                self.bar_store.append(ticker, base, bars)
+            except Exception as e:
+                logger.warning("Top-up of stored %s %s bars failed (%s); serving stored bars", ticker, base, e)
+                self.bar_store.touch(ticker, base)
+
+        return self.bar_store.resample(ticker, interval, start=start)
+
 
 # Quick test
 if __name__ == "__main__":
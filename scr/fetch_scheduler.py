@@ -0,0 +1,493 @@
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+import pandas as pd
+import yfinance as yf
+
+from scr.config import get_setting
+from scr.metrics import registry, span, FETCH_REQUESTS, UPSTREAM_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Lower values are served first.
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+FETCH_DEFAULTS = {
+    "base_url": None,
+    "rate_per_second": 2.0,
+    "burst": 5,
+    "max_batch": 20,
+    "batch_window_seconds": 0.05,
+    "max_retries": 4,
+    "backoff_base_seconds": 0.5,
+    "backoff_max_seconds": 30.0,
+    "max_workers": 2,
+    "timeout_seconds": 60.0,
+}
+
+
+class RateLimitedError(RuntimeError):
+    def __init__(self, message: str, retry_after: float = None):
+        """
+        Upstream asked us to slow down (HTTP 429 or equivalent).
+
+        :param message: Error message
+        :param retry_after: Seconds the upstream asked us to wait, if it said
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class NoDataError(ValueError):
+    """Upstream answered for the ticker but had no bars for it (unknown or delisted symbol, empty period)."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic, sleep=time.sleep):
+        """
+        Thread-safe token bucket.
+
+        :param rate: Tokens added per second
+        :param capacity: Maximum number of tokens (the allowed burst)
+        :param clock: Monotonic clock, replaceable in tests
+        :param sleep: Sleep function, replaceable in tests
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self, now):
+        # _updated lies in the future while the bucket is paused.
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        Take tokens if available.
+
+        A request costing more than the capacity goes through once the bucket is full and leaves it in
+        debt, so large batches are still paced by the rate.
+
+        :return: 0 if the tokens were taken, otherwise the seconds to wait before trying again
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            needed = min(tokens, self.capacity)
+            if now >= self._updated and self._tokens >= needed:
+                self._tokens -= tokens
+                return 0
+            return max(self._updated - now, 0) + max(needed - self._tokens, 0) / self.rate
+
+    def acquire(self, tokens: float = 1):
+        """Block until tokens are available and take them."""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            self._sleep(wait)
+
+    def pause(self, seconds: float):
+        """Empty the bucket and stop refilling it for ``seconds`` (e.g. after a Retry-After)."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0)
+            self._updated = max(self._updated, now + seconds)
+
+
+# Words in yfinance's per-ticker errors that mean the symbol itself is invalid rather than the call failing.
+_INVALID_SYMBOL_WORDS = ("delisted", "no data", "not found", "invalid")
+
+# yf.download collects frames and errors in module globals (yf.shared._DFS / _ERRORS) that every call resets,
+# so overlapping downloads would drop each other's tickers. Only one runs at a time.
+_YF_DOWNLOAD_LOCK = threading.Lock()
+
+
+class YahooFetcher:
+    """Batched downloads through ``yf.download``."""
+
+    def cost(self, tickers) -> int:
+        # Yahoo's chart endpoint serves one symbol per call, so a batch still counts once per ticker.
+        return len(tickers)
+
+    def fetch(self, tickers, period: str, interval: str, start: pd.Timestamp = None) -> dict:
+        """
+        Download bars for several tickers in one call (from ``start`` instead of over ``period`` when given).
+
+        :return: dict of ticker -> DataFrame (tickers without data are left out); tickers whose download
+                 failed for another reason map to a ConnectionError so the scheduler retries them
+        """
+        with _YF_DOWNLOAD_LOCK:
+            data = yf.download(list(tickers), period=period, interval=interval, start=start, group_by="ticker",
+                               actions=True, auto_adjust=True, ignore_tz=False, threads=False, progress=False)
+            errors = dict(getattr(yf.shared, "_ERRORS", {}) or {})
+        if any("rate limit" in str(error).lower() or "too many requests" in str(error).lower()
+               for error in errors.values()):
+            raise RateLimitedError("Yahoo Finance rate limit reached.")
+        # yf.download logs per-ticker failures instead of raising; surface transport errors so they are retried.
+        results = {ticker: ConnectionError(str(error)) for ticker, error in errors.items()
+                   if ticker in tickers and not any(word in str(error).lower() for word in _INVALID_SYMBOL_WORDS)}
+        if data is None or data.empty:
+            return results
+        for ticker in tickers:
+            if ticker in results:
+                continue
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                frame = data[ticker]
+            else:
+                frame = data
+            # Batched frames share one index; drop the rows this ticker has no bar for.
+            frame = frame.dropna(subset=["Close"])
+            if not frame.empty:
+                results[ticker] = frame
+        return results
+
+
+class HTTPFetcher:
+    def __init__(self, base_url: str, timeout: float = 10):
+        """
+        Fetch bars from an HTTP service (e.g. a local stub server).
+
+        ``GET {base_url}/bars?tickers=A,B&period=1y&interval=1d`` (plus ``&start=<ISO time>`` for bars since
+        a given time) must return a JSON object mapping each ticker to a DataFrame in pandas' ``split``
+        orientation. HTTP 429 is treated as a rate limit.
+
+        :param base_url: Service root, e.g. 'http://127.0.0.1:8050'
+        :param timeout: Socket timeout in seconds
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def cost(self, tickers) -> int:
+        return 1
+
+    def fetch(self, tickers, period: str, interval: str, start: pd.Timestamp = None) -> dict:
+        params = {"tickers": ",".join(tickers), "period": period, "interval": interval}
+        if start is not None:
+            params["start"] = pd.Timestamp(start).isoformat()
+        query = urlencode(params)
+        try:
+            with urlopen(f"{self.base_url}/bars?{query}", timeout=self.timeout) as response:
+                payload = json.load(response)
+        except HTTPError as e:
+            if e.code == 429:
+                retry_after = e.headers.get("Retry-After")
+                raise RateLimitedError(f"Rate limited by {self.base_url}.",
+                                       retry_after=float(retry_after) if retry_after else None)
+            if 400 <= e.code < 500:
+                raise ValueError(f"Bad request for {', '.join(tickers)}: HTTP {e.code}.")
+            raise
+
+        results = {}
+        for ticker, frame in payload.items():
+            index = pd.to_datetime(frame["index"], utc=True)
+            results[ticker] = pd.DataFrame(frame["data"], index=index, columns=frame["columns"])
+        return results
+
+
+class _Request:
+    __slots__ = ("key", "future", "priority", "seq")
+
+    def __init__(self, key, priority, seq):
+        self.key = key
+        self.future = Future()
+        self.priority = priority
+        self.seq = seq
+
+
+class FetchScheduler:
+    def __init__(self, fetcher=None, rate_per_second: float = 2.0, burst: float = 5, max_batch: int = 20,
+                 batch_window_seconds: float = 0.05, max_retries: int = 4, backoff_base_seconds: float = 0.5,
+                 backoff_max_seconds: float = 30.0, max_workers: int = 2, timeout_seconds: float = 60.0):
+        """
+        Single gateway for upstream bar downloads.
+
+        Requests for the same (ticker, period, interval) that are queued or in flight share one download.
+        Queued requests with the same period and interval are merged into one batched call, interactive
+        requests are always dispatched before background ones, every upstream call takes a token from a
+        rate-limiting bucket, and failed calls are retried with jittered exponential backoff. With more than
+        one worker, one is kept free of background batches so a user never waits behind their retries.
+
+        :param fetcher: Object with ``fetch(tickers, period, interval) -> dict`` and ``cost(tickers)``
+                        (defaults to YahooFetcher); ``fetch`` also takes ``start=`` if requests pass one. ``fetch`` raises ValueError for a bad request, which is
+                        narrowed down to the offending tickers by splitting the batch, and may map a ticker
+                        to an exception to have just that ticker retried.
+        :param rate_per_second: Sustained upstream calls per second
+        :param burst: Upstream calls allowed back to back
+        :param max_batch: Maximum tickers per upstream call
+        :param batch_window_seconds: How long the dispatcher waits for more requests to join a batch
+        :param max_retries: Retries of a failed upstream call before giving up
+        :param backoff_base_seconds: Delay before the first retry; doubles with each attempt
+        :param backoff_max_seconds: Upper bound of the retry delay
+        :param max_workers: Upstream calls in flight at once (background batches use at most all but one)
+        :param timeout_seconds: How long ``fetch`` waits for a result
+        """
+        self.fetcher = fetcher if fetcher is not None else YahooFetcher()
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.max_batch = max_batch
+        self.batch_window_seconds = batch_window_seconds
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._inflight = {}
+        self._seq = itertools.count()
+        self._running = 0
+        self._running_background = 0
+        self._pool = None
+        self._dispatcher = None
+        self._closed = False
+
+    def submit(self, ticker: str, period: str = "1y", interval: str = "1d", priority: int = INTERACTIVE,
+               start: pd.Timestamp = None) -> Future:
+        """
+        Queue a download, or join an identical one that is already queued or running.
+
+        :param ticker: Stock ticker symbol
+        :param period: Time period (e.g., '1y')
+        :param interval: Data interval (e.g., '1d')
+        :param priority: INTERACTIVE or BACKGROUND
+        :param start: Only fetch bars from this time on (overrides period); requests batch only with the
+                      same start
+        :return: Future resolving to the DataFrame (or raising NoDataError when there is no data)
+        """
+        key = (ticker, period, interval, start)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Fetch scheduler is closed.")
+            future = self._inflight.get(key)
+            request = self._pending.get(key)
+            if future is None and request is not None:
+                # A waiting user promotes a queued background refresh.
+                request.priority = min(request.priority, priority)
+                future = request.future
+            if future is not None:
+                registry.inc(FETCH_REQUESTS, priority=PRIORITY_NAMES.get(priority, priority), result="coalesced")
+                return future
+
+            request = _Request(key, priority, next(self._seq))
+            self._pending[key] = request
+            registry.inc(FETCH_REQUESTS, priority=PRIORITY_NAMES.get(priority, priority), result="queued")
+            self._start()
+            self._cond.notify()
+            return request.future
+
+    def fetch(self, ticker: str, period: str = "1y", interval: str = "1d", priority: int = INTERACTIVE,
+              timeout: float = None, start: pd.Timestamp = None) -> pd.DataFrame:
+        """Submit a download and wait for its result."""
+        future = self.submit(ticker, period, interval, priority, start=start)
+        return future.result(self.timeout_seconds if timeout is None else timeout)
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (0-based): half fixed, half random."""
+        delay = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def close(self):
+        """Stop dispatching and fail every queued request."""
+        with self._cond:
+            self._closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._cond.notify_all()
+        for request in pending:
+            request.future.set_exception(RuntimeError("Fetch scheduler is closed."))
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+    def _start(self):
+        # Called with the lock held; threads start on first use so importing the module stays cheap.
+        if self._dispatcher is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+            self._dispatcher = threading.Thread(target=self._dispatch, name="fetch-dispatcher", daemon=True)
+            self._dispatcher.start()
+
+    def _background_allowed(self) -> bool:
+        # Called with the lock held.
+        return self._running_background < max(1, self.max_workers - 1)
+
+    def _can_dispatch(self) -> bool:
+        """Whether a worker is free for the most urgent queued request it may run (called with the lock held)."""
+        if self._running >= self.max_workers:
+            return False
+        return any(r.priority == INTERACTIVE for r in self._pending.values()) or (
+            bool(self._pending) and self._background_allowed())
+
+    def _take_batch(self):
+        """Pop the most urgent request plus queued requests it can share an upstream call with."""
+        head = min(self._pending.values(), key=lambda r: (r.priority, r.seq))
+        batch = sorted(
+            (r for r in self._pending.values() if r.key[1:] == head.key[1:]),
+            key=lambda r: (r.priority, r.seq)
+        )[:self.max_batch]
+        for request in batch:
+            del self._pending[request.key]
+            self._inflight[request.key] = request.future
+        return batch
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                full = len(self._pending) >= self.max_batch
+            if not full:
+                # Let requests fired together (e.g. a watchlist cycle) join the same batch.
+                time.sleep(self.batch_window_seconds)
+            # Wait for a free worker before choosing, so late interactive requests still jump the queue.
+            with self._cond:
+                while not self._closed and not self._can_dispatch():
+                    self._cond.wait()
+                if self._closed:
+                    return
+                batch = self._take_batch()
+                background = batch[0].priority != INTERACTIVE
+                self._running += 1
+                self._running_background += background
+            self.bucket.acquire(self.fetcher.cost([r.key[0] for r in batch]))
+            self._pool.submit(self._run_batch, batch, background)
+
+    def _retry_delay(self, tickers, error: Exception, attempt: int):
+        """Sleep before retry ``attempt`` of an upstream call, then take its tokens again."""
+        delay = self.backoff(attempt)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, retry_after)
+        if isinstance(error, RateLimitedError):
+            # Hold back every other upstream call too, not just this one.
+            self.bucket.pause(delay)
+        logger.warning("Upstream fetch of %s failed (%s); retry %d in %.2fs",
+                       ",".join(tickers), error, attempt + 1, delay)
+        time.sleep(delay)
+        self.bucket.acquire(self.fetcher.cost(tickers))
+
+    def _call_upstream(self, tickers, period: str, interval: str, start=None) -> dict:
+        results = {}
+        attempt = 0
+        while True:
+            try:
+                with span("upstream_fetch", tickers=",".join(tickers), period=period, interval=interval):
+                    if start is None:
+                        fetched = self.fetcher.fetch(tickers, period, interval)
+                    else:
+                        fetched = self.fetcher.fetch(tickers, period, interval, start=start)
+                registry.inc(UPSTREAM_REQUESTS, outcome="ok")
+            except Exception as e:
+                # A bad symbol or request will not improve with retries; a truncated or garbled response may.
+                if isinstance(e, ValueError) and not isinstance(e, json.JSONDecodeError):
+                    registry.inc(UPSTREAM_REQUESTS, outcome="error")
+                    raise
+                rate_limited = isinstance(e, RateLimitedError)
+                registry.inc(UPSTREAM_REQUESTS, outcome="rate_limited" if rate_limited else "error")
+                if attempt >= self.max_retries:
+                    raise
+                self._retry_delay(tickers, e, attempt)
+                attempt += 1
+                continue
+
+            failed = {ticker: value for ticker, value in fetched.items() if isinstance(value, Exception)}
+            results.update(fetched)
+            if not failed or attempt >= self.max_retries:
+                return results
+            # Only the tickers that failed on their own are fetched again.
+            tickers = list(failed)
+            self._retry_delay(tickers, next(iter(failed.values())), attempt)
+            attempt += 1
+
+    def _call_isolating(self, tickers, period: str, interval: str, start=None, acquired: bool = True):
+        """
+        Call upstream, splitting the batch in halves on a bad-request ValueError until the tickers causing it
+        are isolated, so the rest of the batch still gets its bars.
+
+        :return: (dict of ticker -> result, dict of ticker -> ValueError)
+        """
+        if not acquired:
+            self.bucket.acquire(self.fetcher.cost(tickers))
+        try:
+            return self._call_upstream(tickers, period, interval, start), {}
+        except json.JSONDecodeError:
+            raise
+        except ValueError as e:
+            if len(tickers) == 1:
+                return {}, {tickers[0]: e}
+        results, errors = {}, {}
+        middle = len(tickers) // 2
+        for half in (tickers[:middle], tickers[middle:]):
+            half_results, half_errors = self._call_isolating(half, period, interval, start, acquired=False)
+            results.update(half_results)
+            errors.update(half_errors)
+        return results, errors
+
+    def _run_batch(self, batch, background: bool = False):
+        period, interval, start = batch[0].key[1:]
+        tickers = [request.key[0] for request in batch]
+        try:
+            (results, errors), error = self._call_isolating(tickers, period, interval, start), None
+        except Exception as e:
+            results, errors, error = {}, {}, e
+        finally:
+            with self._cond:
+                for request in batch:
+                    self._inflight.pop(request.key, None)
+                self._running -= 1
+                self._running_background -= background
+                self._cond.notify_all()
+
+        for request in batch:
+            ticker = request.key[0]
+            data = results.get(ticker)
+            if error is not None:
+                request.future.set_exception(error)
+            elif ticker in errors:
+                request.future.set_exception(errors[ticker])
+            elif isinstance(data, Exception):
+                request.future.set_exception(data)
+            elif data is None or data.empty:
+                request.future.set_exception(NoDataError(f"No data found for ticker '{ticker}'. Please check the symbol."))
+            else:
+                request.future.set_result(data)
+
+
+def scheduler_from_config() -> FetchScheduler:
+    """Build a FetchScheduler from the 'fetch' section of config.json."""
+    settings = get_setting("fetch", FETCH_DEFAULTS)
+    base_url = settings.pop("base_url")
+    fetcher = HTTPFetcher(base_url) if base_url else YahooFetcher()
+    return FetchScheduler(fetcher, **settings)
+
+
+# Shared scheduler used by DataHandler and the watchlist refresher.
+fetch_scheduler = scheduler_from_config()
+
+
+# Quick test
+if __name__ == "__main__":
+    futures = {ticker: fetch_scheduler.submit(ticker) for ticker in ["AAPL", "MSFT", "GOOGL"]}
+    for ticker, future in futures.items():
+        try:
+            print(ticker, len(future.result(timeout=60)), "bars")
+        except ValueError as e:
+            print(ticker, e)
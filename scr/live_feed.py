@@ -0,0 +1,329 @@
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from scr.config import get_setting
+from scr.fetch_scheduler import BACKGROUND, fetch_scheduler
+from scr.technical_ind import DEFAULT_INDICATOR_PARAMS
+
+logger = logging.getLogger(__name__)
+
+LIVE_DEFAULTS = {
+    "poll_seconds": 2,
+    "bar_seconds": 60,
+    "idle_seconds": 120,
+    "max_points": 2000,
+}
+
+Quote = namedtuple("Quote", ["ticker", "time", "price", "volume"])
+
+_p = DEFAULT_INDICATOR_PARAMS
+SMA_COLUMN = f"SMA_{_p['sma_window']}"
+EMA_COLUMN = f"EMA_{_p['ema_window']}"
+# Values carried by every live point, in the order of the live chart's traces.
+LIVE_COLUMNS = ["Close", SMA_COLUMN, EMA_COLUMN, "RSI"]
+
+
+class QuoteSource:
+    """Base class of quote feeds: ``poll`` returns the quotes that arrived since the previous call."""
+
+    def poll(self, tickers) -> list:
+        raise NotImplementedError
+
+
+class ReplayQuoteSource(QuoteSource):
+    def __init__(self, quotes: dict, per_poll: int = 1):
+        """
+        Replays recorded prices, e.g. for tests or demos without market access.
+
+        :param quotes: dict of ticker -> DataFrame with a 'Close' (and optionally 'Volume') column indexed by time
+        :param per_poll: Quotes returned per ticker on each poll
+        """
+        self.per_poll = per_poll
+        self._iterators = {
+            ticker: (Quote(ticker, pd.Timestamp(t), float(row["Close"]), float(row.get("Volume", 0.0)))
+                     for t, row in frame.iterrows())
+            for ticker, frame in quotes.items()
+        }
+
+    def poll(self, tickers) -> list:
+        quotes = []
+        for ticker in tickers:
+            iterator = self._iterators.get(ticker)
+            if iterator is None:
+                continue
+            for _ in range(self.per_poll):
+                quote = next(iterator, None)
+                if quote is None:
+                    break
+                quotes.append(quote)
+        return quotes
+
+
+class YahooQuoteSource(QuoteSource):
+    def __init__(self, scheduler=None):
+        """
+        Polls the latest one-minute bar through the fetch scheduler's background lane, so live
+        polling is batched and rate-limited together with every other download. Once every polled
+        ticker has a bar, only the bars since the oldest of their last bars are requested.
+
+        :param scheduler: FetchScheduler to use (defaults to the shared scheduler)
+        """
+        self.scheduler = scheduler if scheduler is not None else fetch_scheduler
+        self._last = {}
+
+    def poll(self, tickers) -> list:
+        # One start for every ticker keeps the poll a single batch; new tickers fetch the whole day once.
+        seen = [self._last[ticker][0] for ticker in tickers if ticker in self._last]
+        start = min(seen) if seen and len(seen) == len(tickers) else None
+        futures = {ticker: self.scheduler.submit(ticker, "1d", "1m", priority=BACKGROUND, start=start)
+                   for ticker in tickers}
+        quotes = []
+        for ticker, future in futures.items():
+            try:
+                bars = future.result(self.scheduler.timeout_seconds)
+            except Exception as e:
+                logger.warning("Live quote for %s failed: %s", ticker, e)
+                continue
+            last = (bars.index[-1], float(bars["Close"].iloc[-1]), float(bars["Volume"].iloc[-1]))
+            if self._last.get(ticker) == last:
+                continue
+            previous = self._last.get(ticker)
+            self._last[ticker] = last
+            # Yahoo reports the running volume of the current minute; pass on only what was added.
+            volume = last[2] - previous[2] if previous is not None and previous[0] == last[0] else last[2]
+            quotes.append(Quote(ticker, pd.Timestamp.now(tz="UTC"), last[1], max(volume, 0.0)))
+        return quotes
+
+
+class LiveBars:
+    def __init__(self, bar_seconds: int = 60, sma_window: int = _p["sma_window"], ema_window: int = _p["ema_window"],
+                 rsi_window: int = _p["rsi_window"], max_bars: int = 1000):
+        """
+        In-memory OHLCV bars built from ticks, with SMA, EMA and RSI updated incrementally.
+
+        Indicator state covers the closed bars; each tick combines it with the forming bar in O(1), so the
+        values match TechnicalIndicators run on the same bars.
+
+        :param bar_seconds: Bar length in seconds
+        :param sma_window: SMA window in bars
+        :param ema_window: EMA span in bars
+        :param rsi_window: RSI window in bars
+        :param max_bars: Closed bars kept in memory
+        """
+        self.bar_seconds = bar_seconds
+        self.sma_window = sma_window
+        self.rsi_window = rsi_window
+        self.alpha = 2 / (ema_window + 1)
+        self.bars = deque(maxlen=max_bars)
+        self.current = None
+        self._closes = deque(maxlen=max(sma_window - 1, 1))
+        self._close_sum = 0.0
+        self._deltas = deque(maxlen=max(rsi_window - 1, 1))
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._ema = None
+        self._last_close = None
+
+    def _bucket(self, timestamp) -> pd.Timestamp:
+        return pd.Timestamp(timestamp).floor(f"{self.bar_seconds}s")
+
+    def _close_bar(self):
+        start, open_, high, low, close, volume = self.current
+        self.bars.append((start, open_, high, low, close, volume))
+        if self.sma_window > 1:
+            self._closes.append(close)
+            # Re-summing the short window on each bar close keeps rounding error from accumulating.
+            self._close_sum = sum(self._closes)
+        if self._last_close is not None and self.rsi_window > 1:
+            self._deltas.append(close - self._last_close)
+            self._gain_sum = sum(d for d in self._deltas if d > 0)
+            self._loss_sum = -sum(d for d in self._deltas if d < 0)
+        self._ema = close if self._ema is None else self._ema + self.alpha * (close - self._ema)
+        self._last_close = close
+        self.current = None
+
+    def seed(self, df: pd.DataFrame):
+        """Load historical bars (oldest first) as closed bars, so indicators are warm from the first tick."""
+        for start, row in df.iterrows():
+            self.current = [pd.Timestamp(start), row["Open"], row["High"], row["Low"], row["Close"], row["Volume"]]
+            self._close_bar()
+
+    def indicators(self, close: float) -> dict:
+        """Indicator values if the forming bar closed at ``close``."""
+        sma = np.nan
+        closed = len(self._closes) if self.sma_window > 1 else 0
+        if closed >= self.sma_window - 1:
+            sma = (self._close_sum + close) / self.sma_window
+
+        ema = close if self._ema is None else self._ema + self.alpha * (close - self._ema)
+
+        rsi = np.nan
+        deltas = len(self._deltas) if self.rsi_window > 1 else 0
+        if self._last_close is not None and deltas >= self.rsi_window - 1:
+            delta = close - self._last_close
+            gain = self._gain_sum + max(delta, 0.0)
+            loss = self._loss_sum + max(-delta, 0.0)
+            if loss > 0:
+                rsi = 100 - 100 / (1 + gain / loss)
+            elif gain > 0:
+                rsi = 100.0
+        return {"Close": close, SMA_COLUMN: sma, EMA_COLUMN: ema, "RSI": rsi}
+
+    def add(self, timestamp, price: float, volume: float = 0.0) -> dict:
+        """
+        Fold one tick into the bars.
+
+        :param timestamp: Tick time
+        :param price: Traded price
+        :param volume: Volume traded since the previous tick
+        :return: dict with 'time' and the LIVE_COLUMNS values after this tick
+        """
+        start = self._bucket(timestamp)
+        if self.current is not None and start > self.current[0]:
+            self._close_bar()
+        if self.current is None:
+            self.current = [start, price, price, price, price, volume]
+        else:
+            # Ticks arriving late for an already closed bar are folded into the forming one.
+            self.current[2] = max(self.current[2], price)
+            self.current[3] = min(self.current[3], price)
+            self.current[4] = price
+            self.current[5] += volume
+        point = self.indicators(price)
+        point["time"] = pd.Timestamp(timestamp)
+        return point
+
+    def frame(self) -> pd.DataFrame:
+        """Closed bars plus the forming bar as an OHLCV DataFrame."""
+        rows = list(self.bars) + ([tuple(self.current)] if self.current is not None else [])
+        df = pd.DataFrame(rows, columns=["Time", "Open", "High", "Low", "Close", "Volume"])
+        return df.set_index("Time")
+
+
+class LiveFeedManager:
+    def __init__(self, source: QuoteSource = None, poll_seconds: float = 2, bar_seconds: int = 60,
+                 idle_seconds: float = 120, max_points: int = 2000, seed: bool = True):
+        """
+        One poller shared by every open dashboard. Each subscribed ticker keeps its live bars and a
+        numbered list of recent points, so a client only asks for the points after the last one it has.
+
+        :param source: QuoteSource to poll (defaults to YahooQuoteSource)
+        :param poll_seconds: Delay between polls
+        :param bar_seconds: Length of the live bars the indicators are computed on
+        :param idle_seconds: Tickers nobody asked about for this long are dropped
+        :param max_points: Points kept per ticker
+        :param seed: Warm new subscriptions with today's one-minute bars (only when bar_seconds is 60)
+        """
+        self.source = source if source is not None else YahooQuoteSource()
+        self.poll_seconds = poll_seconds
+        self.bar_seconds = bar_seconds
+        self.idle_seconds = idle_seconds
+        self.max_points = max_points
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._feeds = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, ticker: str):
+        """Start following a ticker; quotes arrive once the poller runs (see ``start``)."""
+        with self._lock:
+            feed = self._feeds.get(ticker)
+            if feed is not None:
+                feed["seen"] = time.monotonic()
+                return
+        bars = LiveBars(self.bar_seconds)
+        if self.seed and self.bar_seconds == 60:
+            from scr.data_handler import DataHandler
+
+            history = DataHandler().fetch_stock_data(ticker, period="1d", interval="1m")
+            if isinstance(history, pd.DataFrame):
+                bars.seed(history)
+        with self._lock:
+            self._feeds.setdefault(ticker, {"bars": bars, "points": deque(maxlen=self.max_points),
+                                            "seq": -1, "seen": time.monotonic()})
+
+    def points(self, ticker: str, after: int = -1):
+        """
+        Points added after sequence number ``after``.
+
+        :return: (list of points, sequence number of the last point); points carry 'seq', 'time' and LIVE_COLUMNS
+        """
+        with self._lock:
+            feed = self._feeds.get(ticker)
+            if feed is None:
+                return [], after
+            feed["seen"] = time.monotonic()
+            if after > feed["seq"]:
+                # The feed was restarted (e.g. after going idle); resend everything it has.
+                after = -1
+            points = feed["points"]
+            if not points or points[-1]["seq"] <= after:
+                return [], feed["seq"]
+            # Sequence numbers are contiguous, so the first new point's position follows from them.
+            first = max(after + 1 - points[0]["seq"], 0)
+            return [points[i] for i in range(first, len(points))], feed["seq"]
+
+    def poll_once(self):
+        """Poll the source once and fold the quotes into the subscribed tickers."""
+        now = time.monotonic()
+        with self._lock:
+            for ticker in [t for t, feed in self._feeds.items() if now - feed["seen"] > self.idle_seconds]:
+                del self._feeds[ticker]
+            tickers = list(self._feeds)
+        if not tickers:
+            return 0
+
+        quotes = self.source.poll(tickers)
+        with self._lock:
+            for quote in quotes:
+                feed = self._feeds.get(quote.ticker)
+                if feed is None:
+                    continue
+                point = feed["bars"].add(quote.time, quote.price, quote.volume)
+                feed["seq"] += 1
+                point["seq"] = feed["seq"]
+                feed["points"].append(point)
+        return len(quotes)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.warning("Live feed poll failed: %s", e)
+            self._stop.wait(self.poll_seconds)
+
+    def start(self):
+        """Run the poller in a daemon thread."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the poller thread to exit."""
+        self._stop.set()
+
+
+# Shared manager used by the dashboard's Live tab.
+live_feed = LiveFeedManager(**get_setting("live", LIVE_DEFAULTS))
+
+
+# Quick test
+if __name__ == "__main__":
+    index = pd.date_range("2024-01-02 14:30", periods=300, freq="10s", tz="UTC")
+    prices = pd.DataFrame({"Close": 100 + np.cumsum(np.random.normal(0, 0.05, len(index)))}, index=index)
+    manager = LiveFeedManager(ReplayQuoteSource({"DEMO": prices}, per_poll=50), seed=False)
+    manager.subscribe("DEMO")
+    for _ in range(6):
+        manager.poll_once()
+    points, last = manager.points("DEMO", after=-1)
+    print(last, points[-1])
@@ -0,0 +1,212 @@
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, roughly covering a cache hit up to a cold yfinance fetch.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_DURATION = "plutus_stage_duration_seconds"
+CALLBACK_DURATION = "plutus_callback_duration_seconds"
+CALLBACK_ERRORS = "plutus_callback_errors_total"
+CACHE_REQUESTS = "plutus_cache_requests_total"
+WATCHLIST_STALENESS = "plutus_watchlist_staleness_seconds"
+UPSTREAM_REQUESTS = "plutus_upstream_requests_total"
+FETCH_REQUESTS = "plutus_fetch_requests_total"
+BAR_CACHE_BYTES = "plutus_bar_cache_bytes"
+
+_HELP = {
+    STAGE_DURATION: "Time spent in a hot-path stage (fetch, indicators, simulation, figure, news).",
+    CALLBACK_DURATION: "End-to-end latency of a Dash callback.",
+    CALLBACK_ERRORS: "Dash callbacks that raised an exception.",
+    CACHE_REQUESTS: "Cache lookups by cache name and result (hit/miss).",
+    WATCHLIST_STALENESS: "Seconds since a watchlist ticker was last refreshed.",
+    UPSTREAM_REQUESTS: "Upstream market data calls by outcome (ok/error/rate_limited).",
+    FETCH_REQUESTS: "Ticker fetches submitted to the scheduler by priority and result (queued/coalesced).",
+    BAR_CACHE_BYTES: "Memory held by the frames in the bar cache.",
+}
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in items) + "}"
+
+
+def _format_value(value):
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        # Spelled as the Prometheus text format expects.
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value) if value != int(value) else str(int(value))
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Thread-safe in-process store of counters, gauges and histograms.
+
+        :param buckets: Upper bounds (seconds) of the histogram buckets
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._collectors = []
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increase a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Set a gauge to a value."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def add_collector(self, collector):
+        """Register a callable ``collector(registry)`` run before every render to refresh gauges."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        """Unregister a collector; unknown collectors are ignored."""
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def remove_gauge(self, name: str, **labels):
+        """Drop a gauge so it is no longer rendered."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges.pop(key, None)
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one observation in a histogram."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            state = self._histograms.get(key)
+            if state is None:
+                state = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def span(self, stage: str, **labels):
+        """
+        Time a block of code and record it under the stage duration histogram.
+
+        :param stage: Stage name (e.g. 'yfinance_fetch', 'run_simulation')
+        :param labels: Extra labels such as the ticker or interval
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe(STAGE_DURATION, elapsed, stage=stage)
+            logger.debug("span stage=%s duration_ms=%.2f %s", stage, elapsed * 1000,
+                         " ".join(f"{key}={value}" for key, value in labels.items()))
+
+    def instrument_callback(self, func):
+        """Decorator recording latency and errors of a Dash callback."""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                self.inc(CALLBACK_ERRORS, callback=func.__name__)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                self.observe(CALLBACK_DURATION, elapsed, callback=func.__name__)
+                logger.debug("callback=%s duration_ms=%.2f", func.__name__, elapsed * 1000)
+        return wrapper
+
+    def record_cache(self, cache: str, hit: bool):
+        """Count a cache lookup."""
+        self.inc(CACHE_REQUESTS, cache=cache, result="hit" if hit else "miss")
+
+    def reset(self):
+        """Drop every recorded value."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            collector(self)
+
+        with self._lock:
+            counters = {key: value for key, value in self._counters.items()}
+            gauges = {key: value for key, value in self._gauges.items()}
+            histograms = {key: (list(state[0]), state[1], state[2]) for key, state in self._histograms.items()}
+
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), value in sorted(gauges.items()):
+            header(name, "gauge")
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), (bucket_counts, total, count) in sorted(histograms.items()):
+            header(name, "histogram")
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', bound))} {bucket_count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry used across the app.
+registry = MetricsRegistry()
+span = registry.span
+instrument_callback = registry.instrument_callback
+record_cache = registry.record_cache
+
+
+def register_metrics_route(server, path: str = "/metrics", metrics: MetricsRegistry = registry):
+    """
+    Expose a registry on a Flask server.
+
+    :param server: Flask app (``app.server`` for Dash)
+    :param path: URL path of the endpoint
+    :param metrics: Registry to render
+    """
+    from flask import Response
+
+    def metrics_view():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    server.add_url_rule(path, "metrics", metrics_view)
@@ -1,33 +1,44 @@
 import pandas as pd
-import json
 from newsdataapi import NewsDataApiClient
 from newsapi import NewsApiClient
-import os
 
-CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config.json")
+from scr.config import CONFIG_PATH, load_config
 
 
 def load_api_keys(config_path=CONFIG_PATH):
     """Load API keys from a JSON config file."""
-    try:
-        with open(config_path, "r") as file:
-            config = json.load(file)
-            return config.get("newsdata_api_key"), config.get("newsapi_api_key")
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Config file '{config_path}' not found.")
-    except json.JSONDecodeError:
-        raise ValueError(f"Error decoding '{config_path}'. Ensure it's valid JSON.")
+    config = load_config(config_path)
+    return config.get("newsdata_api_key"), config.get("newsapi_api_key")
 
 
 # Get API keys securely
 NEWSDATA_API_KEY, NEWSAPI_API_KEY = load_api_keys()
 
 
-def get_news_from_newsdata(name: str, language: str = 'en') -> pd.DataFrame:
+def _normalize_news_frame(df: pd.DataFrame, since: pd.Timestamp = None, limit: int = 10) -> pd.DataFrame:
+    """
+    Bring a provider frame to the shared layout: naive UTC 'Time' index, newest first.
+    :param df: pd.DataFrame with 'Title', 'URL' and 'Time' columns
+    :param since: pd.Timestamp Drop articles published at or before this time (naive UTC)
+    :param limit: int Maximum number of rows to return (None for all)
+    :return: pd.DataFrame with news results
+    """
+    df["Time"] = pd.to_datetime(df["Time"], utc=True).dt.tz_convert(None)
+    df.set_index("Time", inplace=True)
+    df.sort_index(ascending=False, inplace=True)
+    if since is not None:
+        df = df[df.index > since]
+    return df if limit is None else df.head(limit)
+
+
+def get_news_from_newsdata(name: str, language: str = 'en', since: pd.Timestamp = None,
+                           limit: int = 10) -> pd.DataFrame:
     """
     Fetch news from NewsData.io API.
     :param name: str Ticker name or keyword
     :param language: str Language filter (default: 'en')
+    :param since: pd.Timestamp Only keep articles newer than this (naive UTC)
+    :param limit: int Maximum number of articles (None for all returned)
     :return: pd.DataFrame with news results
     """
     if not NEWSDATA_API_KEY:
@@ -45,23 +56,28 @@ def get_news_from_newsdata(name: str, language: str = 'en') -> pd.DataFrame:
         columns={"title": "Title", "link": "URL", "pubDate": "Time"}
     )
 
-    df["Time"] = pd.to_datetime(df["Time"])
-    df.set_index("Time", inplace=True)
-    df.sort_index(ascending=False, inplace=True)
-    return df.head(10)
+    # NewsData.io publishes naive UTC timestamps.
+    return _normalize_news_frame(df, since=since, limit=limit)
 
 
-def get_news_from_newsapi(name: str) -> pd.DataFrame:
+def get_news_from_newsapi(name: str, since: pd.Timestamp = None, limit: int = 10) -> pd.DataFrame:
     """
     Fetch news from NewsAPI.org.
     :param name: str Ticker name or keyword
+    :param since: pd.Timestamp Only keep articles newer than this (naive UTC)
+    :param limit: int Maximum number of articles (None for all returned)
     :return: pd.DataFrame with news results
     """
     if not NEWSAPI_API_KEY:
         raise ValueError("Missing NewsAPI API key. Check 'config.json'.")
 
     api = NewsApiClient(api_key=NEWSAPI_API_KEY)
-    response = api.get_everything(q=name)
+    if since is not None:
+        # Let the API do the filtering so we only download what is new.
+        response = api.get_everything(q=name, from_param=since.strftime("%Y-%m-%dT%H:%M:%S"),
+                                      sort_by="publishedAt")
+    else:
+        response = api.get_everything(q=name)
 
     if "articles" not in response or not response["articles"]:
         raise ValueError(f"No news found for '{name}' on NewsAPI.org.")
@@ -70,10 +86,7 @@ def get_news_from_newsapi(name: str) -> pd.DataFrame:
         columns={"title": "Title", "url": "URL", "publishedAt": "Time"}
     )
 
-    df["Time"] = pd.to_datetime(df["Time"]).dt.tz_convert(None)
-    df.set_index("Time", inplace=True)
-    df.sort_index(ascending=False, inplace=True)
-    return df.head(10)
+    return _normalize_news_frame(df, since=since, limit=limit)
 
 
 # Quick test
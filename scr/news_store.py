@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import pandas as pd
+
+from scr.metrics import record_cache, span
+from scr.news_line import get_news_from_newsdata, get_news_from_newsapi
+
+logger = logging.getLogger(__name__)
+
+NEWS_STORE_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "news.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    ticker     TEXT NOT NULL,
+    url_key    TEXT NOT NULL,
+    title_hash TEXT NOT NULL,
+    time       TEXT NOT NULL,
+    title      TEXT NOT NULL,
+    url        TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS news_url_key ON news (ticker, url_key);
+CREATE UNIQUE INDEX IF NOT EXISTS news_title_hash ON news (ticker, title_hash);
+CREATE INDEX IF NOT EXISTS news_time ON news (ticker, time DESC);
+"""
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Query parameters that only track the click; every other parameter may identify the article (e.g. ?id=, ?p=).
+_TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src",
+                    "src", "cmpid", "ncid", "guccounter", "guce_referrer", "guce_referrer_sig", "_ga"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Reduce a URL to a key that is stable across news providers.
+    Scheme, 'www.', tracking parameters (utm_*, fbclid, ...), fragment and trailing slashes are dropped;
+    the remaining query parameters are kept in sorted order. Only the host is case-folded, since paths
+    and query values are case-sensitive.
+    :param url: str Article URL
+    :return: str Normalized URL key
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS)
+    key = host + parts.path.rstrip("/")
+    return key + "?" + urlencode(query) if query else key
+
+
+def _key(ticker: str) -> str:
+    # Stored and queried upper-case, so 'aapl' and 'AAPL' share one history.
+    return ticker.strip().upper()
+
+
+def title_hash(title: str) -> str:
+    """
+    Hash a headline after folding case, punctuation and whitespace.
+    :param title: str Article title
+    :return: str Hex digest
+    """
+    folded = re.sub(r"[\W_]+", " ", title.casefold()).strip()
+    return hashlib.sha1(folded.encode("utf-8")).hexdigest()
+
+
+class NewsStore:
+    def __init__(self, path: str = NEWS_STORE_PATH, fetchers=None):
+        """
+        Local SQLite store of news articles, de-duplicated per ticker by URL and title.
+
+        :param path: Location of the SQLite database file
+        :param fetchers: Callables ``(name, since=..., limit=...) -> DataFrame`` used to pull new articles
+        """
+        self.path = path
+        self.fetchers = fetchers if fetchers is not None else (get_news_from_newsdata, get_news_from_newsapi)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # Earlier versions stored tickers as typed; fold them (duplicates of an upper-case row are dropped).
+            conn.execute("UPDATE OR IGNORE news SET ticker = UPPER(ticker) WHERE ticker != UPPER(ticker)")
+            conn.execute("DELETE FROM news WHERE ticker != UPPER(ticker)")
+            if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+                # URL keys used to be lower-cased as a whole; rebuild them with case-sensitive paths.
+                rows = conn.execute("SELECT rowid, url FROM news").fetchall()
+                conn.executemany("UPDATE OR IGNORE news SET url_key = ? WHERE rowid = ?",
+                                 [(normalize_url(url), rowid) for rowid, url in rows])
+                conn.execute("PRAGMA user_version = 1")
+
+    @contextmanager
+    def _connect(self):
+        # A connection per call keeps the store safe to use from Dash worker threads.
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def latest_time(self, ticker: str):
+        """Return the publication time of the newest stored article for a ticker, or None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(time) FROM news WHERE ticker = ?", (_key(ticker),)).fetchone()
+        return pd.Timestamp(row[0]) if row and row[0] else None
+
+    def add(self, ticker: str, df: pd.DataFrame) -> int:
+        """
+        Insert articles, skipping any whose URL or title is already stored for the ticker.
+
+        :param ticker: Stock ticker symbol the articles belong to
+        :param df: DataFrame indexed by 'Time' with 'Title' and 'URL' columns
+        :return: Number of newly stored articles
+        """
+        ticker = _key(ticker)
+        rows = [
+            (ticker, normalize_url(url), title_hash(title), pd.Timestamp(time).strftime(_TIME_FORMAT), title, url)
+            for time, title, url in zip(df.index, df["Title"], df["URL"])
+            if isinstance(title, str) and isinstance(url, str)
+        ]
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO news (ticker, url_key, title_hash, time, title, url) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+    def refresh(self, ticker: str) -> int:
+        """
+        Pull only articles newer than the latest stored one from every provider.
+        A failing provider is logged and skipped, so the others and the stored history are still served.
+
+        :param ticker: Stock ticker symbol
+        :return: Number of newly stored articles
+        """
+        ticker = _key(ticker)
+        since = self.latest_time(ticker)
+        added = 0
+        for fetch in self.fetchers:
+            try:
+                with span("news_fetch", ticker=ticker, source=fetch.__name__):
+                    df = fetch(ticker, since=since, limit=None)
+            except ValueError:
+                # Provider has nothing (new) for this ticker.
+                continue
+            except Exception as e:
+                logger.warning("News fetch from %s for %s failed: %s", fetch.__name__, ticker, e)
+                continue
+            added += self.add(ticker, df)
+        return added
+
+    def count(self, ticker: str) -> int:
+        """Return the number of stored articles for a ticker."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM news WHERE ticker = ?", (_key(ticker),)).fetchone()[0]
+
+    def get_page(self, ticker: str, page: int = 0, page_size: int = 10) -> pd.DataFrame:
+        """
+        Read a page of stored articles, newest first.
+
+        :param ticker: Stock ticker symbol
+        :param page: Zero-based page number
+        :param page_size: Number of articles per page
+        :return: DataFrame indexed by 'Time' with 'Title' and 'URL' columns
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT time, title, url FROM news WHERE ticker = ? ORDER BY time DESC LIMIT ? OFFSET ?",
+                (_key(ticker), page_size, page * page_size)
+            ).fetchall()
+        # Pages served from the local index count as hits; an empty page means the APIs are still needed.
+        record_cache("news_store", hit=bool(rows))
+        df = pd.DataFrame(rows, columns=["Time", "Title", "URL"])
+        df["Time"] = pd.to_datetime(df["Time"])
+        return df.set_index("Time")
+
+
+# Quick test
+if __name__ == "__main__":
+    store = NewsStore()
+    print("New articles:", store.refresh("AAPL"))
+    print(store.get_page("AAPL"))
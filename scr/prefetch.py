@@ -0,0 +1,108 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from scr.cache import TTLCache
+from scr.metrics import span
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_DEFAULTS = {
+    "max_workers": 4,
+    "max_sessions": 256,
+    "session_ttl_seconds": 1800,
+    "wait_timeout_seconds": 20,
+}
+
+
+class Prefetcher:
+    def __init__(self, tasks: dict, max_workers: int = 4, max_sessions: int = 256, session_ttl_seconds: float = 1800,
+                 wait_timeout_seconds: float = 20):
+        """
+        Starts every tab's computation for a search at once and keeps the futures per browser session,
+        so switching tabs only waits for whatever is still running.
+
+        Threads rather than processes: the tasks fill the in-process analytics cache and news store
+        that the tab callbacks then read.
+
+        :param tasks: dict of name -> callable(ticker, interval)
+        :param max_workers: Tasks running at once across all sessions
+        :param max_sessions: Sessions remembered before the least recently used is dropped
+        :param session_ttl_seconds: How long a session's futures are kept
+        :param wait_timeout_seconds: How long a tab waits for its prefetched task before computing it itself
+        """
+        self.tasks = tasks
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._sessions = TTLCache("prefetch_sessions", ttl=session_ttl_seconds, max_entries=max_sessions)
+        self._lock = threading.Lock()
+
+    def _run(self, name, task, ticker, interval):
+        with span("prefetch", task=name, ticker=ticker, interval=interval):
+            return task(ticker, interval)
+
+    def start(self, session_id: str, ticker: str, interval: str, new_search: bool = True) -> dict:
+        """
+        Submit every task for a search.
+
+        For the ticker and interval this session already prefetched, tasks still pending are reused; finished
+        tasks run again on a new search (so e.g. the news is refreshed) but not on a mere tab switch, unless
+        they failed.
+
+        :param session_id: Browser session id
+        :param ticker: Stock ticker symbol
+        :param interval: Data interval
+        :param new_search: Whether the user searched (again) rather than switched tabs
+        :return: dict of task name -> Future
+        """
+        if not session_id:
+            return {}
+        with self._lock:
+            jobs = self._sessions.get(session_id)
+            previous = {}
+            if jobs is not None:
+                if jobs["key"] == (ticker, interval):
+                    previous = jobs["futures"]
+                else:
+                    # A new search replaces the previous one; drop its work that has not started yet.
+                    for future in jobs["futures"].values():
+                        future.cancel()
+            futures = {}
+            for name, task in self.tasks.items():
+                future = previous.get(name)
+                if future is not None and (not future.done() or not new_search and self._succeeded(future)):
+                    futures[name] = future
+                else:
+                    futures[name] = self._pool.submit(self._run, name, task, ticker, interval)
+            self._sessions.set(session_id, {"key": (ticker, interval), "futures": futures})
+        return futures
+
+    @staticmethod
+    def _succeeded(future) -> bool:
+        return not future.cancelled() and future.exception() is None
+
+    def wait(self, session_id: str, name: str, ticker: str, interval: str, timeout: float = None) -> bool:
+        """
+        Wait for a prefetched task of this session.
+
+        :param timeout: Seconds to wait (defaults to wait_timeout_seconds)
+        :return: True if the task ran for this ticker and interval and succeeded; False if there was none, it
+                 failed or it did not finish in time, in which case the caller computes the result itself
+                 (and reports its error)
+        """
+        jobs = self._sessions.get(session_id) if session_id else None
+        if jobs is None or jobs["key"] != (ticker, interval) or name not in jobs["futures"]:
+            return False
+        try:
+            jobs["futures"][name].result(self.wait_timeout_seconds if timeout is None else timeout)
+            return True
+        except TimeoutError:
+            logger.info("Prefetch %s for %s still running; computing it inline", name, ticker)
+            return False
+        except Exception as e:
+            logger.debug("Prefetch %s for %s failed: %s", name, ticker, e)
+            return False
+
+    def shutdown(self):
+        """Stop the worker threads once queued tasks finish."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,244 @@
+import cProfile
+import html
+import io
+import itertools
+import json
+import logging
+import os
+import pstats
+import shutil
+import threading
+import time
+import tracemalloc
+from functools import wraps
+
+from scr.config import CONFIG_PATH, get_setting
+
+logger = logging.getLogger(__name__)
+
+PROFILING_DEFAULTS = {
+    "path": "profiles",
+    "max_profiles": 50,
+    "top_functions": 15,
+    "tracemalloc_frames": 10,
+    "allow_header": False,
+}
+
+# Profile every callback while this environment variable is set (e.g. PLUTUS_PROFILE=1) ...
+PROFILE_ENV_VAR = "PLUTUS_PROFILE"
+# ... or, when 'profiling.allow_header' is on, only the requests carrying this header (e.g. X-Plutus-Profile: 1).
+PROFILE_HEADER = "X-Plutus-Profile"
+
+_FALSE = ("", "0", "false", "no", "off")
+
+
+def _top_functions(profiler: cProfile.Profile, limit: int) -> list:
+    """Slowest functions of a profile by cumulative time."""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({"function": f"{function} ({os.path.basename(filename)}:{line})", "ncalls": ncalls,
+                     "tottime": tottime, "cumtime": cumtime})
+    rows.sort(key=lambda row: row["cumtime"], reverse=True)
+    return rows[:limit]
+
+
+class CallbackProfiler:
+    def __init__(self, path: str = PROFILING_DEFAULTS["path"], max_profiles: int = 50, top_functions: int = 15,
+                 tracemalloc_frames: int = 10, allow_header: bool = False):
+        """
+        Opt-in cProfile and tracemalloc capture of single callback runs, switched on for every request by the
+        PLUTUS_PROFILE environment variable or, if allowed, for one request by the X-Plutus-Profile header.
+        cProfile only sees the calling thread, so callers should do their work inline when ``requested()``.
+
+        Each capture is a directory holding the cProfile stats (``profile.prof``), the tracemalloc snapshot
+        taken after the call (``allocations.snapshot``), the allocation diff by line (``allocations.txt``)
+        and a ``summary.json``. Only the newest ``max_profiles`` captures are kept. Profiled calls run one at a
+        time, since tracemalloc's peak is process-wide.
+
+        :param path: Directory of the captures
+        :param max_profiles: Captures kept before the oldest are deleted
+        :param top_functions: Functions listed in the summary and the index page
+        :param tracemalloc_frames: Stack frames stored per traced allocation
+        :param allow_header: Honour the X-Plutus-Profile header (off by default, since any client can send it)
+        """
+        self.path = path
+        self.max_profiles = max_profiles
+        self.top_functions = top_functions
+        self.tracemalloc_frames = tracemalloc_frames
+        self.allow_header = allow_header
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def requested(self) -> bool:
+        """Whether the current call should be profiled."""
+        if os.environ.get(PROFILE_ENV_VAR, "").strip().lower() not in _FALSE:
+            return True
+        if not self.allow_header:
+            return False
+        from flask import has_request_context, request
+
+        return has_request_context() and request.headers.get(PROFILE_HEADER, "").strip().lower() not in _FALSE
+
+    def profile_callback(self, func):
+        """Decorator capturing a profile of the callback when ``requested``."""
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.requested():
+                return func(*args, **kwargs)
+            return self.run(func, *args, **kwargs)
+        return wrapper
+
+    def run(self, func, *args, **kwargs):
+        """Call func under cProfile and tracemalloc, write the capture and return func's result."""
+        with self._lock:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(self.tracemalloc_frames)
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            before = tracemalloc.take_snapshot()
+            profiler = cProfile.Profile()
+            error = None
+            start = time.perf_counter()
+            try:
+                profiler.enable()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profiler.disable()
+            except Exception as e:
+                error = repr(e)
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                current, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+                # A capture that cannot be written (e.g. a full disk) must not replace the callback's outcome.
+                try:
+                    self._write(func.__name__, args, kwargs, profiler, before, after, duration,
+                                peak - baseline, current - baseline, error)
+                except Exception as e:
+                    logger.warning("Could not write profile of %s: %s", func.__name__, e)
+
+    def _write(self, callback, args, kwargs, profiler, before, after, duration, peak, retained, error):
+        # Names sort by capture time (captures() and rotation rely on it); the counter orders captures
+        # taken within the same microsecond.
+        now_ns = time.time_ns()
+        stamp = (time.strftime("%Y%m%d-%H%M%S", time.localtime(now_ns // 1_000_000_000))
+                 + f"-{now_ns // 1000 % 1_000_000:06d}-{next(self._counter) % 1_000_000:06d}")
+        directory = os.path.join(self.path, f"{stamp}-{callback}")
+        os.makedirs(directory, exist_ok=True)
+
+        profiler.dump_stats(os.path.join(directory, "profile.prof"))
+        after.dump(os.path.join(directory, "allocations.snapshot"))
+        with open(os.path.join(directory, "allocations.txt"), "w") as file:
+            for stat in after.compare_to(before, "lineno")[:50]:
+                file.write(f"{stat}\n")
+
+        summary = {
+            "callback": callback,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "args": [repr(arg)[:80] for arg in args] + [f"{key}={value!r}"[:80] for key, value in kwargs.items()],
+            "duration_seconds": duration,
+            "peak_bytes": peak,
+            "retained_bytes": retained,
+            "error": error,
+            "top_functions": _top_functions(profiler, self.top_functions),
+        }
+        with open(os.path.join(directory, "summary.json"), "w") as file:
+            json.dump(summary, file, indent=2)
+        self._rotate()
+
+    def _rotate(self):
+        captures = self.captures()
+        for name in captures[self.max_profiles:]:
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def captures(self) -> list:
+        """Capture directory names, newest first."""
+        if not os.path.isdir(self.path):
+            return []
+        names = [name for name in os.listdir(self.path)
+                 if os.path.exists(os.path.join(self.path, name, "summary.json"))]
+        return sorted(names, reverse=True)
+
+    def summary(self, name: str) -> dict:
+        with open(os.path.join(self.path, name, "summary.json"), "r") as file:
+            return json.load(file)
+
+    def render_index(self, base: str = "/profiles", top: int = 5) -> str:
+        """HTML page listing the captures with their slowest functions."""
+        out = io.StringIO()
+        out.write("<html><head><title>Profiles</title></head><body style='font-family:monospace'>")
+        header = f" or send the {PROFILE_HEADER}: 1 header" if self.allow_header else ""
+        out.write(f"<h1>Profiles</h1><p>Set {PROFILE_ENV_VAR}=1{header} to "
+                  f"capture. Newest first; the last {self.max_profiles} are kept.</p>")
+        out.write("<table border='1' cellpadding='4'><tr><th>Time</th><th>Callback</th><th>Arguments</th>"
+                  "<th>Duration ms</th><th>Peak MB</th><th>Slowest functions (cumulative ms)</th>"
+                  "<th>Files</th></tr>")
+        for name in self.captures():
+            summary = self.summary(name)
+            functions = "<br>".join(f"{row['cumtime'] * 1000:.1f} {html.escape(row['function'])}"
+                                    for row in summary["top_functions"][:top])
+            files = " ".join(f"<a href='{base}/{name}/{file}'>{file}</a>"
+                             for file in ("profile.prof", "allocations.txt", "allocations.snapshot"))
+            error = f"<br><b>{html.escape(summary['error'])}</b>" if summary["error"] else ""
+            out.write(f"<tr><td>{summary['time']}</td><td>{summary['callback']}{error}</td>"
+                      f"<td>{html.escape(', '.join(summary['args']))}</td>"
+                      f"<td>{summary['duration_seconds'] * 1000:.1f}</td>"
+                      f"<td>{summary['peak_bytes'] / 1e6:.2f}</td><td>{functions}</td><td>{files}</td></tr>")
+        out.write("</table></body></html>")
+        return out.getvalue()
+
+
+def profiler_from_config() -> CallbackProfiler:
+    """Build a CallbackProfiler from the 'profiling' section of config.json (relative paths are from the config file)."""
+    settings = get_setting("profiling", PROFILING_DEFAULTS)
+    settings["path"] = os.path.join(os.path.dirname(CONFIG_PATH), settings["path"])
+    return CallbackProfiler(**settings)
+
+
+# Shared profiler wrapping the dashboard callbacks.
+profiler = profiler_from_config()
+profile_callback = profiler.profile_callback
+
+
+def register_profiles_route(server, path: str = "/profiles", callback_profiler: CallbackProfiler = profiler):
+    """
+    Serve the capture index and files on a Flask server.
+
+    :param server: Flask app (``app.server`` for Dash)
+    :param path: URL path of the index
+    :param callback_profiler: Profiler whose captures are listed
+    """
+    from flask import Response, abort, send_from_directory
+
+    def index_view():
+        return Response(callback_profiler.render_index(path), mimetype="text/html")
+
+    def file_view(name, filename):
+        if name not in callback_profiler.captures():
+            abort(404)
+        return send_from_directory(os.path.abspath(os.path.join(callback_profiler.path, name)), filename,
+                                   as_attachment=not filename.endswith(".txt"))
+
+    server.add_url_rule(path, "profiles", index_view)
+    server.add_url_rule(f"{path}/<name>/<filename>", "profile_file", file_view)
+
+
+# Quick test
+if __name__ == "__main__":
+    import numpy as np
+
+    os.environ[PROFILE_ENV_VAR] = "1"
+
+    @profile_callback
+    def simulate(paths):
+        return np.random.normal(size=(paths, 250)).cumsum(axis=1)[:, -1].mean()
+
+    simulate(10_000)
+    latest = profiler.captures()[0]
+    print(latest, json.dumps(profiler.summary(latest)["top_functions"][:3], indent=2))
@@ -1,6 +1,17 @@
 # main.py
+import atexit
+
 from scr.app_components import app  # This is the same app instance with callbacks already registered
+from scr.screener import snapshot_table
+from scr.watchlist import refresher_from_config
 
 if __name__ == "__main__":
+    # Keep the configured watchlist warm in the background (no-op when the watchlist is empty).
+    refresher = refresher_from_config()
+    if refresher is not None:
+        refresher.start()
+    # This process owns the shared screener table; persist what the dashboard computed when it exits.
+    atexit.register(snapshot_table.flush)
+
     # Run on all available interfaces, using port 8050.
     app.run_server(debug=True, use_reloader=False, host='0.0.0.0', port=8050)
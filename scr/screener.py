@@ -0,0 +1,318 @@
+import os
+import re
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from scr.bar_store import file_lock
+from scr.technical_ind import DEFAULT_INDICATOR_PARAMS
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "snapshot.npz")
+
+# The screener compares daily snapshots computed with the dashboard's default windows.
+SNAPSHOT_INTERVAL = "1d"
+
+_p = DEFAULT_INDICATOR_PARAMS
+SMA_COLUMN = f"SMA_{_p['sma_window']}"
+EMA_COLUMN = f"EMA_{_p['ema_window']}"
+MACD_COLUMN = f"MACD_{_p['macd_short']}_{_p['macd_long']}"
+BOLLINGER_MID_COLUMN = f"Bollinger_Mid_{_p['bollinger_window']}"
+BOLLINGER_UPPER_COLUMN = f"Bollinger_Upper_{_p['bollinger_window']}_2"
+BOLLINGER_LOWER_COLUMN = f"Bollinger_Lower_{_p['bollinger_window']}_2"
+NUMERIC_COLUMNS = [
+    "Close",
+    SMA_COLUMN,
+    EMA_COLUMN,
+    "RSI",
+    MACD_COLUMN,
+    "MACD_Signal_9",
+    BOLLINGER_MID_COLUMN,
+    BOLLINGER_UPPER_COLUMN,
+    BOLLINGER_LOWER_COLUMN,
+]
+SIGNAL_COLUMNS = [
+    f"Signal_SMA_{_p['sma_window']}",
+    f"Signal_EMA_{_p['ema_window']}",
+    "Signal_RSI",
+    f"Signal_MACD_{_p['macd_short']}_{_p['macd_long']}",
+    f"Signal_Bollinger_{_p['bollinger_window']}_2",
+]
+SIGNAL_LABELS = ["Strong Sell", "Sell", "Hold", "Buy", "Strong Buy"]
+SIGNAL_CODES = {label: code for code, label in enumerate(SIGNAL_LABELS)}
+MISSING_CODE = -1
+
+_OPERATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+_CONDITION = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*(.+?)\s*$")
+
+
+class SnapshotTable:
+    def __init__(self, path: str = SNAPSHOT_PATH, capacity: int = 1024):
+        """
+        Columnar table holding the latest indicator values and signal codes per ticker.
+
+        Numeric columns get a sort order (for ranges and top-k), built on the first query that needs
+        it and then kept current by binary-search inserts on every update. Signal columns get one
+        bitmap per signal label (for equality filters).
+
+        :param path: Where the table is persisted
+        :param capacity: Initial number of rows allocated
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._rows = {}
+        self.tickers = np.empty(capacity, dtype=object)
+        self.numeric = {col: np.full(capacity, np.nan) for col in NUMERIC_COLUMNS}
+        self.signals = {col: np.full(capacity, MISSING_CODE, dtype=np.int8) for col in SIGNAL_COLUMNS}
+        self.bitmaps = {col: np.zeros((len(SIGNAL_LABELS), capacity), dtype=bool) for col in SIGNAL_COLUMNS}
+        self._sorted = {}
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def columns(self):
+        return NUMERIC_COLUMNS + SIGNAL_COLUMNS
+
+    def _grow(self):
+        capacity = len(self.tickers) * 2
+        self.tickers = np.concatenate([self.tickers, np.empty(len(self.tickers), dtype=object)])
+        for col, values in self.numeric.items():
+            self.numeric[col] = np.concatenate([values, np.full(len(values), np.nan)])
+        for col, values in self.signals.items():
+            self.signals[col] = np.concatenate([values, np.full(len(values), MISSING_CODE, dtype=np.int8)])
+        for col, bitmap in self.bitmaps.items():
+            grown = np.zeros((len(SIGNAL_LABELS), capacity), dtype=bool)
+            grown[:, :bitmap.shape[1]] = bitmap
+            self.bitmaps[col] = grown
+
+    def update(self, ticker: str, snapshot: pd.Series):
+        """
+        Insert or overwrite the row of one ticker.
+
+        :param ticker: Stock ticker symbol
+        :param snapshot: Latest indicator row (e.g. TechnicalIndicators.snapshot())
+        """
+        ticker = ticker.strip().upper()
+        with self._lock:
+            row = self._rows.get(ticker)
+            is_new = row is None
+            if is_new:
+                row = len(self._rows)
+                if row == len(self.tickers):
+                    self._grow()
+                self._rows[ticker] = row
+                self.tickers[row] = ticker
+            for col in NUMERIC_COLUMNS:
+                value = snapshot.get(col, np.nan)
+                value = np.nan if value is None else float(value)
+                if col in self._sorted:
+                    self._move_in_order(col, row, None if is_new else self.numeric[col][row], value)
+                self.numeric[col][row] = value
+            for col in SIGNAL_COLUMNS:
+                code = SIGNAL_CODES.get(snapshot.get(col), MISSING_CODE)
+                self.signals[col][row] = code
+                self.bitmaps[col][:, row] = False
+                if code != MISSING_CODE:
+                    self.bitmaps[col][code, row] = True
+            self._dirty = True
+
+    @staticmethod
+    def _position(order: np.ndarray, values: np.ndarray, row: int, value: float) -> int:
+        # Equal values are ordered by row, like a stable argsort; NaN sorts last in both.
+        lo = int(np.searchsorted(values, value, side="left"))
+        hi = int(np.searchsorted(values, value, side="right"))
+        return lo + int(np.searchsorted(order[lo:hi], row))
+
+    def _move_in_order(self, col: str, row: int, old_value, value: float):
+        """Remove a row from a column's sort order (unless it is new) and insert it at its new value."""
+        order, values = self._sorted[col]
+        if old_value is not None:
+            position = self._position(order, values, row, old_value)
+            order, values = np.delete(order, position), np.delete(values, position)
+        position = self._position(order, values, row, value)
+        self._sorted[col] = (np.insert(order, position, row), np.insert(values, position, value))
+
+    def _sort_order(self, col: str):
+        """Row order and sorted values of a numeric column; NaN sorts last, so the non-NaN prefix is ascending."""
+        sorted_col = self._sorted.get(col)
+        if sorted_col is None:
+            values = self.numeric[col][:len(self._rows)]
+            order = np.argsort(values, kind="stable")
+            sorted_col = self._sorted[col] = (order, values[order])
+        return sorted_col
+
+    def _values(self, col: str):
+        if col in self.numeric:
+            return self.numeric[col][:len(self._rows)]
+        if col in self.signals:
+            return self.signals[col][:len(self._rows)]
+        raise ValueError(f"Unknown column '{col}'. Choose from {', '.join(self.columns)}.")
+
+    def _mask(self, col: str, op: str, value) -> np.ndarray:
+        n = len(self._rows)
+        if op not in _OPERATORS:
+            raise ValueError(f"Unknown operator '{op}'.")
+        self._values(col)
+
+        if col in self.signals:
+            if value not in SIGNAL_CODES:
+                raise ValueError(f"Unknown signal '{value}'. Choose from {', '.join(SIGNAL_LABELS)}.")
+            if op not in ("==", "!="):
+                raise ValueError("Signal columns only support '==' and '!='.")
+            hits = self.bitmaps[col][SIGNAL_CODES[value], :n]
+            return hits if op == "==" else ~hits & (self.signals[col][:n] != MISSING_CODE)
+
+        if isinstance(value, str):
+            # Column-to-column comparison, e.g. Close < Bollinger_Lower_20_2.
+            return _OPERATORS[op](self._values(col), self._values(value))
+
+        if op in ("==", "!="):
+            return _OPERATORS[op](self._values(col), value)
+
+        # Range on a constant: binary search in the sorted order instead of scanning every value.
+        order, values = self._sort_order(col)
+        valid = n - int(np.isnan(values).sum())
+        side = "left" if op in ("<", ">=") else "right"
+        cut = int(np.searchsorted(values[:valid], value, side=side))
+        selected = order[:cut] if op in ("<", "<=") else order[cut:valid]
+        mask = np.zeros(n, dtype=bool)
+        mask[selected] = True
+        return mask
+
+    def query(self, filters=(), sort_by: str = None, ascending: bool = True, limit: int = None) -> pd.DataFrame:
+        """
+        Filter, sort and cut the table.
+
+        :param filters: Iterable of (column, operator, value) where value is a number, a signal label or
+                        another column name
+        :param sort_by: Numeric column to sort by
+        :param ascending: Sort direction
+        :param limit: Keep only the first ``limit`` rows (top-k)
+        :return: DataFrame indexed by ticker
+        """
+        with self._lock:
+            n = len(self._rows)
+            mask = np.ones(n, dtype=bool)
+            for col, op, value in filters:
+                mask &= self._mask(col, op, value)
+
+            if sort_by is not None:
+                if sort_by not in self.numeric:
+                    raise ValueError(f"Can only sort by numeric columns, not '{sort_by}'.")
+                order, _ = self._sort_order(sort_by)
+                valid = n - int(np.isnan(self.numeric[sort_by][:n]).sum())
+                order = order[:valid] if ascending else order[:valid][::-1]
+                rows = order[mask[order]]
+            else:
+                rows = np.flatnonzero(mask)
+            if limit is not None:
+                rows = rows[:limit]
+
+            data = {col: self.numeric[col][rows] for col in NUMERIC_COLUMNS}
+            codes = np.array(SIGNAL_LABELS + [None], dtype=object)
+            data.update({col: codes[self.signals[col][rows]] for col in SIGNAL_COLUMNS})
+            return pd.DataFrame(data, index=pd.Index(self.tickers[rows], name="Ticker"))
+
+    def save(self, path: str = None):
+        """
+        Write the table's columns to an ``.npz`` file.
+
+        Rows already on disk for tickers this table does not hold are kept, so processes that each computed
+        part of the table do not overwrite one another; rows held in memory win.
+
+        :param path: Where to write, defaults to the table's own path
+        """
+        path = path or self.path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with file_lock(path + ".lock"):
+            if os.path.exists(path):
+                on_disk = SnapshotTable.load(path)
+                for ticker, snapshot in on_disk.query().iterrows():
+                    if ticker not in self._rows:
+                        self.update(ticker, snapshot)
+            with self._lock:
+                n = len(self._rows)
+                arrays = {f"num:{col}": values[:n] for col, values in self.numeric.items()}
+                arrays.update({f"sig:{col}": values[:n] for col, values in self.signals.items()})
+                arrays["tickers"] = self.tickers[:n].astype(str)
+                self._dirty = False
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot.", suffix=".tmp.npz")
+            os.close(fd)
+            try:
+                np.savez(tmp_path, **arrays)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def flush(self):
+        """Save the table if it changed since it was last saved or loaded."""
+        if self._dirty:
+            self.save()
+
+    @classmethod
+    def load(cls, path: str = SNAPSHOT_PATH):
+        """Load a persisted table, or return an empty one if there is none yet."""
+        if not os.path.exists(path):
+            return cls(path)
+        with np.load(path, allow_pickle=False) as arrays:
+            # Older files keyed rows by the ticker as typed; keep the last row of each upper-cased ticker.
+            last = {str(ticker).strip().upper(): row for row, ticker in enumerate(arrays["tickers"])}
+            keep = np.array(list(last.values()), dtype=int)
+            table = cls(path, capacity=max(1024, len(keep)))
+            for row, ticker in enumerate(last):
+                table._rows[ticker] = row
+                table.tickers[row] = ticker
+            n = len(keep)
+            for col in NUMERIC_COLUMNS:
+                if f"num:{col}" in arrays:
+                    table.numeric[col][:n] = arrays[f"num:{col}"][keep]
+            for col in SIGNAL_COLUMNS:
+                if f"sig:{col}" in arrays:
+                    codes = arrays[f"sig:{col}"][keep]
+                    table.signals[col][:n] = codes
+                    for code in range(len(SIGNAL_LABELS)):
+                        table.bitmaps[col][code, :n] = codes == code
+        return table
+
+
+def parse_filters(text: str):
+    """
+    Parse a filter string such as ``"Close < Bollinger_Lower_20_2 and Signal_RSI == Buy"``.
+
+    :param text: Conditions joined by 'and'
+    :return: List of (column, operator, value) tuples
+    """
+    filters = []
+    if not text or not text.strip():
+        return filters
+    for part in re.split(r"\s+and\s+", text.strip(), flags=re.IGNORECASE):
+        match = _CONDITION.match(part)
+        if not match:
+            raise ValueError(f"Could not parse condition '{part}'. Use e.g. 'RSI < 30'.")
+        col, op, raw = match.groups()
+        raw = raw.strip("'\"")
+        try:
+            value = float(raw)
+        except ValueError:
+            value = raw
+        filters.append((col, op, value))
+    return filters
+
+
+# Shared table used by the dashboard and the watchlist refresher. The watchlist flushes it once per cycle;
+# the app's entry point flushes snapshots computed by the dashboard alone at exit. Importing this module
+# (e.g. in a batch pool worker) never writes the file.
+snapshot_table = SnapshotTable.load()
@@ -1,22 +1,24 @@
 import numpy as np
 import pandas as pd
 from scr.data_handler import DataHandler
+from scr.metrics import span
 
 
 class MonteCarloSimulation:
-    def __init__(self, ticker: str, period: str = "1y", interval: str = "1d"):
+    def __init__(self, ticker: str, period: str = "1y", interval: str = "1d", data: pd.DataFrame = None):
         """
         Initialize Monte Carlo Simulation with historical data.
 
         :param ticker: Stock ticker symbol (e.g., 'AAPL')
         :param period: Time period for historical data (e.g., '1y', '6mo', '3mo')
         :param interval: Data interval (e.g., '1d', '1h', '5m')
+        :param data: Historical bars to use instead of fetching them (e.g. a BarStore view)
         """
         self.ticker = ticker
         self.period = period
         self.interval = interval
         self.data_handler = DataHandler()
-        self.data = self._fetch_data()
+        self.data = data if data is not None else self._fetch_data()
 
     def _fetch_data(self):
         """Fetch historical stock data."""
@@ -25,6 +27,11 @@ class MonteCarloSimulation:
             raise ValueError(data["error"])
         return data
 
+    def _log_return_stats(self):
+        """Mean and standard deviation of the historical daily log returns."""
+        log_returns = np.log(1 + self.data["Close"].pct_change().dropna())
+        return log_returns.mean(), log_returns.std()
+
     def run_simulation(self, num_simulations: int = 1000, num_days: int = 30, mu: float = None, sigma: float = None):
         """
         Run Monte Carlo simulation for stock price movement.
@@ -38,29 +45,71 @@ class MonteCarloSimulation:
         if self.data is None or "Close" not in self.data.columns:
             raise ValueError("Historical data not available or missing 'close' column.")
 
-        # Compute log returns
-        log_returns = np.log(1 + self.data["Close"].pct_change().dropna())
-
         # Use historical mean and standard deviation if not provided
-        mu = mu if mu is not None else log_returns.mean()
-        sigma = sigma if sigma is not None else log_returns.std()
+        hist_mu, hist_sigma = self._log_return_stats()
+        mu = mu if mu is not None else hist_mu
+        sigma = sigma if sigma is not None else hist_sigma
 
         # Get last closing price as starting point
         last_price = self.data["Close"].iloc[-1]
 
         # Monte Carlo Simulation
-        price_paths = np.zeros((num_days, num_simulations))
-        price_paths[0] = last_price
+        with span("run_simulation", ticker=self.ticker, paths=num_simulations, days=num_days):
+            price_paths = np.zeros((num_days, num_simulations))
+            price_paths[0] = last_price
 
-        for t in range(1, num_days):
-            random_shocks = np.random.normal(mu, sigma, num_simulations)
-            price_paths[t] = price_paths[t - 1] * np.exp(random_shocks)
+            for t in range(1, num_days):
+                random_shocks = np.random.normal(mu, sigma, num_simulations)
+                price_paths[t] = price_paths[t - 1] * np.exp(random_shocks)
 
         # Convert to DataFrame for analysis
         sim_df = pd.DataFrame(price_paths, index=range(1, num_days + 1))
 
         return sim_df
 
+    def run_sweep(self, mus, sigmas, num_simulations: int = 1000, num_days: int = 30, seed: int = None):
+        """
+        Terminal price statistics for every (mu, sigma) pair of a grid, computed in one batch.
+
+        A path of ``run_simulation`` ends at last_price * exp(steps * mu + sigma * (sum of steps standard
+        normals)), so only that sum is drawn, once per path, and shared by every cell (common random numbers):
+        differences between cells come from the parameters, not from sampling noise.
+
+        :param mus: Expected daily returns; None uses the historical mean
+        :param sigmas: Volatilities; None uses the historical standard deviation
+        :param num_simulations: Number of simulated paths per cell
+        :param num_days: Number of future days, counted as in run_simulation
+        :param seed: Seed of the random draws
+        :return: DataFrame indexed by (mu, sigma) in grid order, with the terminal price 'mean', 'std',
+                 'p5', 'p50', 'p95' and 'prob_gain' (share of paths ending above the last close)
+        """
+        if self.data is None or "Close" not in self.data.columns:
+            raise ValueError("Historical data not available or missing 'close' column.")
+
+        hist_mu, hist_sigma = self._log_return_stats()
+        mus = np.array([hist_mu if mu is None else mu for mu in mus], dtype=float)
+        sigmas = np.array([hist_sigma if sigma is None else sigma for sigma in sigmas], dtype=float)
+        last_price = self.data["Close"].iloc[-1]
+        # run_simulation's first row is the last close, so a path takes num_days - 1 steps.
+        steps = max(num_days - 1, 0)
+
+        with span("run_sweep", ticker=self.ticker, paths=num_simulations, cells=len(mus) * len(sigmas)):
+            shocks = np.random.default_rng(seed).standard_normal(num_simulations) * np.sqrt(steps)
+            # (mu, sigma, path) tensor of terminal prices.
+            terminal = last_price * np.exp(steps * mus[:, None, None] + sigmas[None, :, None] * shocks)
+            p5, p50, p95 = np.percentile(terminal, [5, 50, 95], axis=-1)
+            stats = {
+                "mean": terminal.mean(axis=-1),
+                "std": terminal.std(axis=-1),
+                "p5": p5,
+                "p50": p50,
+                "p95": p95,
+                "prob_gain": (terminal > last_price).mean(axis=-1),
+            }
+
+        index = pd.MultiIndex.from_product([mus, sigmas], names=["mu", "sigma"])
+        return pd.DataFrame({name: values.ravel() for name, values in stats.items()}, index=index)
+
 
 # Quick test
 if __name__ == "__main__":
@@ -69,3 +118,4 @@ if __name__ == "__main__":
     simulated_prices = simulator.run_simulation(num_simulations=500, num_days=30)
 
     print(simulated_prices.head())  # Display the first few rows of the simulation
+    print(simulator.run_sweep([None, 0.01], [None, 0.2], num_simulations=500, num_days=30))
@@ -0,0 +1,142 @@
+import csv
+import os
+import re
+import threading
+from bisect import bisect_left
+
+from scr.config import CONFIG_PATH, get_setting
+
+SYMBOLS_DEFAULTS = {
+    "path": os.path.join(os.path.dirname(__file__), "..", "data", "symbols.csv"),
+    "max_suggestions": 10,
+}
+
+# Yahoo-only notations (crypto pairs, FX, indices, futures, non-US listings such as 'VOD.L') that the US
+# exchange symbol lists do not carry.
+_UNLISTED = re.compile(r"[-=^.]")
+
+
+def _read_symbols(path: str):
+    """Read (symbol, name) pairs from a comma- or pipe-delimited file with a Symbol column."""
+    with open(path, "r", newline="", encoding="utf-8") as file:
+        header = file.readline()
+        delimiter = "|" if header.count("|") > header.count(",") else ","
+        fields = [field.strip().lower() for field in header.strip().split(delimiter)]
+        if "symbol" not in fields:
+            raise ValueError(f"Symbol file '{path}' has no 'Symbol' column.")
+        symbol_col = fields.index("symbol")
+        name_col = next((fields.index(f) for f in ("name", "security name") if f in fields), None)
+        for row in csv.reader(file, delimiter=delimiter):
+            if len(row) <= symbol_col or not row[symbol_col].strip():
+                continue
+            # NASDAQ Trader files end with a 'File Creation Time' footer line.
+            if row[0].startswith("File Creation Time"):
+                continue
+            name = row[name_col].strip() if name_col is not None and len(row) > name_col else ""
+            yield row[symbol_col].strip().upper(), name
+
+
+class SymbolIndex:
+    def __init__(self, path: str = SYMBOLS_DEFAULTS["path"], max_suggestions: int = 10):
+        """
+        Sorted in-memory index over a symbol master file, used for autocomplete and to reject
+        unknown tickers before they are sent upstream. Disabled when the file does not exist.
+
+        :param path: CSV (or NASDAQ Trader pipe-delimited) file with a 'Symbol' and optionally a 'Name' column
+        :param max_suggestions: Default number of suggestions returned
+        """
+        self.path = path
+        self.max_suggestions = max_suggestions
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._symbols = []
+        self._names = {}
+        self._by_name = []
+
+    def _load(self):
+        # Loaded on first use so importing the app does not read the file.
+        with self._lock:
+            if self._loaded:
+                return
+            if os.path.exists(self.path):
+                names = dict(_read_symbols(self.path))
+                self._names = names
+                self._symbols = sorted(names)
+                self._by_name = sorted((name.upper(), symbol) for symbol, name in names.items() if name)
+            self._loaded = True
+
+    @property
+    def enabled(self) -> bool:
+        self._load()
+        return bool(self._symbols)
+
+    def __len__(self):
+        self._load()
+        return len(self._symbols)
+
+    def contains(self, ticker: str) -> bool:
+        """Exact lookup by binary search."""
+        self._load()
+        ticker = ticker.strip().upper()
+        i = bisect_left(self._symbols, ticker)
+        return i < len(self._symbols) and self._symbols[i] == ticker
+
+    def is_known(self, ticker: str) -> bool:
+        """
+        Whether a ticker may be sent upstream: always True when the index is disabled or the ticker uses a
+        Yahoo-only notation (e.g. 'BTC-USD', 'EURUSD=X', '^GSPC', 'SHOP.TO').
+        """
+        if not self.enabled or _UNLISTED.search(ticker):
+            return True
+        return self.contains(ticker)
+
+    def suggest(self, prefix: str, limit: int = None):
+        """
+        Symbols starting with the prefix, followed by symbols whose name starts with it.
+
+        :param prefix: Text typed so far
+        :param limit: Maximum number of suggestions (defaults to max_suggestions)
+        :return: List of (symbol, name) tuples
+        """
+        self._load()
+        limit = limit or self.max_suggestions
+        prefix = (prefix or "").strip().upper()
+        if not prefix:
+            return []
+
+        results = []
+        i = bisect_left(self._symbols, prefix)
+        while i < len(self._symbols) and len(results) < limit and self._symbols[i].startswith(prefix):
+            results.append((self._symbols[i], self._names[self._symbols[i]]))
+            i += 1
+
+        seen = {symbol for symbol, _ in results}
+        i = bisect_left(self._by_name, (prefix,))
+        while i < len(self._by_name) and len(results) < limit and self._by_name[i][0].startswith(prefix):
+            symbol = self._by_name[i][1]
+            if symbol not in seen:
+                results.append((symbol, self._names[symbol]))
+                seen.add(symbol)
+            i += 1
+        return results
+
+
+def index_from_config() -> SymbolIndex:
+    """Build a SymbolIndex from the 'symbols' section of config.json (relative paths are from the config file)."""
+    settings = get_setting("symbols", SYMBOLS_DEFAULTS)
+    path = os.path.join(os.path.dirname(CONFIG_PATH), settings["path"])
+    return SymbolIndex(path, settings["max_suggestions"])
+
+
+# Shared index used by DataHandler and the ticker autocomplete.
+symbol_index = index_from_config()
+
+
+# Quick test
+if __name__ == "__main__":
+    if not symbol_index.enabled:
+        print(f"No symbol file at {symbol_index.path}; validation and autocomplete are disabled.")
+    else:
+        print(len(symbol_index), "symbols")
+        print(symbol_index.suggest("MS"))
+        print(symbol_index.is_known("MSFT"), symbol_index.is_known("MSFTX"))
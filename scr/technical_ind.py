@@ -1,6 +1,16 @@
 import pandas as pd
 import numpy as np
 
+# Indicator windows used by the dashboard when the user has not changed them.
+DEFAULT_INDICATOR_PARAMS = {
+    "sma_window": 14,
+    "ema_window": 14,
+    "rsi_window": 14,
+    "macd_short": 12,
+    "macd_long": 26,
+    "bollinger_window": 20,
+}
+
 
 class TechnicalIndicators:
     def __init__(self, data: pd.DataFrame):
@@ -91,6 +101,20 @@ class TechnicalIndicators:
 
         return self.data
 
+    def compute_all(self, sma_window: int = 14, ema_window: int = 14, rsi_window: int = 14,
+                    macd_short: int = 12, macd_long: int = 26, bollinger_window: int = 20):
+        """Calculate every indicator shown on the dashboard."""
+        self.simple_moving_average(sma_window)
+        self.exponential_moving_average(ema_window)
+        self.relative_strength_index(rsi_window)
+        self.macd(macd_short, macd_long)
+        self.bollinger_bands(bollinger_window)
+        return self.data
+
+    def snapshot(self) -> pd.Series:
+        """Return the latest row (most recent indicator values and signals)."""
+        return self.data.iloc[-1]
+
 
 # Quick test
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from scr.analytics import indicator_snapshot, montecarlo_forecast
+from scr.config import get_setting
+from scr.data_handler import DataHandler
+from scr.fetch_scheduler import BACKGROUND
+from scr.metrics import registry, WATCHLIST_STALENESS
+from scr.screener import snapshot_table
+
+logger = logging.getLogger(__name__)
+
+WATCHLIST_DEFAULTS = {
+    "tickers": [],
+    "period": "1y",
+    "interval": "1d",
+    "jitter_seconds": 30,
+    "max_workers": 4,
+}
+
+# Length of intraday bars in seconds; anything coarser is refreshed after the daily close.
+INTRADAY_SECONDS = {
+    "1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800,
+    "60m": 3600, "90m": 5400, "1h": 3600,
+}
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_CLOSE_HOUR = 16
+
+
+def next_bar_close(interval: str, now: datetime) -> datetime:
+    """
+    Return the first bar close strictly after ``now``.
+
+    Intraday bars close on multiples of their length (UTC); daily and coarser bars
+    close at 16:00 New York time on weekdays.
+
+    :param interval: Data interval (e.g., '5m', '1h', '1d')
+    :param now: Timezone-aware current time
+    :return: Timezone-aware datetime of the next close
+    """
+    if interval in INTRADAY_SECONDS:
+        step = INTRADAY_SECONDS[interval]
+        epoch = now.timestamp()
+        return datetime.fromtimestamp((epoch // step + 1) * step, tz=now.tzinfo)
+
+    local = now.astimezone(MARKET_TZ)
+    close = local.replace(hour=MARKET_CLOSE_HOUR, minute=0, second=0, microsecond=0)
+    if close <= local:
+        close += timedelta(days=1)
+    while close.weekday() >= 5:
+        close += timedelta(days=1)
+    return close.astimezone(now.tzinfo)
+
+
+class WatchlistRefresher:
+    def __init__(self, tickers, period: str = "1y", interval: str = "1d",
+                 jitter_seconds: float = 30, max_workers: int = 4, table=None):
+        """
+        Background scheduler that keeps bars, indicator snapshots and default forecasts
+        for a watchlist warm in the shared caches.
+
+        :param tickers: Ticker symbols to keep warm
+        :param period: Time period of the refreshed history
+        :param interval: Data interval; refreshes happen after each bar of this interval closes
+        :param jitter_seconds: Random delay added after each close so refreshes do not hit Yahoo all at once
+        :param max_workers: Maximum number of tickers refreshed concurrently
+        :param table: SnapshotTable kept current for the screener (defaults to the shared table)
+        """
+        self.tickers = list(tickers)
+        self.period = period
+        self.interval = interval
+        self.jitter_seconds = jitter_seconds
+        self.max_workers = max_workers
+        self.table = table if table is not None else snapshot_table
+        self.last_refreshed = {}
+        self.last_errors = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = time.time()
+
+    def refresh_ticker(self, ticker: str):
+        """Refetch bars and recompute the default analytics for one ticker."""
+        # Keep results (bars included, so the tabs never go upstream for them) until the next cycle
+        # has had a chance to replace them.
+        now = time.time()
+        ttl = self.expires_at(now) - now
+        try:
+            bars = DataHandler(priority=BACKGROUND).fetch_stock_data(ticker, period=self.period, interval=self.interval,
+                                                                     refresh=True, ttl=ttl)
+            if isinstance(bars, dict) and "error" in bars:
+                raise ValueError(bars["error"])
+            # Daily snapshots land in the screener table inside indicator_snapshot.
+            indicator_snapshot(ticker, interval=self.interval, period=self.period, refresh=True, ttl=ttl,
+                               table=self.table)
+            montecarlo_forecast(ticker, interval=self.interval, period=self.period, refresh=True, ttl=ttl)
+        except Exception as e:
+            logger.warning("Watchlist refresh failed for %s: %s", ticker, e)
+            with self._lock:
+                self.last_errors[ticker] = str(e)
+            return False
+        with self._lock:
+            self.last_refreshed[ticker] = time.time()
+            self.last_errors.pop(ticker, None)
+        return True
+
+    def refresh_all(self):
+        """Refresh every ticker with at most ``max_workers`` running at once."""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="watchlist") as pool:
+            results = dict(zip(self.tickers, pool.map(self.refresh_ticker, self.tickers)))
+        # Persist the screener table once per cycle rather than once per ticker.
+        self.table.flush()
+        return results
+
+    def expires_at(self, refreshed: float) -> float:
+        """
+        Time after which a refresh made at ``refreshed`` has missed a whole cycle: the bar after the next one
+        has closed (plus jitter). Follows the bar calendar, so a Friday refresh of daily bars lasts the weekend.
+
+        :param refreshed: Epoch seconds of the refresh
+        :return: Epoch seconds
+        """
+        close = next_bar_close(self.interval, datetime.fromtimestamp(refreshed, tz=MARKET_TZ))
+        return next_bar_close(self.interval, close).timestamp() + self.jitter_seconds
+
+    def staleness(self) -> dict:
+        """
+        Report how old each ticker's analytics are.
+
+        :return: dict of ticker -> {'age_seconds', 'stale', 'error'}; age is None if never refreshed
+        """
+        now = time.time()
+        report = {}
+        with self._lock:
+            for ticker in self.tickers:
+                refreshed = self.last_refreshed.get(ticker)
+                age = None if refreshed is None else now - refreshed
+                report[ticker] = {
+                    "age_seconds": age,
+                    "stale": refreshed is None or now > self.expires_at(refreshed),
+                    "error": self.last_errors.get(ticker),
+                }
+        return report
+
+    def _collect_staleness(self, metrics):
+        now = time.time()
+        for ticker, status in self.staleness().items():
+            # A ticker never refreshed is as stale as the refresher is old.
+            age = status["age_seconds"] if status["age_seconds"] is not None else now - self._started_at
+            metrics.set_gauge(WATCHLIST_STALENESS, age, ticker=ticker)
+
+    def _run(self):
+        self.refresh_all()
+        while not self._stop.is_set():
+            now = datetime.now(tz=MARKET_TZ)
+            wake = next_bar_close(self.interval, now) + timedelta(seconds=random.uniform(0, self.jitter_seconds))
+            if self._stop.wait((wake - now).total_seconds()):
+                break
+            self.refresh_all()
+
+    def start(self):
+        """Warm the caches once, then keep refreshing in a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._started_at = time.time()
+            # Registered only while running, so replaced or stopped refreshers stop reporting.
+            registry.add_collector(self._collect_staleness)
+            self._thread = threading.Thread(target=self._run, name="watchlist-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the refresher thread to exit."""
+        self._stop.set()
+        registry.remove_collector(self._collect_staleness)
+        for ticker in self.tickers:
+            registry.remove_gauge(WATCHLIST_STALENESS, ticker=ticker)
+
+
+def refresher_from_config():
+    """Build a refresher from the 'watchlist' section of config.json, or None if no tickers are listed."""
+    settings = get_setting("watchlist", WATCHLIST_DEFAULTS)
+    if not settings["tickers"]:
+        return None
+    return WatchlistRefresher(**settings)
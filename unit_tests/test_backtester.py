@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from scr.backtester import backtest_signals, performance, signal_positions, sweep, sweep_close
+from scr.technical_ind import TechnicalIndicators
+
+
+class BacktesterTestCase(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+        self.df = pd.DataFrame({"Close": self.close}, index=pd.date_range("2020-01-01", periods=300, freq="D"))
+
+    def test_hold_keeps_previous_position(self):
+        signals = pd.Series(["Hold", "Buy", "Hold", "Strong Sell", "Hold", "Strong Buy"])
+        np.testing.assert_array_equal(signal_positions(signals), [0, 1, 1, 0, 0, 1])
+        np.testing.assert_array_equal(signal_positions(signals, allow_short=True), [-1, 1, 1, -1, -1, 1])
+
+    def test_performance_of_buy_and_hold(self):
+        close = np.array([100.0, 110.0, 99.0, 121.0])
+        result = performance(close, np.ones((1, 4)))
+        self.assertAlmostEqual(result["total_return"][0], 0.21)
+        self.assertAlmostEqual(result["max_drawdown"][0], -0.1)
+        self.assertAlmostEqual(result["hit_rate"][0], 2 / 3)
+
+    def test_grid_matches_technical_indicator_signals(self):
+        results = sweep_close(self.close, windows=range(1, 31))
+        ti = TechnicalIndicators(self.df)
+        cases = [
+            ("sma", 10, None, ti.simple_moving_average(10), "Signal_SMA_10"),
+            ("ema", 10, None, ti.exponential_moving_average(10), "Signal_EMA_10"),
+            ("rsi", 14, None, ti.relative_strength_index(14), "Signal_RSI"),
+            ("macd", 12, 26, ti.macd(12, 26), "Signal_MACD_12_26"),
+            ("bollinger", 20, None, ti.bollinger_bands(20), "Signal_Bollinger_20_2"),
+        ]
+        for indicator, window, long_window, df, signal_col in cases:
+            rows = results[(results["indicator"] == indicator) & (results["window"] == window)]
+            if long_window is not None:
+                rows = rows[rows["long_window"] == long_window]
+            expected = backtest_signals(df, signal_col)
+            self.assertAlmostEqual(rows["total_return"].iloc[0], expected["total_return"], msg=indicator)
+            self.assertAlmostEqual(rows["max_drawdown"].iloc[0], expected["max_drawdown"], msg=indicator)
+
+    def test_sweep_covers_every_ticker_and_window(self):
+        data = {"AAA": self.df, "BBB": self.df * 2}
+        results = sweep(data, indicators=("sma", "macd"), windows=range(1, 11), max_workers=1)
+        per_ticker = results.groupby("ticker").size()
+        # 10 SMA windows plus 45 short < long MACD pairs.
+        self.assertEqual(per_ticker.to_dict(), {"AAA": 55, "BBB": 55})
+
+    def test_unknown_indicator(self):
+        with self.assertRaises(ValueError):
+            sweep_close(self.close, indicators=("vwap",))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from scr.bar_store import BarStore
+from scr.data_handler import DataHandler
+from scr.fetch_scheduler import NoDataError
+from scr.simulations import MonteCarloSimulation
+from scr.technical_ind import TechnicalIndicators
+
+
+def make_bars(index):
+    values = np.arange(len(index), dtype=float) + 100
+    return pd.DataFrame({
+        "Open": values, "High": values + 1, "Low": values - 1, "Close": values + 0.5,
+        "Volume": np.full(len(index), 10.0),
+    }, index=index)
+
+
+class BarStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = BarStore(self.tmp_dir)
+        self.minutes = pd.date_range("2024-01-02 09:30", periods=390, freq="min", tz="America/New_York")
+        self.days = pd.date_range("2023-01-02", periods=260, freq="B", tz="America/New_York")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_append_merges_overlapping_bars(self):
+        bars = make_bars(self.minutes)
+        self.store.append("AAA", "1m", bars.iloc[:200])
+        update = bars.iloc[150:].copy()
+        update["Close"] = -1.0
+        self.assertEqual(self.store.append("AAA", "1m", update), 390)
+        loaded = self.store.load("AAA", "1m")
+        self.assertTrue(loaded.index.equals(self.minutes))
+        self.assertTrue((loaded["Close"].iloc[150:] == -1.0).all())
+
+    def test_load_returns_memory_mapped_views(self):
+        self.store.append("AAA", "1m", make_bars(self.minutes))
+        view = self.store.load("AAA", "1m", start=self.minutes[100], end=self.minutes[200])
+        self.assertEqual(len(view), 100)
+        self.assertIsInstance(view["Close"].to_numpy().base, np.memmap)
+
+    def test_append_writes_a_new_generation(self):
+        bars = make_bars(self.minutes)
+        self.store.append("AAA", "1m", bars.iloc[:200])
+        before = self.store.load("AAA", "1m")
+        self.store.append("AAA", "1m", bars.iloc[200:])
+        # The earlier view still reads the bars it mapped; the old files are gone from the directory.
+        self.assertEqual(len(before), 200)
+        self.assertEqual(before["Close"].iloc[-1], bars["Close"].iloc[199])
+        directory = os.path.join(self.tmp_dir, "AAA", "1m")
+        self.assertEqual(sorted(name for name in os.listdir(directory) if name.endswith(".npy")),
+                         sorted(f"{col}.2.npy" for col in ("ts", "Open", "High", "Low", "Close", "Volume")))
+        self.assertEqual(len(self.store.load("AAA", "1m")), 390)
+
+    def test_concurrent_appends_from_separate_stores(self):
+        # Separate instances share no thread locks, like separate processes; the lock file serializes them.
+        bars = make_bars(self.minutes)
+        stores = [BarStore(self.tmp_dir) for _ in range(6)]
+        threads = [threading.Thread(target=store.append, args=("AAA", "1m", bars.iloc[i::6]))
+                   for i, store in enumerate(stores)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(self.store.load("AAA", "1m").index.equals(self.minutes))
+
+    def test_resample_matches_pandas(self):
+        bars = make_bars(self.minutes[::5])
+        self.store.append("AAA", "5m", bars)
+        expected = bars.resample("30min").agg(
+            {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"})
+        resampled = self.store.resample("AAA", "30m")
+        self.assertTrue(resampled.index.equals(expected.index))
+        np.testing.assert_allclose(resampled.to_numpy(), expected.to_numpy())
+
+    def test_weekly_bars_start_on_monday(self):
+        self.store.append("AAA", "1d", make_bars(self.days))
+        weekly = self.store.resample("AAA", "1wk")
+        self.assertTrue((weekly.index.dayofweek == 0).all())
+        self.assertEqual(weekly["Volume"].iloc[0], 50.0)
+
+    def test_views_feed_indicators_and_simulation(self):
+        self.store.append("AAA", "1d", make_bars(self.days))
+        view = self.store.load("AAA", "1d")
+        df = TechnicalIndicators(view).simple_moving_average(14)
+        self.assertIn("SMA_14", df.columns)
+        sim_df = MonteCarloSimulation("AAA", data=view).run_simulation(num_simulations=10, num_days=5)
+        self.assertEqual(sim_df.shape, (5, 10))
+
+    def test_data_handler_derives_coarser_intervals_without_refetching(self):
+        downloads = []
+
+        def download(handler, ticker, period, interval):
+            downloads.append(interval)
+            return make_bars(pd.date_range(end=pd.Timestamp.now(tz="America/New_York").normalize(),
+                                           periods=260, freq="B"))
+
+        handler = DataHandler(bar_store=self.store)
+        with mock.patch.object(DataHandler, "_download", download):
+            daily = handler._fetch_from_store("AAA", "1y", "1d", "1d", refresh=False)
+            monthly = handler._fetch_from_store("AAA", "1y", "1mo", "1d", refresh=False)
+        self.assertEqual(downloads, ["1d"])
+        self.assertLess(len(monthly), len(daily))
+
+    def test_data_handler_tops_up_from_last_stored_bar(self):
+        periods = []
+
+        def download(handler, ticker, period, interval):
+            periods.append((period, interval))
+            return make_bars(pd.date_range(end=pd.Timestamp.now(tz="America/New_York").normalize(),
+                                           periods=260, freq="B"))
+
+        handler = DataHandler(bar_store=self.store, store_max_age=0)
+        with mock.patch.object(DataHandler, "_download", download):
+            handler._fetch_from_store("AAA", "1y", "1d", "1d", refresh=False)
+            handler._fetch_from_store("AAA", "1y", "1d", "1d", refresh=False)
+        self.assertEqual(periods, [("1y", "1d"), ("2d", "1d")])
+
+    def test_data_handler_serves_stored_bars_when_top_up_fails(self):
+        periods = []
+
+        def download(handler, ticker, period, interval):
+            periods.append(period)
+            if len(periods) > 1:
+                raise NoDataError("No data found")
+            return make_bars(pd.date_range(end=pd.Timestamp.now(tz="America/New_York").normalize(),
+                                           periods=260, freq="B"))
+
+        handler = DataHandler(bar_store=self.store, store_max_age=0)
+        with mock.patch.object(DataHandler, "_download", download):
+            first = handler._fetch_from_store("AAA", "1y", "1d", "1d", refresh=False)
+            fetched_at = self.store.meta("AAA", "1d")["fetched_at"]
+            second = handler._fetch_from_store("AAA", "1y", "1d", "1d", refresh=False)
+        self.assertEqual(len(periods), 2)
+        self.assertTrue(second.index.equals(first.index))
+        self.assertGreaterEqual(self.store.meta("AAA", "1d")["fetched_at"], fetched_at)
+
+    def test_data_handler_remembers_full_history(self):
+        periods = []
+
+        def download(handler, ticker, period, interval):
+            periods.append(period)
+            return make_bars(pd.date_range(end=pd.Timestamp.now(tz="America/New_York").normalize(),
+                                           periods=2000, freq="B"))
+
+        handler = DataHandler(bar_store=self.store)
+        with mock.patch.object(DataHandler, "_download", download):
+            handler._fetch_from_store("AAA", "max", "1d", "1d", refresh=False)
+            handler._fetch_from_store("AAA", "max", "1mo", "1d", refresh=False)
+            handler._fetch_from_store("AAA", "5y", "1d", "1d", refresh=False)
+        self.assertEqual(periods, ["max"])
+
+    def test_data_handler_downloads_each_base_interval_at_its_own_limit(self):
+        periods = []
+
+        def download(handler, ticker, period, interval):
+            periods.append((period, interval))
+            return make_bars(pd.date_range(end=pd.Timestamp.now(tz="UTC").floor("h"), periods=100, freq="h"))
+
+        handler = DataHandler(bar_store=self.store)
+        with mock.patch.object(DataHandler, "_download", download):
+            handler._fetch_from_store("AAA", "1y", "15m", "5m", refresh=False)
+            handler._fetch_from_store("AAA", "1y", "1h", "1h", refresh=False)
+        self.assertEqual(periods, [("60d", "5m"), ("730d", "1h")])
+
+
+if __name__ == "__main__":
+    unittest.main()
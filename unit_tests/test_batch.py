@@ -0,0 +1,75 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from scr.batch import CSVReport, FIELDS, read_tickers, run
+from scr.data_handler import DataHandler
+
+
+def dummy_history(ticker, period="1y", interval="1d"):
+    dates = pd.date_range(start="2020-01-01", periods=100, freq="D")
+    return pd.DataFrame({"Close": np.linspace(100, 150, 100)}, index=dates)
+
+
+class BatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.output = os.path.join(self.tmp_dir.name, "report.csv")
+        self.fetched = []
+
+        def fetch(handler, ticker, period="1y", interval="1d", refresh=False):
+            self.fetched.append(ticker)
+            return {"error": "No data found"} if ticker == "BAD" else dummy_history(ticker)
+
+        patcher = mock.patch.object(DataHandler, "fetch_stock_data", fetch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_batch(self, tickers, **kwargs):
+        return run(tickers, CSVReport(self.output), num_simulations=50, num_days=5, workers=1,
+                   log=io.StringIO(), **kwargs)
+
+    def test_rows_are_written_and_runs_resume(self):
+        stats = self.run_batch(["AAA", "BAD", "BBB"])
+        self.assertEqual(stats, {"written": 3, "errors": 1, "skipped": 0})
+        df = pd.read_csv(self.output)
+        self.assertEqual(list(df.columns), FIELDS)
+        self.assertEqual(list(df["status"]), ["ok", "error", "ok"])
+        self.assertEqual(df.loc[0, "forecast_days"], 5)
+        self.assertGreater(df.loc[0, "forecast_max"], df.loc[0, "forecast_min"])
+
+        # A second run only does the new ticker; --retry-errors also reruns the failed one.
+        self.fetched.clear()
+        self.assertEqual(self.run_batch(["AAA", "BAD", "BBB", "CCC"])["skipped"], 3)
+        self.assertEqual(set(self.fetched), {"CCC"})
+        self.fetched.clear()
+        self.assertEqual(self.run_batch(["AAA", "BAD", "CCC"], retry_errors=True)["skipped"], 2)
+        self.assertEqual(set(self.fetched), {"BAD"})
+        # The retry replaces the failed row instead of adding a second one.
+        df = pd.read_csv(self.output)
+        self.assertEqual(sorted(df["ticker"]), ["AAA", "BAD", "BBB", "CCC"])
+        self.assertEqual(list(df.columns), FIELDS)
+
+    def test_read_tickers(self):
+        path = os.path.join(self.tmp_dir.name, "universe.txt")
+        with open(path, "w") as file:
+            file.write("msft\n# comment\n\nAAPL  # inline comment\ngoogl\n")
+        self.assertEqual(list(read_tickers(["googl"], path)), ["GOOGL", "MSFT", "AAPL"])
+
+    def test_does_not_import_dash(self):
+        code = "import sys, scr.batch; print(any(m.split('.')[0] in ('dash', 'plotly') for m in sys.modules))"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+        self.assertEqual(result.stdout.strip(), "False", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from scr.cache import bar_cache
+from scr.data_handler import BAR_COLUMNS, DataHandler, frame_nbytes, normalize_bars
+from scr.metrics import registry, BAR_CACHE_BYTES
+
+
+def yfinance_like(days=250):
+    """Frame shaped like ``yf.Ticker.history``: tz-aware index plus the action columns."""
+    index = pd.date_range("2023-01-02", periods=days, freq="B", tz="America/New_York")
+    close = np.linspace(100, 150, days)
+    return pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+        "Volume": np.arange(days, dtype=np.int64) * 1000,
+        "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=index)
+
+
+class NormalizeBarsTestCase(unittest.TestCase):
+    def test_prunes_columns_and_downcasts(self):
+        raw = yfinance_like()
+        df = normalize_bars(raw)
+        self.assertEqual(list(df.columns), BAR_COLUMNS)
+        self.assertTrue((df.dtypes == np.float64).all())
+        self.assertEqual(df.index.dtype, "datetime64[ns, America/New_York]")
+
+        small = normalize_bars(raw, float32=True)
+        self.assertTrue((small.dtypes == np.float32).all())
+        # float32 halves the columns; the int64 index stays.
+        self.assertLess(frame_nbytes(small), 0.6 * frame_nbytes(df))
+        np.testing.assert_allclose(small["Close"], df["Close"], rtol=1e-6)
+
+    def test_sorts_and_deduplicates(self):
+        raw = yfinance_like(5)
+        shuffled = pd.concat([raw.iloc[[3, 1, 0]], raw.iloc[[1, 4, 2]].assign(Close=-1.0)])
+        df = normalize_bars(shuffled)
+        self.assertTrue(df.index.equals(raw.index))
+        self.assertEqual(df["Close"].iloc[1], -1.0)
+
+    def test_normalized_frames_are_returned_as_is(self):
+        df = normalize_bars(yfinance_like())
+        self.assertIs(normalize_bars(df), df)
+
+    def test_fetch_returns_normalized_frames(self):
+        bar_cache.invalidate()
+        self.addCleanup(bar_cache.invalidate)
+        handler = DataHandler(float32=True)
+        with mock.patch.object(DataHandler, "_download", lambda h, t, p, i: yfinance_like()):
+            df = handler.fetch_stock_data("AAA", period="1y", interval="5d")
+        self.assertEqual(list(df.columns), BAR_COLUMNS)
+        self.assertEqual(df["Close"].dtype, np.float32)
+        self.assertIn(f"{BAR_CACHE_BYTES} {frame_nbytes(df)}", registry.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,244 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from scr.data_handler import DataHandler
+from scr.fetch_scheduler import BACKGROUND, INTERACTIVE, FetchScheduler, HTTPFetcher, TokenBucket, YahooFetcher
+
+
+def dummy_bars(ticker):
+    index = pd.date_range("2024-01-01", periods=5, freq="D", tz="UTC")
+    close = np.arange(5.0) + len(ticker)
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 100.0}, index=index)
+
+
+class StubBarServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the upstream: logs every call, can answer 429 or garbled JSON a number of times first,
+    and rejects any call including a ``rejected`` ticker with HTTP 400.
+    """
+
+    def __init__(self, delay=0.0, rate_limited=0, garbled=0, rejected=()):
+        super().__init__(("127.0.0.1", 0), StubBarHandler)
+        self.delay = delay
+        self.rate_limited = rate_limited
+        self.garbled = garbled
+        self.rejected = set(rejected)
+        self.calls = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubBarHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        tickers = query["tickers"][0].split(",")
+        self.server.calls.append(tickers)
+        time.sleep(self.server.delay)
+        if self.server.rate_limited > 0:
+            self.server.rate_limited -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0.05")
+            self.end_headers()
+            return
+        if self.server.rejected.intersection(tickers):
+            self.send_response(400)
+            self.end_headers()
+            return
+        payload = {t: json.loads(dummy_bars(t).to_json(orient="split", date_format="iso"))
+                   for t in tickers if t != "BAD"}
+        body = json.dumps(payload).encode()
+        if self.server.garbled > 0:
+            self.server.garbled -= 1
+            body = body[:len(body) // 2]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FetchSchedulerTestCase(unittest.TestCase):
+    def start_server(self, **kwargs):
+        server = StubBarServer(**kwargs)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def make_scheduler(self, server, **kwargs):
+        settings = {"rate_per_second": 100, "burst": 100, "batch_window_seconds": 0.05,
+                    "backoff_base_seconds": 0.01, "max_workers": 1, "timeout_seconds": 10}
+        settings.update(kwargs)
+        scheduler = FetchScheduler(HTTPFetcher(server.url), **settings)
+        self.addCleanup(scheduler.close)
+        return scheduler
+
+    def test_requests_are_batched_and_coalesced(self):
+        server = self.start_server()
+        scheduler = self.make_scheduler(server)
+        futures = [scheduler.submit(t) for t in ["AAA", "BBBB", "AAA", "BAD"]]
+
+        self.assertIs(futures[0], futures[2])
+        self.assertEqual(futures[1].result(5)["Close"].iloc[0], 4.0)
+        with self.assertRaises(ValueError):
+            futures[3].result(5)
+        self.assertEqual(server.calls, [["AAA", "BBBB", "BAD"]])
+
+    def test_rate_limited_calls_are_retried(self):
+        server = self.start_server(rate_limited=2)
+        scheduler = self.make_scheduler(server)
+        data = scheduler.fetch("AAA")
+        self.assertEqual(len(data), 5)
+        self.assertEqual(len(server.calls), 3)
+
+    def test_gives_up_after_max_retries(self):
+        server = self.start_server(rate_limited=10)
+        scheduler = self.make_scheduler(server, max_retries=1)
+        with self.assertRaises(RuntimeError):
+            scheduler.fetch("AAA")
+        self.assertEqual(len(server.calls), 2)
+
+    def test_bad_request_only_fails_the_offending_ticker(self):
+        server = self.start_server(rejected={"BAD"})
+        scheduler = self.make_scheduler(server)
+        futures = {t: scheduler.submit(t) for t in ["AAA", "BBB", "BAD", "CCC"]}
+        with self.assertRaisesRegex(ValueError, "BAD"):
+            futures["BAD"].result(5)
+        for ticker in ("AAA", "BBB", "CCC"):
+            self.assertEqual(len(futures[ticker].result(5)), 5)
+        self.assertEqual(server.calls[0], ["AAA", "BBB", "BAD", "CCC"])
+        self.assertNotIn(["AAA", "BBB", "BAD", "CCC"], server.calls[1:])
+
+    def test_garbled_responses_are_retried(self):
+        server = self.start_server(garbled=1)
+        scheduler = self.make_scheduler(server)
+        self.assertEqual(len(scheduler.fetch("AAA")), 5)
+        self.assertEqual(len(server.calls), 2)
+
+    def test_yahoo_transient_ticker_errors_are_retried(self):
+        downloads = []
+
+        def download(tickers, **kwargs):
+            downloads.append(list(tickers))
+            if len(downloads) == 1:
+                errors = {"BBB": "ConnectionError('Read timed out')", "CCC": "possibly delisted; no timezone found"}
+            else:
+                errors = {}
+            yf_shared._ERRORS = errors
+            frames = {t: dummy_bars(t) for t in tickers if t not in errors and t != "CCC"}
+            return pd.concat(frames, axis=1) if frames else pd.DataFrame()
+
+        yf_shared = mock.Mock(_ERRORS={})
+        with mock.patch("scr.fetch_scheduler.yf.download", download), \
+                mock.patch("scr.fetch_scheduler.yf.shared", yf_shared):
+            scheduler = FetchScheduler(YahooFetcher(), rate_per_second=100, burst=100, backoff_base_seconds=0.01,
+                                       max_workers=1, timeout_seconds=10)
+            self.addCleanup(scheduler.close)
+            futures = {t: scheduler.submit(t) for t in ["AAA", "BBB", "CCC"]}
+            self.assertEqual(len(futures["AAA"].result(5)), 5)
+            self.assertEqual(len(futures["BBB"].result(5)), 5)
+            with self.assertRaisesRegex(ValueError, "No data found"):
+                futures["CCC"].result(5)
+        self.assertEqual(downloads, [["AAA", "BBB", "CCC"], ["BBB"]])
+
+    def test_interactive_requests_jump_the_queue(self):
+        server = self.start_server(delay=0.2)
+        scheduler = self.make_scheduler(server)
+        # Keep the single worker busy while both lanes queue up behind it.
+        busy = scheduler.submit("BUSY")
+        time.sleep(0.1)
+        background = scheduler.submit("AAA", period="1y", priority=BACKGROUND)
+        interactive = scheduler.submit("BBB", period="6mo", priority=INTERACTIVE)
+        for future in (busy, background, interactive):
+            future.result(5)
+        self.assertEqual(server.calls, [["BUSY"], ["BBB"], ["AAA"]])
+
+    def test_interactive_request_is_not_starved_by_background_retries(self):
+        release = threading.Event()
+        calls = []
+
+        class Fetcher:
+            def cost(self, tickers):
+                return 1
+
+            def fetch(self, tickers, period, interval):
+                calls.append(list(tickers))
+                if tickers != ["USER"]:
+                    # A background batch stuck retrying holds its worker.
+                    release.wait(5)
+                return {t: dummy_bars(t) for t in tickers}
+
+        scheduler = FetchScheduler(Fetcher(), rate_per_second=100, burst=100, batch_window_seconds=0.01,
+                                   max_workers=2, timeout_seconds=10)
+        self.addCleanup(scheduler.close)
+        background = [scheduler.submit("AAA", period=period, priority=BACKGROUND) for period in ("1y", "2y")]
+        time.sleep(0.1)
+        self.assertEqual(calls, [["AAA"]])
+        try:
+            self.assertEqual(len(scheduler.fetch("USER", period="6mo", timeout=2)), 5)
+        finally:
+            release.set()
+        for future in background:
+            self.assertEqual(len(future.result(5)), 5)
+
+    def test_overlapping_yahoo_downloads_keep_their_tickers(self):
+        # Mimics yf.download: each call resets the shared globals, then fills them as tickers arrive.
+        yf_shared = mock.Mock(_DFS={}, _ERRORS={})
+
+        def download(tickers, **kwargs):
+            yf_shared._DFS, yf_shared._ERRORS = {}, {}
+            for ticker in tickers:
+                time.sleep(0.02)
+                yf_shared._DFS[ticker] = dummy_bars(ticker)
+            return pd.concat(yf_shared._DFS, axis=1)
+
+        batches = [["AAA", "BBB", "CCC"], ["DDD", "EEE", "FFF"]]
+        results = {}
+        with mock.patch("scr.fetch_scheduler.yf.download", download), \
+                mock.patch("scr.fetch_scheduler.yf.shared", yf_shared):
+            threads = [threading.Thread(target=lambda b=batch: results.update(YahooFetcher().fetch(b, "1y", "1d")))
+                       for batch in batches]
+            for thread in threads:
+                thread.start()
+                # The second download starts while the first is still collecting its tickers.
+                time.sleep(0.03)
+            for thread in threads:
+                thread.join(5)
+        self.assertEqual(sorted(results), sorted(batches[0] + batches[1]))
+
+    def test_token_bucket_paces_calls(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0],
+                             sleep=lambda s: now.__setitem__(0, now[0] + s))
+        for _ in range(6):
+            bucket.acquire()
+        # Two calls fit in the burst, the other four need half a second each.
+        self.assertAlmostEqual(now[0], 2.0)
+        bucket.pause(3)
+        bucket.acquire()
+        self.assertAlmostEqual(now[0], 5.5)
+
+    def test_data_handler_goes_through_scheduler(self):
+        server = self.start_server()
+        handler = DataHandler(scheduler=self.make_scheduler(server))
+        data = handler._download("AAA", "5d", "1d")
+        self.assertEqual(len(data), 5)
+        self.assertEqual(server.calls, [["AAA"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import time
+import unittest
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from scr.live_feed import LIVE_COLUMNS, LiveBars, LiveFeedManager, ReplayQuoteSource, YahooQuoteSource
+from scr.technical_ind import TechnicalIndicators
+
+
+def make_ticks(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-02 14:30", periods=n, freq="7s", tz="UTC")
+    return pd.DataFrame({"Close": 100 + np.cumsum(rng.normal(0, 0.05, n)), "Volume": 10.0}, index=index)
+
+
+class LiveFeedTestCase(unittest.TestCase):
+    def test_incremental_indicators_match_full_recompute(self):
+        ticks = make_ticks()
+        bars = LiveBars(bar_seconds=60)
+        for i, (t, row) in enumerate(ticks.iterrows()):
+            point = bars.add(t, row["Close"], row["Volume"])
+            if i % 97 == 0 or i == len(ticks) - 1:
+                # Each tick's values equal a full recompute over the bars so far, forming bar included.
+                ti = TechnicalIndicators(bars.frame())
+                ti.compute_all()
+                expected = ti.snapshot()
+                for col in LIVE_COLUMNS:
+                    np.testing.assert_allclose(point[col], expected[col], rtol=1e-9, err_msg=col)
+
+        frame = bars.frame()
+        expected = ticks.resample("60s").agg({"Close": ["first", "max", "min", "last"], "Volume": "sum"})
+        np.testing.assert_allclose(frame[["Open", "High", "Low", "Close", "Volume"]].to_numpy(), expected.to_numpy())
+
+    def test_clients_receive_only_new_points(self):
+        manager = LiveFeedManager(ReplayQuoteSource({"AAA": make_ticks(50)}, per_poll=20), seed=False, max_points=30)
+        self.assertEqual(manager.points("AAA"), ([], -1))
+        manager.subscribe("AAA")
+
+        manager.poll_once()
+        points, last = manager.points("AAA")
+        self.assertEqual((len(points), last), (20, 19))
+
+        manager.poll_once()
+        points, last = manager.points("AAA", after=last)
+        self.assertEqual([p["seq"] for p in points], list(range(20, 40)))
+
+        manager.poll_once()
+        self.assertEqual(len(manager.points("AAA", after=last)[0]), 10)
+        self.assertEqual(manager.points("AAA", after=49), ([], 49))
+        # A client that fell behind gets what is still kept.
+        self.assertEqual(manager.points("AAA", after=-1)[0][0]["seq"], 20)
+
+    def test_idle_tickers_are_dropped(self):
+        manager = LiveFeedManager(ReplayQuoteSource({"AAA": make_ticks(5)}), seed=False, idle_seconds=0.01)
+        manager.subscribe("AAA")
+        time.sleep(0.02)
+        manager.poll_once()
+        self.assertEqual(manager.points("AAA"), ([], -1))
+
+    def test_yahoo_polls_only_the_tail(self):
+        bars = make_ticks(10).resample("1min").agg({"Close": "last", "Volume": "sum"})
+        starts = []
+
+        class Scheduler:
+            timeout_seconds = 5
+
+            def submit(self, ticker, period, interval, priority, start=None):
+                starts.append((ticker, start))
+                future = Future()
+                future.set_result(bars if start is None else bars[bars.index >= start])
+                return future
+
+        source = YahooQuoteSource(Scheduler())
+        self.assertEqual(len(source.poll(["AAA"])), 1)
+        source.poll(["AAA"])
+        source.poll(["AAA", "BBB"])
+        self.assertEqual(starts, [("AAA", None), ("AAA", bars.index[-1]), ("AAA", None), ("BBB", None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
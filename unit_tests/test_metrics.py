@@ -0,0 +1,65 @@
+import unittest
+
+from flask import Flask
+
+from scr.metrics import MetricsRegistry, register_metrics_route, CALLBACK_DURATION, STAGE_DURATION
+
+
+class MetricsRegistryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry(buckets=(0.1, 1.0))
+
+    def test_span_records_stage_histogram(self):
+        with self.registry.span("run_simulation", ticker="DUMMY"):
+            pass
+        text = self.registry.render()
+        self.assertIn(f"# TYPE {STAGE_DURATION} histogram", text)
+        self.assertIn(f'{STAGE_DURATION}_bucket{{stage="run_simulation",le="0.1"}} 1', text)
+        self.assertIn(f'{STAGE_DURATION}_bucket{{stage="run_simulation",le="+Inf"}} 1', text)
+        self.assertIn(f'{STAGE_DURATION}_count{{stage="run_simulation"}} 1', text)
+
+    def test_instrument_callback_counts_calls_and_errors(self):
+        @self.registry.instrument_callback
+        def update_graph(value):
+            if value is None:
+                raise ValueError("no value")
+            return value * 2
+
+        self.assertEqual(update_graph(2), 4)
+        with self.assertRaises(ValueError):
+            update_graph(None)
+        text = self.registry.render()
+        self.assertIn(f'{CALLBACK_DURATION}_count{{callback="update_graph"}} 2', text)
+        self.assertIn('plutus_callback_errors_total{callback="update_graph"} 1', text)
+
+    def test_cache_counters(self):
+        self.registry.record_cache("bars", hit=True)
+        self.registry.record_cache("bars", hit=True)
+        self.registry.record_cache("bars", hit=False)
+        text = self.registry.render()
+        self.assertIn('plutus_cache_requests_total{cache="bars",result="hit"} 2', text)
+        self.assertIn('plutus_cache_requests_total{cache="bars",result="miss"} 1', text)
+
+    def test_non_finite_gauges(self):
+        self.registry.set_gauge("ratio", float("nan"), cache="a")
+        self.registry.set_gauge("ratio", float("inf"), cache="b")
+        self.registry.set_gauge("ratio", float("-inf"), cache="c")
+        self.registry.set_gauge("ratio", 2.5, cache="d")
+        text = self.registry.render()
+        self.assertIn('ratio{cache="a"} NaN', text)
+        self.assertIn('ratio{cache="b"} +Inf', text)
+        self.assertIn('ratio{cache="c"} -Inf', text)
+        self.assertIn('ratio{cache="d"} 2.5', text)
+
+    def test_metrics_route(self):
+        server = Flask(__name__)
+        register_metrics_route(server, metrics=self.registry)
+        self.registry.record_cache("bars", hit=True)
+        response = server.test_client().get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        self.assertIn(b"plutus_cache_requests_total", response.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
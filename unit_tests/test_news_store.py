@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+
+from scr.news_store import NewsStore, normalize_url, title_hash
+
+
+def make_news(rows):
+    # rows: list of (time, title, url)
+    df = pd.DataFrame(rows, columns=["Time", "Title", "URL"])
+    df["Time"] = pd.to_datetime(df["Time"])
+    return df.set_index("Time").sort_index(ascending=False)
+
+
+class NewsStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "news.sqlite")
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def make_fetcher(self, df):
+        def fetch(name, since=None, limit=None):
+            self.calls.append(since)
+            if since is not None:
+                return df[df.index > since]
+            return df
+        return fetch
+
+    def test_normalization_matches_provider_variants(self):
+        self.assertEqual(normalize_url("https://www.example.com/story/?utm_source=x"),
+                         normalize_url("http://example.com/story"))
+        self.assertEqual(title_hash("Apple beats estimates!"), title_hash("  apple BEATS estimates "))
+        self.assertEqual(normalize_url("https://example.com/read?p=12&utm_medium=rss&fbclid=abc"),
+                         normalize_url("https://example.com/read?p=12"))
+        # Parameters that identify the article keep distinct stories apart.
+        self.assertNotEqual(normalize_url("https://example.com/read?id=1"), normalize_url("https://example.com/read?id=2"))
+        # Only the host is case-insensitive.
+        self.assertEqual(normalize_url("https://WWW.Example.com/a"), normalize_url("https://example.com/a"))
+        self.assertNotEqual(normalize_url("https://example.com/a/Xy"), normalize_url("https://example.com/a/xY"))
+        self.assertNotEqual(normalize_url("https://example.com/r?id=Ab"), normalize_url("https://example.com/r?id=aB"))
+
+    def test_failing_provider_is_skipped(self):
+        def broken(name, since=None, limit=None):
+            raise ConnectionError("provider down")
+
+        df = make_news([("2025-01-02 10:00:00", "Apple beats estimates", "https://example.com/a")])
+        store = NewsStore(self.path, fetchers=(broken, self.make_fetcher(df)))
+        self.assertEqual(store.refresh("AAPL"), 1)
+        self.assertEqual(store.refresh("AAPL"), 0)
+        self.assertEqual(len(store.get_page("AAPL")), 1)
+
+    def test_ticker_case_shares_history(self):
+        store = NewsStore(self.path, fetchers=())
+        store.add("aapl", make_news([("2025-01-02 10:00:00", "Apple beats estimates", "https://example.com/a")]))
+        self.assertEqual(store.count("AAPL"), 1)
+        self.assertEqual(len(store.get_page("Aapl")), 1)
+
+    def test_same_story_from_two_providers_is_stored_once(self):
+        source_a = make_news([("2025-01-02 10:00:00", "Apple beats estimates", "https://www.example.com/a?ref=1")])
+        source_b = make_news([("2025-01-02 10:05:00", "Apple Beats Estimates", "https://example.com/a")])
+        store = NewsStore(self.path, fetchers=(self.make_fetcher(source_a), self.make_fetcher(source_b)))
+        self.assertEqual(store.refresh("AAPL"), 1)
+        self.assertEqual(store.count("AAPL"), 1)
+
+    def test_refresh_only_requests_newer_articles(self):
+        df = make_news([
+            ("2025-01-01 09:00:00", "Old story", "https://example.com/old"),
+            ("2025-01-03 09:00:00", "New story", "https://example.com/new"),
+        ])
+        store = NewsStore(self.path, fetchers=(self.make_fetcher(df),))
+        self.assertEqual(store.refresh("AAPL"), 2)
+        self.assertEqual(store.refresh("AAPL"), 0)
+        self.assertEqual(self.calls, [None, pd.Timestamp("2025-01-03 09:00:00")])
+
+    def test_get_page_is_newest_first(self):
+        rows = [(f"2025-01-{day:02d} 12:00:00", f"Story {day}", f"https://example.com/{day}") for day in range(1, 26)]
+        store = NewsStore(self.path, fetchers=())
+        store.add("AAPL", make_news(rows))
+        first = store.get_page("AAPL", page=0, page_size=10)
+        last = store.get_page("AAPL", page=2, page_size=10)
+        self.assertEqual(first["Title"].iloc[0], "Story 25")
+        self.assertTrue(first.index.is_monotonic_decreasing)
+        self.assertEqual(len(last), 5)
+        self.assertEqual(last["Title"].iloc[-1], "Story 1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import threading
+import unittest
+
+from scr.prefetch import Prefetcher
+
+
+class PrefetcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        self.failures = set()
+
+        def task(name):
+            def run(ticker, interval):
+                with self.lock:
+                    self.calls.append((name, ticker, interval))
+                if name in self.failures:
+                    raise ValueError(f"{name} failed")
+                return name
+            return run
+
+        self.prefetcher = Prefetcher({name: task(name) for name in ("indicators", "forecast", "news")},
+                                     max_workers=3)
+        self.addCleanup(self.prefetcher.shutdown)
+
+    def test_tasks_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        prefetcher = Prefetcher({"a": lambda t, i: barrier.wait(), "b": lambda t, i: barrier.wait()},
+                                max_workers=2)
+        self.addCleanup(prefetcher.shutdown)
+        prefetcher.start("s1", "AAPL", "1d")
+        # Each task waits for the other, so both only finish when they run at the same time.
+        self.assertTrue(prefetcher.wait("s1", "a", "AAPL", "1d", timeout=5))
+        self.assertTrue(prefetcher.wait("s1", "b", "AAPL", "1d", timeout=5))
+
+    def test_tab_switch_reuses_futures(self):
+        first = self.prefetcher.start("s1", "AAPL", "1d")
+        self.assertTrue(self.prefetcher.wait("s1", "news", "AAPL", "1d", timeout=5))
+        self.assertEqual(self.prefetcher.start("s1", "AAPL", "1d", new_search=False), first)
+        for future in first.values():
+            future.result(5)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_repeat_search_reruns_finished_tasks_only(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        self.prefetcher.tasks["slow"] = lambda ticker, interval: release.wait(5)
+        first = self.prefetcher.start("s1", "AAPL", "1d")
+        self.assertTrue(self.prefetcher.wait("s1", "news", "AAPL", "1d", timeout=5))
+
+        second = self.prefetcher.start("s1", "AAPL", "1d")
+        self.assertIs(second["slow"], first["slow"])
+        self.assertIsNot(second["news"], first["news"])
+        self.assertTrue(self.prefetcher.wait("s1", "news", "AAPL", "1d", timeout=5))
+        self.assertEqual(self.calls.count(("news", "AAPL", "1d")), 2)
+
+    def test_new_search_resubmits(self):
+        self.prefetcher.start("s1", "AAPL", "1d")
+        self.prefetcher.start("s1", "MSFT", "1d")
+        self.assertTrue(self.prefetcher.wait("s1", "forecast", "MSFT", "1d", timeout=5))
+        # The tab asks about the previous ticker: nothing to wait on.
+        self.assertFalse(self.prefetcher.wait("s1", "forecast", "AAPL", "1d"))
+        self.assertIn(("forecast", "MSFT", "1d"), self.calls)
+
+    def test_wait_gives_up_after_default_timeout(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        prefetcher = Prefetcher({"slow": lambda t, i: release.wait(5)}, max_workers=1, wait_timeout_seconds=0.05)
+        self.addCleanup(prefetcher.shutdown)
+        prefetcher.start("s1", "AAPL", "1d")
+        self.assertFalse(prefetcher.wait("s1", "slow", "AAPL", "1d"))
+        release.set()
+        self.assertTrue(prefetcher.wait("s1", "slow", "AAPL", "1d", timeout=5))
+
+    def test_unknown_session_or_failure(self):
+        self.assertFalse(self.prefetcher.wait("missing", "news", "AAPL", "1d"))
+        self.assertFalse(self.prefetcher.wait(None, "news", "AAPL", "1d"))
+        self.assertEqual(self.prefetcher.start(None, "AAPL", "1d"), {})
+
+        self.failures.add("news")
+        self.prefetcher.start("s1", "AAPL", "1d")
+        self.assertFalse(self.prefetcher.wait("s1", "news", "AAPL", "1d", timeout=5))
+        self.assertTrue(self.prefetcher.wait("s1", "indicators", "AAPL", "1d", timeout=5))
+
+        # Searching again after a failure runs the tasks again.
+        self.failures.clear()
+        self.prefetcher.start("s1", "AAPL", "1d")
+        self.assertTrue(self.prefetcher.wait("s1", "news", "AAPL", "1d", timeout=5))
+        self.assertEqual(self.calls.count(("news", "AAPL", "1d")), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
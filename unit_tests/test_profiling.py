@@ -0,0 +1,110 @@
+import os
+import pstats
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from scr.profiling import PROFILE_ENV_VAR, PROFILE_HEADER, CallbackProfiler, register_profiles_route
+
+
+class CallbackProfilerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.profiler = CallbackProfiler(os.path.join(self.tmp_dir.name, "profiles"), max_profiles=2)
+
+        @self.profiler.profile_callback
+        def update_graph(size):
+            if size is None:
+                raise ValueError("no size")
+            return sum(list(range(size)))
+
+        self.update_graph = update_graph
+        env = mock.patch.dict(os.environ)
+        env.start()
+        self.addCleanup(env.stop)
+        os.environ.pop(PROFILE_ENV_VAR, None)
+
+    def test_not_profiled_by_default(self):
+        self.assertEqual(self.update_graph(10), 45)
+        self.assertEqual(self.profiler.captures(), [])
+
+    def test_env_var_captures_profile_and_allocations(self):
+        os.environ[PROFILE_ENV_VAR] = "1"
+        self.assertEqual(self.update_graph(100_000), sum(range(100_000)))
+
+        [name] = self.profiler.captures()
+        summary = self.profiler.summary(name)
+        self.assertEqual(summary["callback"], "update_graph")
+        self.assertEqual(summary["args"], ["100000"])
+        self.assertIsNone(summary["error"])
+        # The list of 100k ints shows up in the tracemalloc peak.
+        self.assertGreater(summary["peak_bytes"], 1_000_000)
+        self.assertTrue(any("update_graph" in row["function"] for row in summary["top_functions"]))
+
+        directory = os.path.join(self.profiler.path, name)
+        pstats.Stats(os.path.join(directory, "profile.prof"))
+        self.assertTrue(os.path.exists(os.path.join(directory, "allocations.snapshot")))
+
+    def test_errors_are_captured_and_raised(self):
+        os.environ[PROFILE_ENV_VAR] = "1"
+        with self.assertRaises(ValueError):
+            self.update_graph(None)
+        self.assertIn("no size", self.profiler.summary(self.profiler.captures()[0])["error"])
+
+    def test_write_failure_keeps_callback_outcome(self):
+        os.environ[PROFILE_ENV_VAR] = "1"
+        with mock.patch.object(self.profiler, "_write", side_effect=OSError("disk full")), \
+                self.assertLogs("scr.profiling", "WARNING"):
+            self.assertEqual(self.update_graph(10), 45)
+            with self.assertRaisesRegex(ValueError, "no size"):
+                self.update_graph(None)
+
+    def test_rotation_keeps_newest(self):
+        os.environ[PROFILE_ENV_VAR] = "1"
+        for size in (1, 2, 3):
+            self.update_graph(size)
+        captures = self.profiler.captures()
+        self.assertEqual(len(captures), 2)
+        self.assertEqual(self.profiler.summary(captures[0])["args"], ["3"])
+        self.assertEqual(self.profiler.summary(captures[1])["args"], ["2"])
+
+    def test_capture_names_sort_by_time_within_a_second(self):
+        # The sub-second part used to wrap around, so a later capture could sort (and rotate) as older.
+        with mock.patch("scr.profiling.time.time_ns", side_effect=[1_700_000_000_999_999_000,
+                                                                    1_700_000_001_000_001_000]):
+            os.environ[PROFILE_ENV_VAR] = "1"
+            self.profiler.max_profiles = 5
+            self.update_graph(1)
+            self.update_graph(2)
+        self.assertEqual(self.profiler.summary(self.profiler.captures()[0])["args"], ["2"])
+
+    def test_header_and_index_route(self):
+        server = Flask(__name__)
+        register_profiles_route(server, callback_profiler=self.profiler)
+        # The header is ignored unless allowed in the config.
+        with server.test_request_context("/", headers={PROFILE_HEADER: "1"}):
+            self.update_graph(10)
+        self.assertEqual(self.profiler.captures(), [])
+
+        self.profiler.allow_header = True
+        with server.test_request_context("/", headers={PROFILE_HEADER: "0"}):
+            self.update_graph(10)
+        with server.test_request_context("/", headers={PROFILE_HEADER: "1"}):
+            self.update_graph(10)
+        [name] = self.profiler.captures()
+
+        client = server.test_client()
+        page = client.get("/profiles").get_data(as_text=True)
+        self.assertIn("update_graph", page)
+        self.assertIn(f"/profiles/{name}/profile.prof", page)
+        response = client.get(f"/profiles/{name}/allocations.txt")
+        self.assertEqual(response.status_code, 200)
+        response.close()
+        self.assertEqual(client.get("/profiles/missing/profile.prof").status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
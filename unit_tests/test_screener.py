@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from scr.screener import NUMERIC_COLUMNS, SIGNAL_COLUMNS, SnapshotTable, parse_filters
+
+
+def make_snapshot(close, rsi, lower, rsi_signal="Hold"):
+    values = {col: 1.0 for col in NUMERIC_COLUMNS}
+    values.update({col: "Hold" for col in SIGNAL_COLUMNS})
+    values.update({"Close": close, "RSI": rsi, "Bollinger_Lower_20_2": lower, "Signal_RSI": rsi_signal})
+    return pd.Series(values)
+
+
+class ScreenerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "snapshot.npz")
+        self.table = SnapshotTable(self.path, capacity=2)
+        self.table.update("AAA", make_snapshot(90, 25, 95, "Buy"))
+        self.table.update("BBB", make_snapshot(110, 55, 100))
+        self.table.update("CCC", make_snapshot(80, 35, 85, "Buy"))
+        self.table.update("DDD", make_snapshot(120, np.nan, 100, "Sell"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_filters(self):
+        result = self.table.query([("Close", "<", "Bollinger_Lower_20_2"), ("Signal_RSI", "==", "Buy")])
+        self.assertEqual(sorted(result.index), ["AAA", "CCC"])
+        self.assertEqual(list(self.table.query([("RSI", "<", 35)]).index), ["AAA"])
+        self.assertEqual(list(self.table.query([("RSI", "<=", 35)], sort_by="RSI").index), ["AAA", "CCC"])
+        self.assertEqual(list(self.table.query([("RSI", ">", 30)], sort_by="RSI").index), ["CCC", "BBB"])
+        self.assertEqual(sorted(self.table.query([("Signal_RSI", "!=", "Buy")]).index), ["BBB", "DDD"])
+
+    def test_top_k_and_update(self):
+        result = self.table.query(sort_by="Close", ascending=False, limit=2)
+        self.assertEqual(list(result.index), ["DDD", "BBB"])
+
+        # Overwriting a row moves it in the sort order and updates the signal bitmaps.
+        self.table.update("AAA", make_snapshot(130, 70, 95, "Sell"))
+        self.assertEqual(list(self.table.query(sort_by="Close", ascending=False, limit=1).index), ["AAA"])
+        self.assertEqual(list(self.table.query([("Signal_RSI", "==", "Buy")]).index), ["CCC"])
+        self.assertEqual(len(self.table), 4)
+
+    def test_sort_orders_kept_current_on_update(self):
+        self.table.query(sort_by="Close")
+        self.table.query(sort_by="RSI")
+        rng = np.random.default_rng(0)
+        for i in range(200):
+            ticker = f"T{rng.integers(30)}"
+            rsi = np.nan if i % 7 == 0 else float(rng.integers(10))
+            self.table.update(ticker, make_snapshot(float(rng.integers(50)), rsi, 1.0))
+        n = len(self.table)
+        for col in ("Close", "RSI"):
+            order, values = self.table._sorted[col]
+            expected = np.argsort(self.table.numeric[col][:n], kind="stable")
+            np.testing.assert_array_equal(order, expected)
+            np.testing.assert_array_equal(values, self.table.numeric[col][:n][expected])
+
+    def test_flush_saves_only_changes(self):
+        self.table.flush()
+        self.assertTrue(os.path.exists(self.path))
+        os.remove(self.path)
+        self.table.flush()
+        self.assertFalse(os.path.exists(self.path))
+        self.table.update("EEE", make_snapshot(100, 50, 90))
+        self.table.flush()
+        self.assertEqual(len(SnapshotTable.load(self.path)), 5)
+
+    def test_save_and_load(self):
+        self.table.save()
+        loaded = SnapshotTable.load(self.path)
+        pd.testing.assert_frame_equal(loaded.query(sort_by="Close"), self.table.query(sort_by="Close"))
+        self.assertEqual(list(loaded.query([("Signal_RSI", "==", "Sell")]).index), ["DDD"])
+
+    def test_save_merges_with_rows_on_disk(self):
+        # Another process (e.g. a batch worker) saved a partial table holding one ticker this one lacks.
+        other = SnapshotTable(self.path)
+        other.update("EEE", make_snapshot(100, 50, 90))
+        other.update("AAA", make_snapshot(1, 1, 1))
+        other.save()
+
+        self.table.save()
+        loaded = SnapshotTable.load(self.path)
+        self.assertEqual(sorted(loaded.query().index), ["AAA", "BBB", "CCC", "DDD", "EEE"])
+        self.assertEqual(loaded.query().loc["AAA", "Close"], 90)
+        self.assertEqual([name for name in os.listdir(self.tmp_dir.name) if ".tmp" in name], [])
+
+    def test_tickers_are_upper_cased(self):
+        self.table.update(" aaa ", make_snapshot(130, 70, 95, "Sell"))
+        self.assertEqual(len(self.table), 4)
+        self.assertEqual(self.table.query().loc["AAA", "Close"], 130)
+
+    def test_parse_filters(self):
+        self.assertEqual(
+            parse_filters("Close < Bollinger_Lower_20_2 and Signal_RSI == 'Strong Buy' AND RSI >= 30"),
+            [("Close", "<", "Bollinger_Lower_20_2"), ("Signal_RSI", "==", "Strong Buy"), ("RSI", ">=", 30.0)]
+        )
+        self.assertEqual(parse_filters("  "), [])
+        with self.assertRaises(ValueError):
+            parse_filters("RSI is low")
+        with self.assertRaises(ValueError):
+            self.table.query([("Volume", ">", 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
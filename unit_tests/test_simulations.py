@@ -1,4 +1,6 @@
 import unittest
+from unittest import mock
+
 import numpy as np
 import pandas as pd
 
@@ -16,10 +18,11 @@ def dummy_fetch_stock_data(self, ticker, period, interval):
 
 
 class MonteCarloSimulationTestCase(unittest.TestCase):
-    @classmethod
-    def setUpClass(cls):
-        # Monkey-patch DataHandler.fetch_stock_data so that it returns dummy data.
-        DataHandler.fetch_stock_data = dummy_fetch_stock_data
+    def setUp(self):
+        # Patch DataHandler.fetch_stock_data so that it returns dummy data, only for the duration of each test.
+        patcher = mock.patch.object(DataHandler, "fetch_stock_data", dummy_fetch_stock_data)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_run_simulation_returns_correct_shape(self):
         ticker = "DUMMY"
@@ -52,6 +55,35 @@ class MonteCarloSimulationTestCase(unittest.TestCase):
         sim_df = simulator.run_simulation(num_simulations=500, num_days=30)
         self.assertTrue(np.all(sim_df.values > 0), "Some simulated prices are not positive.")
 
+    def test_sweep_grid_statistics(self):
+        simulator = MonteCarloSimulation("DUMMY", period="1y", interval="1d")
+        last_price = simulator.data["Close"].iloc[-1]
+        sweep = simulator.run_sweep([None, 0.0, 0.01], [0.0, 0.02], num_simulations=2000, num_days=30, seed=1)
+
+        self.assertEqual(len(sweep), 6)
+        self.assertEqual(list(sweep.columns), ["mean", "std", "p5", "p50", "p95", "prob_gain"])
+        # None resolves to the historical mean, and rows keep the grid order.
+        hist_mu = np.log(1 + simulator.data["Close"].pct_change().dropna()).mean()
+        self.assertAlmostEqual(sweep.index.get_level_values("mu")[0], hist_mu)
+        self.assertEqual(list(sweep.index.get_level_values("sigma")[:2]), [0.0, 0.02])
+
+        # Without volatility every path ends at the drifted price.
+        flat = sweep.loc[(0.01, 0.0)]
+        self.assertAlmostEqual(flat["p5"], last_price * np.exp(29 * 0.01))
+        self.assertAlmostEqual(flat["std"], 0.0)
+
+        # Common random numbers: cells differing only in mu differ by exactly the drift.
+        self.assertAlmostEqual(sweep.loc[(0.01, 0.02), "p50"] / sweep.loc[(0.0, 0.02), "p50"], np.exp(29 * 0.01))
+
+    def test_sweep_matches_simulation(self):
+        simulator = MonteCarloSimulation("DUMMY", period="1y", interval="1d")
+        np.random.seed(0)
+        terminal = simulator.run_simulation(num_simulations=5000, num_days=30, mu=0.001, sigma=0.02).iloc[-1]
+        cell = simulator.run_sweep([0.001], [0.02], num_simulations=5000, num_days=30, seed=0).iloc[0]
+        np.testing.assert_allclose(cell[["mean", "p50"]].to_numpy(dtype=float),
+                                   [terminal.mean(), terminal.median()], rtol=0.02)
+        np.testing.assert_allclose(cell["std"], terminal.std(), rtol=0.1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from scr.cache import bar_cache, unknown_symbol_cache
+from scr.data_handler import DataHandler
+from scr.fetch_scheduler import FetchScheduler, NoDataError
+from scr.symbols import SymbolIndex
+
+
+class SymbolIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "symbols.csv")
+        with open(self.path, "w") as file:
+            file.write("Symbol,Name\nMSFT,Microsoft Corporation\nMS,Morgan Stanley\nMSCI,MSCI Inc.\n"
+                       "AAPL,Apple Inc.\nMETA,Meta Platforms\n")
+        self.index = SymbolIndex(self.path)
+
+    def test_prefix_suggestions(self):
+        self.assertEqual([s for s, _ in self.index.suggest("ms")], ["MS", "MSCI", "MSFT"])
+        self.assertEqual(self.index.suggest("MS", limit=1), [("MS", "Morgan Stanley")])
+        # Company names are matched after symbols.
+        self.assertEqual(self.index.suggest("apple"), [("AAPL", "Apple Inc.")])
+        self.assertEqual([s for s, _ in self.index.suggest("M")], ["META", "MS", "MSCI", "MSFT"])
+        self.assertEqual(self.index.suggest(""), [])
+
+    def test_known_symbols(self):
+        self.assertTrue(self.index.is_known("msft"))
+        self.assertFalse(self.index.is_known("MSF"))
+        self.assertTrue(self.index.is_known("BTC-USD"))
+        self.assertTrue(self.index.is_known("VOD.L"))
+        self.assertTrue(SymbolIndex(os.path.join(self.tmp_dir.name, "missing.csv")).is_known("ANYTHING"))
+
+    def test_nasdaq_trader_format(self):
+        path = os.path.join(self.tmp_dir.name, "nasdaqtraded.txt")
+        with open(path, "w") as file:
+            file.write("Nasdaq Traded|Symbol|Security Name|Listing Exchange\n"
+                       "Y|AAPL|Apple Inc. - Common Stock|Q\n"
+                       "File Creation Time: 0101202400:00|||\n")
+        index = SymbolIndex(path)
+        self.assertEqual(len(index), 1)
+        self.assertTrue(index.contains("AAPL"))
+
+    def test_data_handler_rejects_and_negatively_caches(self):
+        downloads = []
+
+        def download(handler, ticker, period, interval):
+            downloads.append(ticker)
+            raise NoDataError(f"No data found for ticker '{ticker}'. Please check the symbol.")
+
+        unknown_symbol_cache.invalidate()
+        self.addCleanup(unknown_symbol_cache.invalidate)
+        handler = DataHandler(symbols=self.index)
+        with mock.patch.object(DataHandler, "_download", download):
+            self.assertIn("Unknown ticker", handler.fetch_stock_data("MSF", interval="5d")["error"])
+            self.assertIn("No data found", handler.fetch_stock_data("MSFT", interval="5d")["error"])
+            self.assertIn("No data found", handler.fetch_stock_data("MSFT", interval="5d")["error"])
+            handler.fetch_stock_data("MSFT", interval="5d", refresh=True)
+        self.assertEqual(downloads, ["MSFT", "MSFT"])
+
+    def test_only_empty_lookups_are_negatively_cached(self):
+        calls = []
+
+        class Fetcher:
+            def cost(self, tickers):
+                return 1
+
+            def fetch(self, tickers, period, interval):
+                calls.append(list(tickers))
+                index = pd.date_range("2024-01-01", periods=3, freq="D", tz="UTC")
+                return {t: pd.DataFrame({"Close": [1.0, 2.0, 3.0]}, index=index) for t in tickers if t != "META"}
+
+        scheduler = FetchScheduler(Fetcher(), rate_per_second=100, burst=100, batch_window_seconds=0.2,
+                                   timeout_seconds=10)
+        self.addCleanup(scheduler.close)
+        unknown_symbol_cache.invalidate()
+        self.addCleanup(unknown_symbol_cache.invalidate)
+        self.addCleanup(bar_cache.invalidate)
+        handler = DataHandler(symbols=self.index, scheduler=scheduler)
+        results = {}
+        # Both lookups land in one upstream batch; only the ticker without data is remembered.
+        threads = [threading.Thread(target=lambda t=t: results.__setitem__(t, handler.fetch_stock_data(
+            t, interval="5d"))) for t in ("AAPL", "META")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([sorted(batch) for batch in calls], [["AAPL", "META"]])
+        self.assertEqual(len(results["AAPL"]), 3)
+        self.assertIn("No data found", results["META"]["error"])
+        self.assertIsNone(unknown_symbol_cache.get(("AAPL", "1y", "5d")))
+        self.assertIsNotNone(unknown_symbol_cache.get(("META", "1y", "5d")))
+
+        # A forced refresh does not write the negative entry, and a later success clears it.
+        unknown_symbol_cache.invalidate()
+        handler.fetch_stock_data("META", interval="5d", refresh=True)
+        self.assertIsNone(unknown_symbol_cache.get(("META", "1y", "5d")))
+        handler.fetch_stock_data("META", interval="5d")
+        self.assertIsNotNone(unknown_symbol_cache.get(("META", "1y", "5d")))
+        Fetcher.fetch = lambda self, tickers, period, interval: {t: results["AAPL"] for t in tickers}
+        self.assertNotIn("error", handler.fetch_stock_data("META", interval="5d", refresh=True))
+        self.assertIsNone(unknown_symbol_cache.get(("META", "1y", "5d")))
+
+
+if __name__ == "__main__":
+    unittest.main()
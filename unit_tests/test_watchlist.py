@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from scr.analytics import indicator_snapshot, montecarlo_forecast
+from scr.cache import TTLCache, analytics_cache, bar_cache
+from scr.data_handler import DataHandler
+from scr.metrics import WATCHLIST_STALENESS, registry
+from scr.screener import SnapshotTable
+from scr.watchlist import WatchlistRefresher, next_bar_close
+
+
+def dummy_history(ticker, period="1y", interval="1d"):
+    dates = pd.date_range(start="2020-01-01", periods=100, freq="D")
+    return pd.DataFrame({"Close": np.linspace(100, 150, 100)}, index=dates)
+
+
+class TTLCacheTestCase(unittest.TestCase):
+    def test_entries_expire(self):
+        cache = TTLCache("test", ttl=10)
+        with mock.patch("scr.cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+        with mock.patch("scr.cache.time.monotonic", return_value=105.0):
+            self.assertEqual(cache.get("key"), "value")
+        with mock.patch("scr.cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("key"))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache("test", ttl=60, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+
+class WatchlistRefresherTestCase(unittest.TestCase):
+    def setUp(self):
+        analytics_cache.invalidate()
+        bar_cache.invalidate()
+        self.fetch_calls = []
+        self.fetch_ttls = []
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.table = SnapshotTable(os.path.join(tmp_dir, "snapshot.npz"))
+
+        def fetch(handler, ticker, period="1y", interval="1d", refresh=False, ttl=None):
+            self.fetch_calls.append(ticker)
+            self.fetch_ttls.append(ttl)
+            return {"error": "No data found"} if ticker == "BAD" else dummy_history(ticker)
+
+        patcher = mock.patch.object(DataHandler, "fetch_stock_data", fetch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_refresh_warms_default_analytics(self):
+        refresher = WatchlistRefresher(["AAA", "BBB"], max_workers=2, table=self.table)
+        self.assertEqual(refresher.refresh_all(), {"AAA": True, "BBB": True})
+        self.assertEqual(len(SnapshotTable.load(self.table.path)), 2)
+
+        calls_after_refresh = len(self.fetch_calls)
+        snapshot = indicator_snapshot("AAA")
+        forecast = montecarlo_forecast("AAA")
+        # Both are served from the analytics cache without touching the data source.
+        self.assertEqual(len(self.fetch_calls), calls_after_refresh)
+        self.assertIn("Signal_RSI", snapshot.index)
+        self.assertEqual(len(forecast["future_dates"]), 30)
+
+    def test_bars_kept_as_long_as_analytics(self):
+        refresher = WatchlistRefresher(["AAA"], table=self.table)
+        refresher.refresh_all()
+        refreshed = refresher.last_refreshed["AAA"]
+        self.assertAlmostEqual(self.fetch_ttls[0], refresher.expires_at(refreshed) - refreshed, delta=5)
+
+    def test_daily_refresh_is_not_stale_over_the_weekend(self):
+        tz = ZoneInfo("America/New_York")
+        refresher = WatchlistRefresher(["AAA"], table=self.table, jitter_seconds=30)
+        refresher.last_refreshed["AAA"] = datetime(2025, 1, 3, 16, 0, 20, tzinfo=tz).timestamp()
+        for now, stale in [(datetime(2025, 1, 5, 12, 0, tzinfo=tz), False),
+                           (datetime(2025, 1, 7, 15, 0, tzinfo=tz), False),
+                           (datetime(2025, 1, 7, 16, 5, tzinfo=tz), True)]:
+            with mock.patch("scr.watchlist.time.time", return_value=now.timestamp()):
+                self.assertEqual(refresher.staleness()["AAA"]["stale"], stale, now)
+
+    def test_staleness_gauge_only_while_running(self):
+        refresher = WatchlistRefresher(["AAA", "NEW"], table=self.table)
+        with mock.patch.object(WatchlistRefresher, "_run", lambda self: None):
+            refresher.start()
+        # Tickers never refreshed are reported too.
+        self.assertIn(f'{WATCHLIST_STALENESS}{{ticker="NEW"}}', registry.render())
+        refresher.stop()
+        self.assertNotIn(f'{WATCHLIST_STALENESS}{{ticker="NEW"}}', registry.render())
+
+    def test_staleness_reports_failures(self):
+        refresher = WatchlistRefresher(["AAA", "BAD"], table=self.table)
+        refresher.refresh_all()
+        report = refresher.staleness()
+        self.assertFalse(report["AAA"]["stale"])
+        self.assertTrue(report["BAD"]["stale"])
+        self.assertIn("No data found", report["BAD"]["error"])
+
+    def test_next_bar_close(self):
+        tz = ZoneInfo("America/New_York")
+        friday_evening = datetime(2025, 1, 3, 17, 0, tzinfo=tz)
+        self.assertEqual(next_bar_close("1d", friday_evening), datetime(2025, 1, 6, 16, 0, tzinfo=tz))
+        midday = datetime(2025, 1, 6, 10, 2, 30, tzinfo=tz)
+        self.assertEqual(next_bar_close("5m", midday), datetime(2025, 1, 6, 10, 5, tzinfo=tz))
+
+
+if __name__ == "__main__":
+    unittest.main()